@@ -0,0 +1,238 @@
+"""initial schema
+
+Baseline matching the tables previously created by
+``SQLModel.metadata.create_all`` at startup. Databases that were bootstrapped
+that way should be stamped with ``alembic stamp 0001`` before upgrading.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+user_role = sa.Enum("FARMER", "AGGREGATOR", "BUYER", "LOGISTICS", "ADMIN", name="userrole")
+produce_type = sa.Enum("GRAINS", "VEGETABLES", "FRUITS", "TUBERS", "LEGUMES", "OTHER", name="producetype")
+listing_status = sa.Enum("ACTIVE", "SOLD", "EXPIRED", "CANCELLED", name="listingstatus")
+offer_status = sa.Enum("PENDING", "ACCEPTED", "REJECTED", "EXPIRED", "CANCELLED", name="offerstatus")
+contract_status = sa.Enum("ACTIVE", "COMPLETED", "CANCELLED", "DISPUTED", name="contractstatus")
+escrow_status = sa.Enum("PENDING", "FUNDED", "RELEASED", "REFUNDED", "DISPUTED", name="escrowstatus")
+order_status = sa.Enum("PENDING", "CONFIRMED", "IN_TRANSIT", "DELIVERED", "CANCELLED", name="orderstatus")
+document_type = sa.Enum(
+    "NATIONAL_ID", "DRIVERS_LICENSE", "PASSPORT", "CAC_CERTIFICATE", "UTILITY_BILL", "BANK_STATEMENT", "OTHER",
+    name="documenttype",
+)
+kyc_status = sa.Enum("PENDING", "APPROVED", "REJECTED", "UNDER_REVIEW", name="kycstatus")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("username", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("hashed_password", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("full_name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("phone", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("role", user_role, nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("is_verified", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("kyc_status", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("kyc_documents", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("business_name", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("business_address", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("business_registration", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_user_email", "user", ["email"], unique=True)
+    op.create_index("ix_user_username", "user", ["username"], unique=True)
+
+    op.create_table(
+        "farm",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("description", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("location", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("size_hectares", sa.Float(), nullable=False),
+        sa.Column("soil_type", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("irrigation_type", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("farmer_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["farmer_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_table(
+        "kyc",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("document_type", document_type, nullable=False),
+        sa.Column("document_number", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("document_file_path", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("selfie_file_path", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("business_registration", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("business_address", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("status", kyc_status, nullable=False),
+        sa.Column("admin_notes", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("reviewed_by", sa.Integer(), nullable=True),
+        sa.Column("reviewed_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["reviewed_by"], ["user.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id"),
+    )
+
+    op.create_table(
+        "listing",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("description", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("produce_type", produce_type, nullable=False),
+        sa.Column("quantity_kg", sa.Float(), nullable=False),
+        sa.Column("unit_price_ngn", sa.Float(), nullable=False),
+        sa.Column("total_price_ngn", sa.Float(), nullable=False),
+        sa.Column("harvest_date", sa.DateTime(), nullable=True),
+        sa.Column("expiry_date", sa.DateTime(), nullable=True),
+        sa.Column("status", listing_status, nullable=False),
+        sa.Column("is_organic", sa.Boolean(), nullable=False),
+        sa.Column("quality_grade", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("farmer_id", sa.Integer(), nullable=False),
+        sa.Column("farm_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["farm_id"], ["farm.id"]),
+        sa.ForeignKeyConstraint(["farmer_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_table(
+        "offer",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("quantity_kg", sa.Float(), nullable=False),
+        sa.Column("unit_price_ngn", sa.Float(), nullable=False),
+        sa.Column("total_price_ngn", sa.Float(), nullable=False),
+        sa.Column("delivery_date", sa.DateTime(), nullable=True),
+        sa.Column("delivery_location", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("notes", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("status", offer_status, nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("buyer_id", sa.Integer(), nullable=False),
+        sa.Column("listing_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["buyer_id"], ["user.id"]),
+        sa.ForeignKeyConstraint(["listing_id"], ["listing.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_table(
+        "contract",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("contract_number", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("quantity_kg", sa.Float(), nullable=False),
+        sa.Column("unit_price_ngn", sa.Float(), nullable=False),
+        sa.Column("total_amount_ngn", sa.Float(), nullable=False),
+        sa.Column("delivery_date", sa.DateTime(), nullable=False),
+        sa.Column("delivery_location", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("terms_and_conditions", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("status", contract_status, nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("farmer_id", sa.Integer(), nullable=False),
+        sa.Column("buyer_id", sa.Integer(), nullable=False),
+        sa.Column("listing_id", sa.Integer(), nullable=False),
+        sa.Column("offer_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["buyer_id"], ["user.id"]),
+        sa.ForeignKeyConstraint(["farmer_id"], ["user.id"]),
+        sa.ForeignKeyConstraint(["listing_id"], ["listing.id"]),
+        sa.ForeignKeyConstraint(["offer_id"], ["offer.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_contract_contract_number", "contract", ["contract_number"], unique=True)
+
+    op.create_table(
+        "escrow",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("escrow_number", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("amount_ngn", sa.Float(), nullable=False),
+        sa.Column("status", escrow_status, nullable=False),
+        sa.Column("funded_at", sa.DateTime(), nullable=True),
+        sa.Column("released_at", sa.DateTime(), nullable=True),
+        sa.Column("refunded_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("contract_id", sa.Integer(), nullable=False),
+        sa.Column("buyer_id", sa.Integer(), nullable=False),
+        sa.Column("seller_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["buyer_id"], ["user.id"]),
+        sa.ForeignKeyConstraint(["contract_id"], ["contract.id"]),
+        sa.ForeignKeyConstraint(["seller_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_escrow_escrow_number", "escrow", ["escrow_number"], unique=True)
+
+    op.create_table(
+        "order",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("order_number", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("quantity_kg", sa.Float(), nullable=False),
+        sa.Column("delivery_address", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("delivery_instructions", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("status", order_status, nullable=False),
+        sa.Column("confirmed_at", sa.DateTime(), nullable=True),
+        sa.Column("shipped_at", sa.DateTime(), nullable=True),
+        sa.Column("delivered_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("contract_id", sa.Integer(), nullable=False),
+        sa.Column("farmer_id", sa.Integer(), nullable=False),
+        sa.Column("buyer_id", sa.Integer(), nullable=False),
+        sa.Column("logistics_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["buyer_id"], ["user.id"]),
+        sa.ForeignKeyConstraint(["contract_id"], ["contract.id"]),
+        sa.ForeignKeyConstraint(["farmer_id"], ["user.id"]),
+        sa.ForeignKeyConstraint(["logistics_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_order_order_number", "order", ["order_number"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_order_order_number", table_name="order")
+    op.drop_table("order")
+    op.drop_index("ix_escrow_escrow_number", table_name="escrow")
+    op.drop_table("escrow")
+    op.drop_index("ix_contract_contract_number", table_name="contract")
+    op.drop_table("contract")
+    op.drop_table("offer")
+    op.drop_table("listing")
+    op.drop_table("kyc")
+    op.drop_table("farm")
+    op.drop_index("ix_user_username", table_name="user")
+    op.drop_index("ix_user_email", table_name="user")
+    op.drop_table("user")
+
+    bind = op.get_bind()
+    for enum in (
+        kyc_status, document_type, order_status, escrow_status, contract_status,
+        offer_status, listing_status, produce_type, user_role,
+    ):
+        enum.drop(bind, checkfirst=True)
@@ -0,0 +1,92 @@
+"""production index plan
+
+Indexes backing the ownership filters and browse queries issued by the API
+endpoints. On PostgreSQL they are built ``CONCURRENTLY`` so the migration can
+run against a live database without blocking writes.
+
+  listing   farmer_id, farm_id            farmer "my listings", farm ownership
+            (produce_type, unit_price_ngn) WHERE status = 'ACTIVE'
+                                           browse / match by produce type
+            (created_at) WHERE status = 'ACTIVE'
+                                           default buyer browse
+  farm      farmer_id                      farmer "my farms"
+            (id) WHERE is_active           buyer farm browse
+  offer     (listing_id, status)           offers on a farmer's listings
+            buyer_id                       buyer "my offers"
+  contract  farmer_id, buyer_id            party filter (BitmapOr)
+            listing_id, offer_id           contract lookups from listing/offer
+  escrow    contract_id                    one escrow per contract check
+            buyer_id, seller_id            party filter
+  order     contract_id                    one order per contract check
+            farmer_id, buyer_id            party filter
+            logistics_id WHERE logistics_id IS NOT NULL
+  kyc       (created_at) WHERE status = 'PENDING'
+                                           admin review queue
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, partial WHERE clause or None)
+INDEXES = [
+    ("ix_listing_farmer_id", "listing", ["farmer_id"], None),
+    ("ix_listing_farm_id", "listing", ["farm_id"], None),
+    ("ix_listing_active_produce_type", "listing", ["produce_type", "unit_price_ngn"], "status = 'ACTIVE'"),
+    ("ix_listing_active_created_at", "listing", ["created_at"], "status = 'ACTIVE'"),
+    ("ix_farm_farmer_id", "farm", ["farmer_id"], None),
+    ("ix_farm_active", "farm", ["id"], "is_active"),
+    ("ix_offer_listing_id_status", "offer", ["listing_id", "status"], None),
+    ("ix_offer_buyer_id", "offer", ["buyer_id"], None),
+    ("ix_contract_farmer_id", "contract", ["farmer_id"], None),
+    ("ix_contract_buyer_id", "contract", ["buyer_id"], None),
+    ("ix_contract_listing_id", "contract", ["listing_id"], None),
+    ("ix_contract_offer_id", "contract", ["offer_id"], None),
+    ("ix_escrow_contract_id", "escrow", ["contract_id"], None),
+    ("ix_escrow_buyer_id", "escrow", ["buyer_id"], None),
+    ("ix_escrow_seller_id", "escrow", ["seller_id"], None),
+    ("ix_order_contract_id", "order", ["contract_id"], None),
+    ("ix_order_farmer_id", "order", ["farmer_id"], None),
+    ("ix_order_buyer_id", "order", ["buyer_id"], None),
+    ("ix_order_logistics_id", "order", ["logistics_id"], "logistics_id IS NOT NULL"),
+    ("ix_kyc_pending_created_at", "kyc", ["created_at"], "status = 'PENDING'"),
+]
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    concurrently = _is_postgresql()
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_where=sa.text(where) if where else None,
+                sqlite_where=sa.text(where) if where else None,
+                postgresql_concurrently=concurrently,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    concurrently = _is_postgresql()
+    with op.get_context().autocommit_block():
+        for name, table, _columns, _where in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=concurrently, if_exists=True)
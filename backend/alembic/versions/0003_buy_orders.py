@@ -0,0 +1,70 @@
+"""buy orders
+
+Standing bids matched against listings by the order-book matching engine.
+The partial index serves the engine's startup load of the open book.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# producetype already exists (created with the listing table)
+produce_type = sa.Enum(
+    "GRAINS", "VEGETABLES", "FRUITS", "TUBERS", "LEGUMES", "OTHER", name="producetype"
+).with_variant(
+    postgresql.ENUM(
+        "GRAINS", "VEGETABLES", "FRUITS", "TUBERS", "LEGUMES", "OTHER", name="producetype", create_type=False
+    ),
+    "postgresql",
+)
+buy_order_status = sa.Enum("OPEN", "FILLED", "CANCELLED", name="buyorderstatus")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "buyorder",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("produce_type", produce_type, nullable=False),
+        sa.Column("quality_grade", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("quantity_kg", sa.Float(), nullable=False),
+        sa.Column("remaining_kg", sa.Float(), nullable=False),
+        sa.Column("limit_price_ngn", sa.Float(), nullable=False),
+        sa.Column("delivery_location", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("delivery_date", sa.DateTime(), nullable=True),
+        sa.Column("status", buy_order_status, nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("buyer_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["buyer_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_buyorder_buyer_id", "buyorder", ["buyer_id"])
+    op.create_index(
+        "ix_buyorder_open_book",
+        "buyorder",
+        ["produce_type", "quality_grade", "created_at"],
+        postgresql_where=sa.text("status = 'OPEN'"),
+        sqlite_where=sa.text("status = 'OPEN'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_buyorder_open_book", table_name="buyorder")
+    op.drop_index("ix_buyorder_buyer_id", table_name="buyorder")
+    op.drop_table("buyorder")
+    buy_order_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,48 @@
+"""listing remaining quantity
+
+Track the quantity of each listing not yet under contract so a listing can
+back several contracts and is only SOLD once exhausted. Existing listings are
+backfilled from their contracts. Contracts become unique per offer.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("listing", sa.Column("remaining_kg", sa.Float(), nullable=True))
+    sold = "COALESCE((SELECT SUM(contract.quantity_kg) FROM contract WHERE contract.listing_id = listing.id), 0)"
+    op.execute(
+        f"""
+        UPDATE listing SET remaining_kg = CASE
+            WHEN status <> 'ACTIVE' THEN 0
+            WHEN quantity_kg > {sold} THEN quantity_kg - {sold}
+            ELSE 0
+        END
+        """
+    )
+    with op.batch_alter_table("listing") as batch_op:
+        batch_op.alter_column("remaining_kg", existing_type=sa.Float(), nullable=False)
+
+    op.drop_index("ix_contract_offer_id", table_name="contract")
+    op.create_index("ix_contract_offer_id", "contract", ["offer_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_contract_offer_id", table_name="contract")
+    op.create_index("ix_contract_offer_id", "contract", ["offer_id"])
+    with op.batch_alter_table("listing") as batch_op:
+        batch_op.drop_column("remaining_kg")
@@ -0,0 +1,69 @@
+"""user dashboard counters
+
+Per-user counters behind GET /dashboard/summary, maintained incrementally by
+app.services.counters. Backfilled here from the trade tables.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _parties(table, columns, where, value="COUNT(*)"):
+    """Per-user totals over the rows where each of `columns` is the user."""
+    unions = " UNION ALL ".join(
+        f"SELECT {column} AS user_id, {value} AS value FROM {table} WHERE {where} GROUP BY {column}"
+        for column in columns
+    )
+    return f"SELECT user_id, SUM(value) AS value FROM ({unions}) parties GROUP BY user_id"
+
+
+# (counter name, per-user totals query)
+BACKFILL = [
+    ("listings.active", _parties("listing", ["farmer_id"], "status = 'ACTIVE'")),
+    ("offers.pending", _parties(
+        "offer JOIN listing ON listing.id = offer.listing_id",
+        ["offer.buyer_id", "listing.farmer_id"],
+        "offer.status = 'PENDING'",
+    )),
+    ("contracts.active", _parties("contract", ["farmer_id", "buyer_id"], "status = 'ACTIVE'")),
+    ("escrow.funded", _parties("escrow", ["buyer_id", "seller_id"], "status = 'FUNDED'")),
+    ("escrow.funded_ngn", _parties("escrow", ["buyer_id", "seller_id"], "status = 'FUNDED'", "SUM(amount_ngn)")),
+    ("orders.pending", _parties('"order"', ["farmer_id", "buyer_id"], "status = 'PENDING'")),
+    ("orders.confirmed", _parties('"order"', ["farmer_id", "buyer_id"], "status = 'CONFIRMED'")),
+    ("orders.in_transit", _parties('"order"', ["farmer_id", "buyer_id"], "status = 'IN_TRANSIT'")),
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "usercounter",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("value", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("user_id", "name"),
+    )
+    for name, totals in BACKFILL:
+        op.execute(
+            f"INSERT INTO usercounter (user_id, name, value, updated_at) "
+            f"SELECT user_id, '{name}', value, CURRENT_TIMESTAMP FROM ({totals}) totals"
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("usercounter")
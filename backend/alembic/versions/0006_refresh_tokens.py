@@ -0,0 +1,47 @@
+"""refresh tokens
+
+Rotating refresh tokens of login sessions (hashes only).
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "refreshtoken",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("token_hash", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("session_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("used_at", sa.DateTime(), nullable=True),
+        sa.Column("revoked_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_refreshtoken_token_hash", "refreshtoken", ["token_hash"], unique=True)
+    op.create_index("ix_refreshtoken_session_id", "refreshtoken", ["session_id"])
+    op.create_index("ix_refreshtoken_user_id", "refreshtoken", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_refreshtoken_user_id", table_name="refreshtoken")
+    op.drop_index("ix_refreshtoken_session_id", table_name="refreshtoken")
+    op.drop_index("ix_refreshtoken_token_hash", table_name="refreshtoken")
+    op.drop_table("refreshtoken")
@@ -0,0 +1,32 @@
+"""kyc previews
+
+Preview/thumbnail variants generated for KYC documents.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("kyc", sa.Column("previews", sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column("kyc", sa.Column("processed_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("kyc") as batch_op:
+        batch_op.drop_column("processed_at")
+        batch_op.drop_column("previews")
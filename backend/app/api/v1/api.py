@@ -1,16 +1,23 @@
-from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, farms, listings, offers, contracts, escrow, orders, kyc, health
+from fastapi import APIRouter, Depends
+from app.core.ratelimit import rate_limit
+from app.api.v1.endpoints import auth, users, farms, listings, offers, contracts, escrow, orders, kyc, market, dashboard, health, profiling
 
 api_router = APIRouter()
 
+# Per-user, per-route token bucket applied to every route (probes excluded)
+default_limits = [Depends(rate_limit())]
+
 # Include all endpoint routers
-api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
-api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(farms.router, prefix="/farms", tags=["farms"])
-api_router.include_router(listings.router, prefix="/listings", tags=["listings"])
-api_router.include_router(offers.router, prefix="/offers", tags=["offers"])
-api_router.include_router(contracts.router, prefix="/contracts", tags=["contracts"])
-api_router.include_router(escrow.router, prefix="/escrow", tags=["escrow"])
-api_router.include_router(orders.router, prefix="/orders", tags=["orders"])
-api_router.include_router(kyc.router, prefix="/kyc", tags=["kyc"])
+api_router.include_router(auth.router, prefix="/auth", tags=["authentication"], dependencies=default_limits)
+api_router.include_router(users.router, prefix="/users", tags=["users"], dependencies=default_limits)
+api_router.include_router(farms.router, prefix="/farms", tags=["farms"], dependencies=default_limits)
+api_router.include_router(listings.router, prefix="/listings", tags=["listings"], dependencies=default_limits)
+api_router.include_router(offers.router, prefix="/offers", tags=["offers"], dependencies=default_limits)
+api_router.include_router(contracts.router, prefix="/contracts", tags=["contracts"], dependencies=default_limits)
+api_router.include_router(escrow.router, prefix="/escrow", tags=["escrow"], dependencies=default_limits)
+api_router.include_router(orders.router, prefix="/orders", tags=["orders"], dependencies=default_limits)
+api_router.include_router(kyc.router, prefix="/kyc", tags=["kyc"], dependencies=default_limits)
+api_router.include_router(market.router, prefix="/market", tags=["market"], dependencies=default_limits)
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"], dependencies=default_limits)
+api_router.include_router(profiling.router, prefix="/admin/profiling", tags=["profiling"], dependencies=default_limits)
 api_router.include_router(health.router, prefix="/health", tags=["health"])
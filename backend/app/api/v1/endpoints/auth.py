@@ -1,16 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from sqlmodel import Session, select
-from app.core.auth import get_password_hash, verify_password, create_access_token, get_current_user
+from app.core.auth import get_password_hash, verify_password, get_current_user
 from app.core.database import get_session
+from app.core.ratelimit import rate_limit
+from app.core.sessions import end_session, issue_tokens, revoke_user_sessions, rotate_refresh_token
 from app.models.user import User
-from app.schemas.user import UserCreate, UserLogin, Token, UserResponse
+from app.schemas.user import UserCreate, UserLogin, Token, UserResponse, RefreshRequest
 from datetime import timedelta
 from app.core.config import settings
 
 router = APIRouter()
 
-@router.post("/register", response_model=Token)
+# bcrypt makes these the most expensive unauthenticated calls
+credential_limits = [Depends(rate_limit(per_second=0.5, burst=5))]
+refresh_limits = [Depends(rate_limit(per_second=1, burst=10))]
+
+def token_response(user: User, access_token: str, refresh_token: str) -> Token:
+    return Token(
+        access_token=access_token,
+        expires_in=settings.access_token_expire_minutes * 60,
+        refresh_token=refresh_token,
+        refresh_expires_in=settings.refresh_token_expire_days * 86400,
+        user=UserResponse.from_orm(user)
+    )
+
+@router.post("/register", response_model=Token, dependencies=credential_limits)
 async def register(user_data: UserCreate, session: Session = Depends(get_session)):
     # Check if user already exists
     existing_user = session.exec(
@@ -49,16 +64,13 @@ async def register(user_data: UserCreate, session: Session = Depends(get_session
     session.commit()
     session.refresh(db_user)
     
-    # Create access token
-    access_token = create_access_token(data={"sub": str(db_user.id)})
+    # Start a login session
+    access_token, refresh_token = issue_tokens(session, db_user)
+    session.commit()
     
-    return Token(
-        access_token=access_token,
-        expires_in=settings.access_token_expire_minutes * 60,
-        user=UserResponse.from_orm(db_user)
-    )
+    return token_response(db_user, access_token, refresh_token)
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=credential_limits)
 async def login(user_credentials: UserLogin, session: Session = Depends(get_session)):
     # Find user by email
     user = session.exec(
@@ -77,14 +89,30 @@ async def login(user_credentials: UserLogin, session: Session = Depends(get_sess
             detail="Inactive user account"
         )
     
-    # Create access token
-    access_token = create_access_token(data={"sub": str(user.id)})
+    # Start a login session
+    access_token, refresh_token = issue_tokens(session, user)
+    session.commit()
     
-    return Token(
-        access_token=access_token,
-        expires_in=settings.access_token_expire_minutes * 60,
-        user=UserResponse.from_orm(user)
-    )
+    return token_response(user, access_token, refresh_token)
+
+@router.post("/refresh", response_model=Token, dependencies=refresh_limits)
+async def refresh(request: RefreshRequest, session: Session = Depends(get_session)):
+    # Rotates the refresh token; no password check involved
+    user, access_token, refresh_token = rotate_refresh_token(session, request.refresh_token)
+    
+    return token_response(user, access_token, refresh_token)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(request: RefreshRequest, session: Session = Depends(get_session)):
+    end_session(session, request.refresh_token)
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_all(
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    revoke_user_sessions(session, current_user.id)
+    session.commit()
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
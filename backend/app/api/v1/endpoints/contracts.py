@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
 from sqlmodel import Session, select
 from app.core.auth import get_current_user
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
+from app.core.identifiers import CONTRACT_PREFIX, new_business_id
+from app.core.policies import CONTRACT_PARTY, OFFER_SELLER
 from app.models.user import User
 from app.models.contract import Contract
 from app.models.offer import Offer, OfferStatus
-from app.models.listing import Listing, ListingStatus
-from app.schemas.contract import ContractResponse
+from app.models.listing import Listing
+from app.schemas.contract import ContractResponse, ContractTimeline, ListingSummary, TimelineEvent
+from app.schemas.escrow import EscrowResponse
+from app.schemas.offer import OfferResponse
+from app.schemas.order import OrderResponse
+from app.services.exports import export_filter, export_response
+from app.services.inventory import reserve_quantity
 from datetime import datetime
-import uuid
 
 router = APIRouter()
 
@@ -18,24 +26,34 @@ async def create_contract(
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
-    # Get the accepted offer
-    offer = session.exec(select(Offer).where(Offer.id == offer_id)).first()
-    if not offer or offer.status != OfferStatus.ACCEPTED:
+    # The accepted offer and its listing, owned by the current farmer, in one query
+    offer, listing = OFFER_SELLER.fetch(
+        session, offer_id, current_user, include=[Listing],
+        not_found="Invalid or unaccepted offer", not_found_status=status.HTTP_400_BAD_REQUEST
+    )
+    if offer.status != OfferStatus.ACCEPTED:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid or unaccepted offer"
         )
     
-    # Verify user is the farmer who accepted the offer
-    listing = session.exec(select(Listing).where(Listing.id == offer.listing_id)).first()
-    if not listing or listing.farmer_id != current_user.id:
+    # One contract per accepted offer
+    existing = session.exec(select(Contract.id).where(Contract.offer_id == offer.id)).first()
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Contract already exists for this offer"
+        )
+    
+    # Reserve the offer quantity; the listing becomes SOLD once exhausted
+    if reserve_quantity(session, listing.id, offer.quantity_kg) is None:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Insufficient quantity remaining on listing"
         )
     
     # Generate contract number
-    contract_number = f"CTR-{uuid.uuid4().hex[:8].upper()}"
+    contract_number = new_business_id(CONTRACT_PREFIX)
     
     # Create contract
     contract = Contract(
@@ -51,11 +69,16 @@ async def create_contract(
         offer_id=offer.id
     )
     
-    # Update listing status to sold
-    listing.status = ListingStatus.SOLD
-    
     session.add(contract)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        # A concurrent request created the contract first; undo our reservation
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Contract already exists for this offer"
+        )
     session.refresh(contract)
     
     return ContractResponse.from_orm(contract)
@@ -63,36 +86,81 @@ async def create_contract(
 @router.get("/", response_model=list[ContractResponse])
 async def get_contracts(
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_read_session)
 ):
     # Users can see contracts they're involved in
-    contracts = session.exec(
-        select(Contract).where(
-            (Contract.farmer_id == current_user.id) | 
-            (Contract.buyer_id == current_user.id)
-        )
-    ).all()
+    contracts = session.exec(CONTRACT_PARTY.filter(select(Contract), current_user)).all()
     
     return [ContractResponse.from_orm(contract) for contract in contracts]
 
+@router.get("/export")
+async def export_contracts(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    scope: str = Query("own", pattern="^(own|all)$"),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_read_session)
+):
+    # Full contract history, streamed in batches
+    return export_response(session, Contract, export_filter(CONTRACT_PARTY, current_user, scope), format, "contracts")
+
 @router.get("/{contract_id}", response_model=ContractResponse)
 async def get_contract(
     contract_id: int,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_read_session)
 ):
-    contract = session.exec(select(Contract).where(Contract.id == contract_id)).first()
-    if not contract:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Contract not found"
-        )
-    
-    # Check if user is involved in this contract
-    if contract.farmer_id != current_user.id and contract.buyer_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
+    contract = CONTRACT_PARTY.fetch(session, contract_id, current_user)
     
     return ContractResponse.from_orm(contract)
+
+@router.get("/{contract_id}/timeline", response_model=ContractTimeline)
+async def get_contract_timeline(
+    contract_id: int,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_read_session)
+):
+    # Contract, offer, listing and escrow in one joined query; orders in one selectin query
+    contract = CONTRACT_PARTY.fetch(
+        session, contract_id, current_user,
+        options=[
+            joinedload(Contract.offer).joinedload(Offer.listing),
+            joinedload(Contract.escrow),
+            selectinload(Contract.orders),
+        ]
+    )
+    
+    offer, escrow = contract.offer, contract.escrow
+    orders = sorted(contract.orders, key=lambda order: order.created_at)
+    
+    events = [
+        TimelineEvent(at=offer.created_at, event="offer_created", reference=f"offer:{offer.id}"),
+        TimelineEvent(at=offer.updated_at, event="offer_accepted", reference=f"offer:{offer.id}"),
+        TimelineEvent(at=contract.created_at, event="contract_created", reference=contract.contract_number),
+    ]
+    if escrow:
+        for event, at in [
+            ("escrow_created", escrow.created_at),
+            ("escrow_funded", escrow.funded_at),
+            ("escrow_released", escrow.released_at),
+            ("escrow_refunded", escrow.refunded_at),
+        ]:
+            if at:
+                events.append(TimelineEvent(at=at, event=event, reference=escrow.escrow_number))
+    for order in orders:
+        for event, at in [
+            ("order_created", order.created_at),
+            ("order_confirmed", order.confirmed_at),
+            ("order_shipped", order.shipped_at),
+            ("order_delivered", order.delivered_at),
+        ]:
+            if at:
+                events.append(TimelineEvent(at=at, event=event, reference=order.order_number))
+    
+    return ContractTimeline(
+        contract=ContractResponse.from_orm(contract),
+        offer=OfferResponse.from_orm(offer),
+        listing=ListingSummary.from_orm(offer.listing),
+        escrow=EscrowResponse.from_orm(escrow) if escrow else None,
+        orders=[OrderResponse.from_orm(order) for order in orders],
+        events=sorted(events, key=lambda event: event.at),
+    )
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends
+from sqlmodel import Session, select
+from app.core.auth import get_current_user
+from app.core.database import get_read_session
+from app.models.user import User
+from app.models.counter import UserCounter
+from app.schemas.dashboard import DashboardSummary
+
+router = APIRouter()
+
+# Summary field for each counter maintained by app.services.counters
+SUMMARY_FIELDS = {
+    "listings.active": "active_listings",
+    "offers.pending": "pending_offers",
+    "contracts.active": "active_contracts",
+    "escrow.funded": "funded_escrows",
+    "escrow.funded_ngn": "funded_escrow_ngn",
+    "orders.pending": "orders_pending",
+    "orders.confirmed": "orders_confirmed",
+    "orders.in_transit": "orders_in_transit",
+}
+
+@router.get("/summary", response_model=DashboardSummary)
+async def get_dashboard_summary(
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_read_session)
+):
+    # A primary-key range read of the user's counters; no trade table scans
+    counters = session.exec(
+        select(UserCounter.name, UserCounter.value).where(UserCounter.user_id == current_user.id)
+    ).all()
+    
+    return DashboardSummary(**{
+        SUMMARY_FIELDS[name]: value for name, value in counters if name in SUMMARY_FIELDS
+    })
@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session, select
 from app.core.auth import get_current_user
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
+from app.core.identifiers import ESCROW_PREFIX, new_business_id
+from app.core.policies import CONTRACT_BUYER, ESCROW_BUYER, ESCROW_PARTY
 from app.models.user import User
 from app.models.escrow import Escrow, EscrowStatus
-from app.models.contract import Contract
 from app.schemas.escrow import EscrowResponse
+from app.services.exports import export_filter, export_response
 from datetime import datetime
-import uuid
 
 router = APIRouter()
 
@@ -17,20 +18,10 @@ async def create_escrow(
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
-    # Get the contract
-    contract = session.exec(select(Contract).where(Contract.id == contract_id)).first()
-    if not contract:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Contract not found"
-        )
-    
-    # Check if user is the buyer
-    if contract.buyer_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only buyers can create escrow"
-        )
+    # Get the contract, which only its buyer may secure
+    contract = CONTRACT_BUYER.fetch(
+        session, contract_id, current_user, forbidden="Only buyers can create escrow"
+    )
     
     # Check if escrow already exists
     existing_escrow = session.exec(
@@ -44,7 +35,7 @@ async def create_escrow(
         )
     
     # Generate escrow number
-    escrow_number = f"ESC-{uuid.uuid4().hex[:8].upper()}"
+    escrow_number = new_business_id(ESCROW_PREFIX)
     
     # Create escrow
     escrow = Escrow(
@@ -67,19 +58,7 @@ async def fund_escrow(
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
-    escrow = session.exec(select(Escrow).where(Escrow.id == escrow_id)).first()
-    if not escrow:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Escrow not found"
-        )
-    
-    # Check if user is the buyer
-    if escrow.buyer_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only buyers can fund escrow"
-        )
+    escrow = ESCROW_BUYER.fetch(session, escrow_id, current_user, forbidden="Only buyers can fund escrow")
     
     # Check if escrow is in pending status
     if escrow.status != EscrowStatus.PENDING:
@@ -100,36 +79,29 @@ async def fund_escrow(
 @router.get("/", response_model=list[EscrowResponse])
 async def get_escrows(
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_read_session)
 ):
     # Users can see escrows they're involved in
-    escrows = session.exec(
-        select(Escrow).where(
-            (Escrow.buyer_id == current_user.id) | 
-            (Escrow.seller_id == current_user.id)
-        )
-    ).all()
+    escrows = session.exec(ESCROW_PARTY.filter(select(Escrow), current_user)).all()
     
     return [EscrowResponse.from_orm(escrow) for escrow in escrows]
 
+@router.get("/export")
+async def export_escrows(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    scope: str = Query("own", pattern="^(own|all)$"),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_read_session)
+):
+    # Full escrow history, streamed in batches
+    return export_response(session, Escrow, export_filter(ESCROW_PARTY, current_user, scope), format, "escrows")
+
 @router.get("/{escrow_id}", response_model=EscrowResponse)
 async def get_escrow(
     escrow_id: int,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_read_session)
 ):
-    escrow = session.exec(select(Escrow).where(Escrow.id == escrow_id)).first()
-    if not escrow:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Escrow not found"
-        )
-    
-    # Check if user is involved in this escrow
-    if escrow.buyer_id != current_user.id and escrow.seller_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
+    escrow = ESCROW_PARTY.fetch(session, escrow_id, current_user)
     
     return EscrowResponse.from_orm(escrow)
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
 from app.core.auth import get_current_user, require_role
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
+from app.core.policies import FARM_OWNER, FARM_VIEWER
 from app.models.user import User, UserRole
 from app.models.farm import Farm
 from app.schemas.farm import FarmCreate, FarmResponse, FarmUpdate
@@ -36,7 +37,7 @@ async def create_farm(
 @router.get("/", response_model=list[FarmResponse])
 async def get_farms(
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_read_session)
 ):
     if current_user.role == UserRole.FARMER:
         # Farmers can only see their own farms
@@ -55,21 +56,9 @@ async def get_farms(
 async def get_farm(
     farm_id: int,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_read_session)
 ):
-    farm = session.exec(select(Farm).where(Farm.id == farm_id)).first()
-    if not farm:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Farm not found"
-        )
-    
-    # Check if user can view this farm
-    if current_user.role == UserRole.FARMER and farm.farmer_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
+    farm = FARM_VIEWER.fetch(session, farm_id, current_user)
     
     return FarmResponse.from_orm(farm)
 
@@ -80,19 +69,7 @@ async def update_farm(
     current_user: User = Depends(require_role("farmer")),
     session: Session = Depends(get_session)
 ):
-    farm = session.exec(select(Farm).where(Farm.id == farm_id)).first()
-    if not farm:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Farm not found"
-        )
-    
-    # Check if user owns this farm
-    if farm.farmer_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
+    farm = FARM_OWNER.fetch(session, farm_id, current_user)
     
     # Update farm fields
     for field, value in farm_update.dict(exclude_unset=True).items():
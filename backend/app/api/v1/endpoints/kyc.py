@@ -1,18 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session, select
 from app.core.auth import get_current_user, require_admin
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
+from app.core.files import send_file
+from app.core.policies import KYC_VIEWER
+from app.core.ratelimit import rate_limit
+from app.core.tracing import span
 from app.models.user import User
 from app.models.kyc import KYC, KYCStatus, DocumentType
 from app.schemas.kyc import KYCCreate, KYCResponse, KYCUpdate
+from app.services.jobs import enqueue
+from app.services.kyc_images import documents, preview_path
 import json
 import os
+import shutil
 from datetime import datetime
 from app.core.config import settings
 
 router = APIRouter()
 
-@router.post("/upload", response_model=KYCResponse)
+async def save_upload(upload: UploadFile, filename: str) -> str:
+    """Copy an upload into file storage off the event loop; returns its path."""
+    path = os.path.join(settings.file_storage_dir, filename)
+
+    def copy():
+        with span("storage.write", **{"file.path": path}), open(path, "wb") as buffer:
+            shutil.copyfileobj(upload.file, buffer, 1024 * 1024)
+    await run_in_threadpool(copy)
+    return path
+
+@router.post("/upload", response_model=KYCResponse, dependencies=[Depends(rate_limit(per_second=0.1, burst=3))])
 async def upload_kyc_documents(
     document_type: DocumentType,
     document_number: str,
@@ -37,33 +55,24 @@ async def upload_kyc_documents(
     # Create storage directory if it doesn't exist
     os.makedirs(settings.file_storage_dir, exist_ok=True)
     
-    # Save document file
-    document_filename = f"kyc_{current_user.id}_{document_type}_{document_file.filename}"
-    document_path = os.path.join(settings.file_storage_dir, document_filename)
-    
-    with open(document_path, "wb") as buffer:
-        content = await document_file.read()
-        buffer.write(content)
+    # Save document file (only the base name of the client's filename, never a path)
+    document_path = await save_upload(
+        document_file, f"kyc_{current_user.id}_{document_type}_{os.path.basename(document_file.filename)}"
+    )
     
     # Save selfie if provided
     selfie_path = None
     if selfie_file:
-        selfie_filename = f"kyc_{current_user.id}_selfie_{selfie_file.filename}"
-        selfie_path = os.path.join(settings.file_storage_dir, selfie_filename)
-        
-        with open(selfie_path, "wb") as buffer:
-            content = await selfie_file.read()
-            buffer.write(content)
+        selfie_path = await save_upload(
+            selfie_file, f"kyc_{current_user.id}_selfie_{os.path.basename(selfie_file.filename)}"
+        )
     
     # Save business registration if provided
     business_reg_path = None
     if business_registration:
-        business_filename = f"kyc_{current_user.id}_business_{business_registration.filename}"
-        business_reg_path = os.path.join(settings.file_storage_dir, business_filename)
-        
-        with open(business_reg_path, "wb") as buffer:
-            content = await business_registration.read()
-            buffer.write(content)
+        business_reg_path = await save_upload(
+            business_registration, f"kyc_{current_user.id}_business_{os.path.basename(business_registration.filename)}"
+        )
     
     # Create KYC record
     kyc = KYC(
@@ -78,6 +87,10 @@ async def upload_kyc_documents(
     )
     
     session.add(kyc)
+    session.flush()
+    
+    # Previews are rendered by the worker once the upload is committed
+    enqueue(session, "kyc.process", kyc_id=kyc.id)
     session.commit()
     session.refresh(kyc)
     
@@ -86,7 +99,7 @@ async def upload_kyc_documents(
 @router.get("/status", response_model=KYCResponse)
 async def get_kyc_status(
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_read_session)
 ):
     kyc = session.exec(
         select(KYC).where(KYC.user_id == current_user.id)
@@ -111,6 +124,52 @@ async def get_kyc_queue(
     
     return [KYCResponse.from_orm(kyc) for kyc in kyc_list]
 
+@router.get("/{kyc_id}/documents/{kind}")
+async def get_kyc_document(
+    request: Request,
+    kyc_id: int,
+    kind: str,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_read_session)
+):
+    # The applicant or an admin; nginx sends the file when FILE_ACCEL_REDIRECT is on
+    kyc = KYC_VIEWER.fetch(session, kyc_id, current_user)
+    
+    path = documents(kyc).get(kind)
+    if not path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    return send_file(request, path)
+
+@router.get("/admin/{kyc_id}/preview/{kind}")
+async def get_kyc_preview(
+    request: Request,
+    kyc_id: int,
+    kind: str,
+    size: str = Query("preview", pattern="^(preview|thumbnail)$"),
+    admin_user: User = Depends(require_admin),
+    session: Session = Depends(get_read_session)
+):
+    kyc = session.get(KYC, kyc_id)
+    
+    if not kyc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="KYC not found"
+        )
+    
+    path = preview_path(kyc, kind, size)
+    if not path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Preview not available"
+        )
+    
+    return send_file(request, path, media_type="image/jpeg")
+
 @router.put("/admin/{kyc_id}/review", response_model=KYCResponse)
 async def review_kyc(
     kyc_id: int,
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
 from app.core.auth import get_current_user, require_role
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
+from app.core.policies import FARM_OWNER, LISTING_OWNER
 from app.models.user import User, UserRole
 from app.models.listing import Listing, ListingStatus
 from app.models.farm import Farm
 from app.schemas.listing import ListingCreate, ListingResponse, ListingUpdate
+from app.services.inventory import resize_listing
 from datetime import datetime
 
 router = APIRouter()
@@ -23,9 +25,11 @@ async def create_listing(
             detail="KYC verification required to create listings"
         )
     
-    # Verify farm ownership
-    farm = session.exec(select(Farm).where(Farm.id == listing_data.farm_id)).first()
-    if not farm or farm.farmer_id != current_user.id:
+    # Verify farm ownership (an id-only lookup, the farm itself is not needed)
+    owned = session.exec(
+        FARM_OWNER.filter(select(Farm.id), current_user).where(Farm.id == listing_data.farm_id)
+    ).first()
+    if owned is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid farm or farm ownership"
@@ -49,7 +53,7 @@ async def create_listing(
 @router.get("/", response_model=list[ListingResponse])
 async def get_listings(
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_read_session)
 ):
     if current_user.role == UserRole.FARMER:
         # Farmers can see their own listings
@@ -67,7 +71,7 @@ async def get_listings(
 @router.get("", response_model=list[ListingResponse])
 async def get_listings_no_slash(
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_read_session)
 ):
     # Redirect to the version with trailing slash
     return await get_listings(current_user, session)
@@ -76,7 +80,7 @@ async def get_listings_no_slash(
 async def get_listing(
     listing_id: int,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_read_session)
 ):
     listing = session.exec(select(Listing).where(Listing.id == listing_id)).first()
     if not listing:
@@ -94,22 +98,21 @@ async def update_listing(
     current_user: User = Depends(require_role("farmer")),
     session: Session = Depends(get_session)
 ):
-    listing = session.exec(select(Listing).where(Listing.id == listing_id)).first()
-    if not listing:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Listing not found"
-        )
+    listing = LISTING_OWNER.fetch(session, listing_id, current_user)
     
-    # Check if user owns this listing
-    if listing.farmer_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
+    update_data = listing_update.dict(exclude_unset=True)
+    
+    # Quantity changes move the remaining quantity with them, atomically
+    if update_data.get("quantity_kg") is not None:
+        if not resize_listing(session, listing.id, update_data.pop("quantity_kg")):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Quantity cannot be less than the quantity already under contract"
+            )
+        session.refresh(listing)
     
     # Update listing fields
-    for field, value in listing_update.dict(exclude_unset=True).items():
+    for field, value in update_data.items():
         setattr(listing, field, value)
     
     # Recalculate total price if quantity or unit price changed
@@ -0,0 +1,113 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlmodel import Session, select
+from typing import Optional
+from datetime import datetime
+from app.core.auth import get_current_user
+from app.core.database import get_session, get_read_session
+from app.core.policies import BUY_ORDER_OWNER
+from app.models.user import User, UserRole
+from app.models.buy_order import BuyOrder, BuyOrderStatus
+from app.models.listing import ProduceType
+from app.schemas.buy_order import BuyOrderCreate, BuyOrderResponse, BuyOrderResult, FillResponse, OrderBookDepth
+from app.services.matching import MatchingEngine, get_matching_engine
+
+router = APIRouter()
+
+def require_engine() -> MatchingEngine:
+    engine = get_matching_engine()
+    if engine is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Matching engine is not running in this process"
+        )
+    return engine
+
+@router.post("/buy-orders", response_model=BuyOrderResult)
+async def create_buy_order(
+    order_data: BuyOrderCreate,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+    engine: MatchingEngine = Depends(require_engine)
+):
+    # Buyers/aggregators place standing bids, like offers
+    if current_user.role == UserRole.FARMER:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Farmers cannot place buy orders"
+        )
+
+    if order_data.quantity_kg <= 0 or order_data.limit_price_ngn <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Quantity and limit price must be positive"
+        )
+
+    order = BuyOrder(
+        **order_data.dict(),
+        remaining_kg=order_data.quantity_kg,
+        buyer_id=current_user.id
+    )
+    session.add(order)
+    session.commit()
+    session.refresh(order)
+
+    # Fills are persisted in the background; the response reflects the book
+    fills = engine.submit_buy_order(order)
+    response = BuyOrderResponse.from_orm(order)
+    response.remaining_kg = engine.remaining_for(order.id) or 0.0
+    if response.remaining_kg <= 0:
+        response.status = BuyOrderStatus.FILLED
+
+    return BuyOrderResult(
+        order=response,
+        fills=[FillResponse.from_orm(fill) for fill in fills]
+    )
+
+@router.get("/buy-orders", response_model=list[BuyOrderResponse])
+async def get_buy_orders(
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_read_session)
+):
+    orders = session.exec(
+        BUY_ORDER_OWNER.filter(select(BuyOrder), current_user).order_by(BuyOrder.created_at.desc())
+    ).all()
+    return [BuyOrderResponse.from_orm(order) for order in orders]
+
+@router.post("/buy-orders/{order_id}/cancel", response_model=BuyOrderResponse)
+async def cancel_buy_order(
+    order_id: int,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+    engine: MatchingEngine = Depends(require_engine)
+):
+    order = BUY_ORDER_OWNER.fetch(
+        session, order_id, current_user, forbidden="Not authorized to cancel this buy order"
+    )
+
+    if not engine.cancel_buy_order(order.id) or order.status != BuyOrderStatus.OPEN:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Buy order is no longer open"
+        )
+
+    # Fills matched before the cancel are still written by the persister
+    engine.persister.flush()
+    session.refresh(order)
+    order.status = BuyOrderStatus.CANCELLED
+    order.updated_at = datetime.utcnow()
+    session.add(order)
+    session.commit()
+    session.refresh(order)
+
+    return BuyOrderResponse.from_orm(order)
+
+@router.get("/book/{produce_type}", response_model=OrderBookDepth)
+async def get_order_book(
+    produce_type: ProduceType,
+    quality_grade: Optional[str] = None,
+    levels: int = 10,
+    current_user: User = Depends(get_current_user),
+    engine: MatchingEngine = Depends(require_engine)
+):
+    depth = engine.depth(produce_type, quality_grade, max(1, min(levels, 50)))
+    return OrderBookDepth(produce_type=produce_type, quality_grade=quality_grade, **depth)
@@ -1,11 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import insert, update
 from sqlmodel import Session, select
 from app.core.auth import get_current_user, require_role
 from app.core.database import get_session
+from app.core.identifiers import CONTRACT_PREFIX, new_business_ids
+from app.core.policies import OFFER_SELLER, OFFER_VIEWER
 from app.models.user import User, UserRole
 from app.models.offer import Offer, OfferStatus
 from app.models.listing import Listing, ListingStatus
-from app.schemas.offer import OfferCreate, OfferResponse
+from app.models.contract import Contract, ContractStatus
+from app.schemas.offer import OfferCreate, OfferResponse, OfferBatchAccept, OfferBatchItem, OfferBatchResult
+from app.services.counters import add_counts, counter_name
+from app.services.inventory import EPSILON_KG, reserve_quantity
+from app.services.notifications import record_events
 from datetime import datetime, timedelta
 
 router = APIRouter()
@@ -38,6 +45,13 @@ async def create_offer(
             detail="Cannot make offer on your own listing"
         )
     
+    # Offers cannot exceed what is still available (re-checked atomically on contract)
+    if offer_data.quantity_kg > listing.remaining_kg:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Offer quantity exceeds quantity remaining on listing"
+        )
+    
     # Calculate total price
     total_price = offer_data.quantity_kg * offer_data.unit_price_ngn
     
@@ -62,14 +76,8 @@ async def get_offers(
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
-    if current_user.role == UserRole.FARMER:
-        # Farmers see offers on their listings
-        listings = session.exec(select(Listing).where(Listing.farmer_id == current_user.id)).all()
-        listing_ids = [listing.id for listing in listings]
-        offers = session.exec(select(Offer).where(Offer.listing_id.in_(listing_ids))).all()
-    else:
-        # Buyers see their own offers
-        offers = session.exec(select(Offer).where(Offer.buyer_id == current_user.id)).all()
+    # Farmers see offers on their listings, buyers their own offers
+    offers = session.exec(OFFER_VIEWER.filter(select(Offer), current_user)).all()
     
     return [OfferResponse.from_orm(offer) for offer in offers]
 
@@ -79,20 +87,8 @@ async def accept_offer(
     current_user: User = Depends(require_role("farmer")),
     session: Session = Depends(get_session)
 ):
-    offer = session.exec(select(Offer).where(Offer.id == offer_id)).first()
-    if not offer:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Offer not found"
-        )
-    
-    # Verify listing ownership
-    listing = session.exec(select(Listing).where(Listing.id == offer.listing_id)).first()
-    if not listing or listing.farmer_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
+    # The offer and its listing in one query, checking listing ownership
+    offer, listing = OFFER_SELLER.fetch(session, offer_id, current_user, include=[Listing])
     
     # Check if offer is still valid
     if offer.status != OfferStatus.PENDING or offer.expires_at < datetime.utcnow():
@@ -101,8 +97,137 @@ async def accept_offer(
             detail="Offer is no longer valid"
         )
     
+    if listing.status != ListingStatus.ACTIVE or offer.quantity_kg > listing.remaining_kg:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Insufficient quantity remaining on listing"
+        )
+    
     # Accept the offer
     offer.status = OfferStatus.ACCEPTED
+    offer.updated_at = datetime.utcnow()
     session.commit()
     
     return {"message": "Offer accepted successfully"}
+
+@router.post("/batch-accept", response_model=OfferBatchResult)
+async def batch_accept_offers(
+    batch: OfferBatchAccept,
+    current_user: User = Depends(require_role("farmer")),
+    session: Session = Depends(get_session)
+):
+    """
+    Accept several offers and create their contracts in one transaction.
+    
+    Offers are taken in the order given; each gets its own result, and an
+    offer that cannot be accepted (not found, not yours, no longer pending,
+    expired or not enough quantity left) does not affect the others.
+    """
+    now = datetime.utcnow()
+    offer_ids = list(dict.fromkeys(batch.offer_ids))
+    
+    # Offers with their listings in one query, rows locked until commit
+    rows = session.exec(
+        select(Offer, Listing)
+        .join(Listing, Listing.id == Offer.listing_id)
+        .where(Offer.id.in_(offer_ids))
+        .with_for_update()
+    ).all()
+    found = {offer.id: (offer, listing) for offer, listing in rows}
+    
+    results: dict[int, OfferBatchItem] = {}
+    available = {listing.id: listing.remaining_kg for _, listing in rows}
+    accepted: list[tuple[Offer, Listing]] = []
+    for offer_id in offer_ids:
+        offer, listing = found.get(offer_id, (None, None))
+        error = None
+        if offer is None:
+            error = "Offer not found"
+        elif listing.farmer_id != current_user.id:
+            error = "Not enough permissions"
+        elif offer.status != OfferStatus.PENDING or offer.expires_at < now:
+            error = "Offer is no longer valid"
+        elif listing.status != ListingStatus.ACTIVE or offer.quantity_kg > available[listing.id] + EPSILON_KG:
+            error = "Insufficient quantity remaining on listing"
+        
+        if error:
+            results[offer_id] = OfferBatchItem(offer_id=offer_id, accepted=False, error=error)
+        else:
+            available[listing.id] -= offer.quantity_kg
+            accepted.append((offer, listing))
+    
+    # One conditional reservation per listing for everything accepted on it
+    reserved: dict[int, float] = {}
+    for offer, listing in accepted:
+        reserved[listing.id] = reserved.get(listing.id, 0.0) + offer.quantity_kg
+    for listing_id, quantity in reserved.items():
+        if reserve_quantity(session, listing_id, quantity) is None:
+            for offer, listing in accepted:
+                if listing.id == listing_id:
+                    results[offer.id] = OfferBatchItem(
+                        offer_id=offer.id, accepted=False, error="Insufficient quantity remaining on listing"
+                    )
+    accepted = [(offer, listing) for offer, listing in accepted if offer.id not in results]
+    
+    if accepted:
+        accepted_ids = [offer.id for offer, _ in accepted]
+        updated = session.exec(
+            update(Offer)
+            .where(Offer.id.in_(accepted_ids), Offer.status == OfferStatus.PENDING)
+            .values(status=OfferStatus.ACCEPTED, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if updated.rowcount != len(accepted_ids):
+            session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Offers changed while being accepted, please retry"
+            )
+        
+        contract_numbers = new_business_ids(CONTRACT_PREFIX, len(accepted))
+        contract_rows = [
+            {
+                "contract_number": contract_number,
+                "quantity_kg": offer.quantity_kg,
+                "unit_price_ngn": offer.unit_price_ngn,
+                "total_amount_ngn": offer.total_price_ngn,
+                "delivery_date": offer.delivery_date or now,
+                "delivery_location": offer.delivery_location,
+                "status": ContractStatus.ACTIVE,
+                "created_at": now,
+                "updated_at": now,
+                "farmer_id": listing.farmer_id,
+                "buyer_id": offer.buyer_id,
+                "listing_id": listing.id,
+                "offer_id": offer.id,
+            }
+            for (offer, listing), contract_number in zip(accepted, contract_numbers)
+        ]
+        created = session.execute(
+            insert(Contract).returning(Contract.offer_id, Contract.id, Contract.contract_number),
+            contract_rows,
+        ).all()
+        
+        # Core statements bypass the ORM flush hook that maintains counters
+        add_counts(session, [
+            change
+            for offer, listing in accepted
+            for change in (
+                (offer.buyer_id, counter_name(Offer, OfferStatus.PENDING), -1),
+                (listing.farmer_id, counter_name(Offer, OfferStatus.PENDING), -1),
+                (offer.buyer_id, counter_name(Contract, ContractStatus.ACTIVE), 1),
+                (listing.farmer_id, counter_name(Contract, ContractStatus.ACTIVE), 1),
+            )
+        ])
+        for offer_id, contract_id, contract_number in created:
+            results[offer_id] = OfferBatchItem(
+                offer_id=offer_id, accepted=True, contract_id=contract_id, contract_number=contract_number
+            )
+        record_events(session, "offer.accepted", accepted_ids)
+        record_events(session, "contract.created", [contract_id for _, contract_id, _ in created])
+    
+    session.commit()
+    
+    items = [results[offer_id] for offer_id in offer_ids]
+    accepted_count = sum(1 for item in items if item.accepted)
+    return OfferBatchResult(accepted=accepted_count, rejected=len(items) - accepted_count, results=items)
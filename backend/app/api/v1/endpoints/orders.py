@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session, select
 from app.core.auth import get_current_user, require_role
-from app.core.database import get_session
-from app.models.user import User, UserRole
+from app.core.database import get_session, get_read_session
+from app.core.identifiers import ORDER_PREFIX, new_business_id
+from app.core.policies import CONTRACT_BUYER, ORDER_CARRIER, ORDER_FARMER, ORDER_PARTY
+from app.models.user import User
 from app.models.order import Order, OrderStatus
-from app.models.contract import Contract
 from app.models.escrow import Escrow, EscrowStatus
 from app.schemas.order import OrderResponse
+from app.services.exports import export_filter, export_response
+from app.services.jobs import enqueue
 from datetime import datetime
-import uuid
 
 router = APIRouter()
 
@@ -20,20 +22,10 @@ async def create_order(
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
-    # Get the contract
-    contract = session.exec(select(Contract).where(Contract.id == contract_id)).first()
-    if not contract:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Contract not found"
-        )
-    
-    # Check if user is the buyer
-    if contract.buyer_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only buyers can create orders"
-        )
+    # Get the contract, which only its buyer may order against
+    contract = CONTRACT_BUYER.fetch(
+        session, contract_id, current_user, forbidden="Only buyers can create orders"
+    )
     
     # Check if escrow is funded
     escrow = session.exec(select(Escrow).where(Escrow.contract_id == contract_id)).first()
@@ -55,7 +47,7 @@ async def create_order(
         )
     
     # Generate order number
-    order_number = f"ORD-{uuid.uuid4().hex[:8].upper()}"
+    order_number = new_business_id(ORDER_PREFIX)
     
     # Create order
     order = Order(
@@ -77,40 +69,30 @@ async def create_order(
 @router.get("/", response_model=list[OrderResponse])
 async def get_orders(
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_read_session)
 ):
     # Users can see orders they're involved in
-    orders = session.exec(
-        select(Order).where(
-            (Order.farmer_id == current_user.id) | 
-            (Order.buyer_id == current_user.id) |
-            (Order.logistics_id == current_user.id)
-        )
-    ).all()
+    orders = session.exec(ORDER_PARTY.filter(select(Order), current_user)).all()
     
     return [OrderResponse.from_orm(order) for order in orders]
 
+@router.get("/export")
+async def export_orders(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    scope: str = Query("own", pattern="^(own|all)$"),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_read_session)
+):
+    # Full order history, streamed in batches
+    return export_response(session, Order, export_filter(ORDER_PARTY, current_user, scope), format, "orders")
+
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order(
     order_id: int,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_read_session)
 ):
-    order = session.exec(select(Order).where(Order.id == order_id)).first()
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Order not found"
-        )
-    
-    # Check if user is involved in this order
-    if (order.farmer_id != current_user.id and 
-        order.buyer_id != current_user.id and 
-        order.logistics_id != current_user.id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
+    order = ORDER_PARTY.fetch(session, order_id, current_user)
     
     return OrderResponse.from_orm(order)
 
@@ -120,19 +102,7 @@ async def confirm_order(
     current_user: User = Depends(require_role("farmer")),
     session: Session = Depends(get_session)
 ):
-    order = session.exec(select(Order).where(Order.id == order_id)).first()
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Order not found"
-        )
-    
-    # Check if user is the farmer
-    if order.farmer_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only farmers can confirm orders"
-        )
+    order = ORDER_FARMER.fetch(session, order_id, current_user, forbidden="Only farmers can confirm orders")
     
     # Check if order is in pending status
     if order.status != OrderStatus.PENDING:
@@ -156,21 +126,8 @@ async def deliver_order(
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
-    order = session.exec(select(Order).where(Order.id == order_id)).first()
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Order not found"
-        )
-    
-    # Check if user is the farmer or logistics provider
-    if (order.farmer_id != current_user.id and 
-        order.logistics_id != current_user.id and
-        current_user.role != UserRole.LOGISTICS):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
+    # Only the farmer or a logistics provider hands the goods over
+    order = ORDER_CARRIER.fetch(session, order_id, current_user)
     
     # Check if order is confirmed
     if order.status != OrderStatus.CONFIRMED:
@@ -183,14 +140,8 @@ async def deliver_order(
     order.status = OrderStatus.DELIVERED
     order.delivered_at = datetime.utcnow()
     
-    # Release escrow (in real implementation, this would trigger payment release)
-    escrow = session.exec(
-        select(Escrow).where(Escrow.contract_id == order.contract_id)
-    ).first()
-    
-    if escrow:
-        escrow.status = EscrowStatus.RELEASED
-        escrow.released_at = datetime.utcnow()
+    # Release escrow in the worker (in real implementation, this triggers payment release)
+    enqueue(session, "escrow.release", contract_id=order.contract_id)
     
     session.commit()
     session.refresh(order)
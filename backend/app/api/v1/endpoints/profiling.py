@@ -0,0 +1,82 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, Response
+from app.core.auth import require_admin
+from app.core.config import settings
+from app.core.profiling import folded, request_profiler, sampler
+from app.models.user import User
+from app.schemas.profiling import ProfiledRoute, RequestProfileSummary
+
+router = APIRouter()
+
+def _pid_header() -> dict:
+    # Each gunicorn worker profiles only itself
+    return {"X-Profiled-Pid": str(os.getpid())}
+
+@router.post("/cpu", response_class=PlainTextResponse)
+async def sample_cpu(
+    seconds: float = Query(10, gt=0, le=settings.profiling_max_seconds),
+    interval_ms: float = Query(10, ge=1, le=1000),
+    include_idle: bool = False,
+    admin_user: User = Depends(require_admin)
+):
+    """
+    Sample this worker's stacks for `seconds` and return them as folded
+    stacks (flamegraph.pl / speedscope input).
+    """
+    if not sampler.running.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already running in this worker"
+        )
+    try:
+        stacks = await run_in_threadpool(sampler.sample, seconds, interval_ms / 1000, include_idle)
+    finally:
+        sampler.running.release()
+    
+    return PlainTextResponse(folded(stacks), headers=_pid_header())
+
+@router.get("/routes", response_model=list[ProfiledRoute])
+async def get_profiled_routes(admin_user: User = Depends(require_admin)):
+    return [ProfiledRoute(path_prefix=prefix, requests=remaining) for prefix, remaining in request_profiler.armed.items()]
+
+@router.put("/routes", response_model=ProfiledRoute)
+async def profile_route(route: ProfiledRoute, admin_user: User = Depends(require_admin)):
+    """cProfile the next `requests` requests under `path_prefix` in this worker."""
+    request_profiler.arm(route.path_prefix, route.requests)
+    return route
+
+@router.delete("/routes", status_code=status.HTTP_204_NO_CONTENT)
+async def stop_profiling_routes(
+    path_prefix: str = Query(None),
+    admin_user: User = Depends(require_admin)
+):
+    request_profiler.disarm(path_prefix)
+
+@router.get("/requests", response_model=list[RequestProfileSummary])
+async def get_request_profiles(admin_user: User = Depends(require_admin)):
+    return [RequestProfileSummary.from_orm(profile) for profile in reversed(request_profiler.profiles)]
+
+@router.get("/requests/{profile_id}")
+async def get_request_profile(
+    profile_id: int,
+    format: str = Query("text", pattern="^(text|pstats)$"),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls)$"),
+    limit: int = Query(50, ge=1, le=1000),
+    admin_user: User = Depends(require_admin)
+):
+    profile = request_profiler.get(profile_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    
+    if format == "pstats":
+        return Response(
+            profile.dump(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="request-{profile.id}.pstats"', **_pid_header()},
+        )
+    return PlainTextResponse(profile.report(sort, limit), headers=_pid_header())
@@ -1,25 +1,30 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlmodel import Session, select
 from app.core.config import settings
 from app.core.database import get_session
+from app.core.tokens import get_token_codec
+from app.core.tracing import traced
 from app.models.user import User
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # JWT token scheme
 security = HTTPBearer()
 
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    # passlib and its bcrypt backend are only needed by register/login, so they
+    # are loaded on first use instead of at import time (keeps cold start fast)
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -29,16 +34,13 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
     
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm="HS256")
-    return encoded_jwt
+    return get_token_codec().encode(to_encode)
 
 def verify_token(token: str) -> Optional[dict]:
-    try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=["HS256"])
-        return payload
-    except JWTError:
-        return None
+    # Signature, key id and expiry checks; repeat calls hit the claims cache
+    return get_token_codec().decode(token)
 
+@traced()
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     session: Session = Depends(get_session)
@@ -58,6 +60,11 @@ async def get_current_user(
     if user_id is None:
         raise credentials_exception
     
+    # Logged-out or compromised sessions; imported here: sessions imports this module
+    from app.core.sessions import revocations
+    if payload.get("sid") and revocations.is_revoked(payload["sid"]):
+        raise credentials_exception
+    
     user = session.exec(select(User).where(User.id == int(user_id))).first()
     if user is None:
         raise credentials_exception
@@ -5,19 +5,146 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "postgresql+psycopg2://agrilink_user:agrilink_password@db:5432/agrilink"
     
+    # Read replicas used by read-only endpoints (JSON list in the environment)
+    database_replica_urls: list[str] = []
+    replica_health_check_interval: float = 10.0
+    # After a user's own write, their reads stay on the primary this long
+    read_your_writes_seconds: float = 5.0
+    
+    # Redis (optional; features fall back to per-process state without it)
+    redis_url: Optional[str] = None
+    redis_socket_timeout: float = 0.1
+    
     # Security
     secret_key: str = "your-secret-key-change-in-production"
-    access_token_expire_minutes: int = 120
+    access_token_expire_minutes: int = 15
+    # Rotating refresh tokens renew access tokens without a password
+    refresh_token_expire_days: int = 30
+    # Signing key ring for access tokens (JSON object of key id -> secret) and
+    # the key id that signs new tokens; empty means SECRET_KEY alone
+    jwt_keys: dict[str, str] = {}
+    jwt_active_kid: Optional[str] = None
+    # Verified tokens kept per worker until they expire
+    jwt_cache_size: int = 10000
     
     # Payment
     psp_mock_secret: str = "mock-psp-secret"
     
     # File storage
     file_storage_dir: str = "/app/storage"
+    # Hand file transfers to nginx (X-Accel-Redirect to this internal location)
+    file_accel_redirect: bool = False
+    file_accel_prefix: str = "/_protected/storage/"
+    # KYC review previews (longest side in pixels, JPEG quality)
+    kyc_preview_max_px: int = 1600
+    kyc_thumbnail_max_px: int = 320
+    kyc_preview_quality: int = 80
     
     # CORS
     allowed_origins: list = ["http://localhost:3000", "http://frontend:3000"]
     
+    # Rate limiting (per user, per route token buckets; Redis-backed when configured)
+    rate_limit_enabled: bool = True
+    rate_limit_per_second: float = 20.0
+    rate_limit_burst: int = 40
+    # Peers (addresses or networks) whose X-Real-IP / X-Forwarded-For is believed
+    trusted_proxies: list[str] = ["127.0.0.1", "::1"]
+    
+    # Load shedding (per worker): answer 503 instead of queueing
+    shed_max_in_flight: int = 200
+    shed_max_pool_wait_ms: float = 250.0
+    
+    # Order-book matching engine; enable in exactly one process (the market service)
+    matching_engine_enabled: bool = False
+    matching_batch_size: int = 500
+    matching_flush_interval: float = 0.05
+    matching_sync_interval: float = 1.0
+    # Longest write transaction on listings: each sync re-reads this much (plus
+    # the sync interval) before the previous one
+    matching_sync_overlap: float = 30.0
+    # Fills failing to persist are retried alone with backoff, then dropped
+    matching_write_attempts: int = 5
+    matching_retry_backoff: float = 0.5
+    
+    # SMS/email notifications of trade events, sent by a background thread per process
+    notifications_enabled: bool = False
+    notification_channels: list[str] = ["email", "sms"]
+    # Providers: smtp (email only), file (JSON lines in the outbox dir) or loopback
+    notification_email_provider: str = "file"
+    notification_sms_provider: str = "file"
+    notification_outbox_dir: str = "outbox"
+    # Messages to one recipient within the window go out as one SMS/email
+    notification_batch_window: float = 2.0
+    notification_poll_interval: float = 0.5
+    # Sends per second per provider (token bucket, shared through Redis)
+    notification_rate_per_second: float = 10.0
+    notification_burst: int = 20
+    notification_max_attempts: int = 5
+    notification_retry_backoff: float = 2.0
+    # How long a stopping process keeps sending (below GRACEFUL_TIMEOUT)
+    notification_shutdown_timeout: float = 10.0
+    smtp_host: Optional[str] = None
+    smtp_port: int = 587
+    smtp_username: Optional[str] = None
+    smtp_password: Optional[str] = None
+    smtp_from: str = "AgriLink <no-reply@agrilink.ng>"
+    
+    # Background jobs (worker.py): Redis when REDIS_URL is set, else the job table
+    job_concurrency: int = 4
+    job_poll_interval: float = 1.0
+    # A claimed job not finished within its lease is run again
+    job_lease_seconds: int = 300
+    job_max_attempts: int = 5
+    # Retry n waits job_retry_backoff * 2^(n-1) seconds
+    job_retry_backoff: float = 10.0
+    job_retention_days: int = 7
+    
+    # Rows fetched (and streamed as one chunk) per batch by the export endpoints
+    export_batch_size: int = 1000
+    
+    # Logging (app.core.logs): JSON lines (or text) on stdout via a background thread
+    log_level: str = "INFO"
+    log_format: str = "json"
+    log_queue_size: int = 10000
+    # SQL statements (replaces engine echo); verbose, so sampled per request
+    log_sql: bool = False
+    # Share of requests whose DEBUG and SQL records are kept
+    log_verbose_sample_rate: float = 0.01
+    # Share of successful requests logged; errors and slow requests always are
+    log_request_sample_rate: float = 1.0
+    log_slow_request_ms: float = 1000.0
+    
+    # Tracing (app.core.tracing): OpenTelemetry SDK, off by default
+    tracing_enabled: bool = False
+    tracing_service_name: str = "agrilink-backend"
+    # otlp (OTLP/HTTP collector), file (JSON lines) or console
+    tracing_exporter: str = "otlp"
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    tracing_file: str = "traces.jsonl"
+    # Share of new traces recorded; a sampled caller's decision is followed
+    tracing_sample_rate: float = 0.1
+    
+    # Health probes (app.core.health)
+    health_check_timeout: float = 1.0
+    # Results shared by all probes within this window
+    health_cache_seconds: float = 1.0
+    
+    # Admin profiling endpoints (app.core.profiling), per worker process
+    profiling_max_seconds: int = 60
+    # Request profiles kept in memory for download
+    profiling_keep: int = 50
+    
+    # Server (gunicorn.conf.py); web_concurrency=None sizes workers to the CPU count
+    web_concurrency: Optional[int] = None
+    max_workers: int = 16
+    bind: str = "0.0.0.0:8000"
+    preload_app: bool = True
+    max_requests: int = 2000
+    max_requests_jitter: int = 200
+    graceful_timeout: int = 30
+    worker_timeout: int = 60
+    keepalive: int = 5
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -1,18 +1,195 @@
+import itertools
+import threading
+import time
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import QueuePool
 from sqlmodel import SQLModel, create_engine, Session
-from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import settings
+from app.core.redis import get_redis
+from app.core.tracing import traced
+
+class PoolWaitStats:
+    """Moving average of how long requests waited for a pooled connection."""
+
+    def __init__(self, alpha: float = 0.2, horizon: float = 2.0):
+        self.alpha = alpha
+        self.horizon = horizon
+        self.average_ms = 0.0
+        self.sampled_at = 0.0
+
+    def record(self, wait_ms: float):
+        self.average_ms += self.alpha * (wait_ms - self.average_ms)
+        self.sampled_at = time.monotonic()
+
+    def recent_ms(self) -> float:
+        # Without fresh checkouts (e.g. while load is being shed) the pool is
+        # no longer under pressure, so stale samples must not keep it "busy"
+        if time.monotonic() - self.sampled_at > self.horizon:
+            return 0.0
+        return self.average_ms
+
+pool_wait = PoolWaitStats()
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records checkout wait time for load shedding."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait.record((time.perf_counter() - start) * 1000)
+
+def _pool_options(url: str) -> dict:
+    # SQLite uses single-connection pools where waiting is not meaningful
+    return {} if url.startswith("sqlite") else {"poolclass": TimedQueuePool}
 
 # Create database engine
 engine = create_engine(
     settings.database_url,
-    echo=True,  # Set to False in production
+    # SQL logging goes through app.core.logs (LOG_SQL), never engine echo
+    echo=False,
     pool_pre_ping=True,
     pool_recycle=300,
+    **_pool_options(settings.database_url),
 )
 
+class ReplicaRouter:
+    """
+    Round-robin over read replicas, skipping replicas that failed their last
+    health check. Each replica is re-checked with a `SELECT 1` at most once per
+    `health_check_interval`; a disconnect seen during a query marks it down
+    immediately. Returns None when no replica is usable so callers fall back
+    to the primary.
+    """
+
+    def __init__(self, urls: list[str], health_check_interval: float):
+        self.engines = [
+            create_engine(url, pool_pre_ping=True, pool_recycle=300)
+            for url in urls
+        ]
+        self.health_check_interval = health_check_interval
+        self._healthy = [True] * len(self.engines)
+        self._checked_at = [0.0] * len(self.engines)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+        for index, replica in enumerate(self.engines):
+            event.listen(replica, "handle_error", self._on_error(index))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    def _on_error(self, index: int):
+        def handle_error(context):
+            if context.is_disconnect:
+                self._healthy[index] = False
+                self._checked_at[index] = time.monotonic()
+        return handle_error
+
+    def _is_healthy(self, index: int) -> bool:
+        with self._lock:
+            due = time.monotonic() - self._checked_at[index] >= self.health_check_interval
+            if due:
+                # Claim the check so concurrent requests keep using the last result
+                self._checked_at[index] = time.monotonic()
+        if due:
+            try:
+                with self.engines[index].connect() as connection:
+                    connection.execute(text("SELECT 1"))
+                self._healthy[index] = True
+            except SQLAlchemyError:
+                self._healthy[index] = False
+        return self._healthy[index]
+
+    def dispose(self, close: bool = True):
+        """Replace every replica's pool; close=False leaves inherited sockets to the parent process."""
+        for replica in self.engines:
+            replica.dispose(close=close)
+
+    def pick(self):
+        for _ in range(len(self.engines)):
+            index = next(self._counter) % len(self.engines)
+            if self._is_healthy(index):
+                return self.engines[index]
+        return None
+
+class ReadYourWrites:
+    """
+    Remembers users who just wrote through the primary so their reads skip the
+    (possibly lagging) replicas for `window` seconds. Stored in Redis when
+    configured so the window holds across workers, otherwise per process.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._local: dict[str, float] = {}
+
+    def mark(self, subject: str):
+        client = get_redis()
+        if client is not None:
+            try:
+                client.set(f"rw:primary:{subject}", 1, px=int(self.window * 1000))
+                return
+            except Exception:
+                pass
+        if len(self._local) > 10000:
+            now = time.monotonic()
+            self._local = {key: until for key, until in self._local.items() if until > now}
+        self._local[subject] = time.monotonic() + self.window
+
+    def is_sticky(self, subject: str) -> bool:
+        client = get_redis()
+        if client is not None:
+            try:
+                return bool(client.exists(f"rw:primary:{subject}"))
+            except Exception:
+                pass
+        return self._local.get(subject, 0.0) > time.monotonic()
+
+replica_router = ReplicaRouter(settings.database_replica_urls, settings.replica_health_check_interval)
+read_your_writes = ReadYourWrites(settings.read_your_writes_seconds)
+
+def _request_subject(authorization: Optional[str]) -> Optional[str]:
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    # Imported here: app.core.auth depends on this module
+    from app.core.auth import verify_token
+    payload = verify_token(authorization[7:])
+    return payload.get("sub") if payload else None
+
+@event.listens_for(Session, "after_flush")
+def _remember_write(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(Session, "after_commit")
+def _stick_writer_to_primary(session):
+    if session.info.pop("wrote", False) and replica_router.enabled:
+        subject = _request_subject(session.info.get("authorization"))
+        if subject:
+            read_your_writes.mark(subject)
+
 # Dependency to get database session
-def get_session():
+@traced()
+def get_session(request: Request):
     with Session(engine) as session:
+        session.info["authorization"] = request.headers.get("authorization")
+        yield session
+
+# Dependency for read-only endpoints: served by a replica when one is
+# configured and healthy, unless the caller wrote something moments ago
+@traced()
+def get_read_session(request: Request):
+    bind = engine
+    if replica_router.enabled:
+        subject = _request_subject(request.headers.get("authorization"))
+        if not (subject and read_your_writes.is_sticky(subject)):
+            bind = replica_router.pick() or engine
+    with Session(bind) as session:
         yield session
 
 # Create database tables
@@ -0,0 +1,116 @@
+"""
+Serving stored files after the endpoint has authorized the request.
+
+Behind nginx (``FILE_ACCEL_REDIRECT=true``) the backend only answers with an
+``X-Accel-Redirect`` to the internal ``FILE_ACCEL_PREFIX`` location; nginx
+then sends the file itself with sendfile, range requests and conditional
+GETs, so no worker is held for the transfer. Without nginx (development,
+tests) the file is streamed by the backend, with single byte ranges honoured
+so that PDF viewers and media players can seek.
+
+Cache headers come from the backend in both cases (nginx keeps
+Content-Type, Content-Disposition and Cache-Control of the redirecting
+response). Stored documents are personal data: they are only ever cached
+privately by the requesting browser.
+"""
+import mimetypes
+import os
+import re
+from typing import Optional
+from urllib.parse import quote
+from fastapi import HTTPException, Request, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from app.core.config import settings
+from app.core.tracing import span
+
+PRIVATE_CACHE = "private, max-age=300"
+CHUNK_SIZE = 64 * 1024
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def storage_path(path: Optional[str]) -> Optional[str]:
+    """`path` resolved inside FILE_STORAGE_DIR, or None if it points elsewhere."""
+    if not path:
+        return None
+    root = os.path.realpath(settings.file_storage_dir)
+    resolved = os.path.realpath(path if os.path.isabs(path) else os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        return None
+    return resolved
+
+def _byte_range(header: Optional[str], size: int):
+    """(start, end) of a single satisfiable range, None for the whole file."""
+    match = _RANGE.match(header or "")
+    if not match or not any(match.groups()):
+        # Absent, malformed or multi-range: answering with the whole file is allowed
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+def _chunks(path: str, start: int, length: int):
+    with open(path, "rb") as source:
+        source.seek(start)
+        while length > 0:
+            chunk = source.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+def send_file(
+    request: Request,
+    path: Optional[str],
+    media_type: Optional[str] = None,
+    filename: Optional[str] = None,
+    cache_control: str = PRIVATE_CACHE,
+) -> Response:
+    """Response sending the stored file at `path`; 404 if it is missing or outside storage."""
+    with span("storage.stat", **{"file.path": path or ""}):
+        resolved = storage_path(path)
+        if not resolved or not os.path.isfile(resolved):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="File not found"
+            )
+
+    media_type = media_type or mimetypes.guess_type(resolved)[0] or "application/octet-stream"
+    headers = {
+        "Cache-Control": cache_control,
+        "Content-Disposition": f"inline; filename*=utf-8''{quote(filename or os.path.basename(resolved))}",
+        "X-Content-Type-Options": "nosniff",
+    }
+
+    if settings.file_accel_redirect:
+        relative = os.path.relpath(resolved, os.path.realpath(settings.file_storage_dir))
+        headers["X-Accel-Redirect"] = settings.file_accel_prefix.rstrip("/") + "/" + quote(relative.replace(os.sep, "/"))
+        return Response(media_type=media_type, headers=headers)
+
+    size = os.path.getsize(resolved)
+    byte_range = _byte_range(request.headers.get("range"), size)
+    if byte_range is None:
+        response = FileResponse(resolved, media_type=media_type, headers=headers)
+        response.headers["Accept-Ranges"] = "bytes"
+        return response
+    start, end = byte_range
+    headers.update({
+        "Accept-Ranges": "bytes",
+        "Content-Range": f"bytes {start}-{end}/{size}",
+        "Content-Length": str(end - start + 1),
+    })
+    return StreamingResponse(
+        _chunks(resolved, start, end - start + 1),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers,
+    )
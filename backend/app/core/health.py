@@ -0,0 +1,150 @@
+"""
+Dependency checks behind the health and readiness probes.
+
+Each check runs in the thread pool under ``HEALTH_CHECK_TIMEOUT``, so a hung
+database or NFS mount makes the probe fail fast instead of hanging it:
+
+* database: ``SELECT 1`` (no ORM) on a connection of its own, opened outside
+  the request pool with a connect and statement timeout on PostgreSQL, so
+  a pool exhausted by slow requests is not mistaken for a database outage;
+* redis: ``PING`` when ``REDIS_URL`` is set;
+* storage: the file storage directory is writable, plus its free space.
+
+Only the database decides readiness; Redis and storage failures leave the
+process serving (every Redis user falls back to local state) and are
+reported as ``degraded``. Request pool usage is reported alongside, for
+monitoring only. Results are cached for ``HEALTH_CACHE_SECONDS``
+and concurrent probes share one run, so a burst of probes from several
+load balancers costs one round of checks per worker.
+"""
+import asyncio
+import math
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+from app.core import database
+from app.core.config import settings
+from app.core.redis import get_redis
+
+STARTED = time.monotonic()
+
+class Disabled(Exception):
+    """The dependency is not configured for this deployment."""
+
+_probe_engine = None
+_probe_lock = threading.Lock()
+
+def probe_engine():
+    """
+    Engine for the database check, separate from the request pool. NullPool
+    opens a fresh connection per probe, which is also what a new worker
+    would need; the cache keeps that to one per HEALTH_CACHE_SECONDS.
+    """
+    global _probe_engine
+    url = database.engine.url
+    with _probe_lock:
+        if _probe_engine is None or _probe_engine.url != url:
+            connect_args = {}
+            if url.get_backend_name() == "postgresql":
+                timeout = settings.health_check_timeout
+                connect_args = {
+                    # libpq takes whole seconds
+                    "connect_timeout": max(1, math.ceil(timeout)),
+                    "options": f"-c statement_timeout={int(timeout * 1000)}",
+                }
+            _probe_engine = create_engine(url, poolclass=NullPool, connect_args=connect_args)
+        return _probe_engine
+
+def check_database() -> dict:
+    with probe_engine().connect() as connection:
+        connection.execute(text("SELECT 1"))
+    return {}
+
+def check_redis() -> dict:
+    client = get_redis()
+    if client is None:
+        raise Disabled()
+    client.ping()
+    return {}
+
+def check_storage() -> dict:
+    path = settings.file_storage_dir
+    if not os.path.isdir(path) or not os.access(path, os.W_OK):
+        raise PermissionError(f"{path} is not a writable directory")
+    return {"free_bytes": shutil.disk_usage(path).free}
+
+def pool_stats() -> dict:
+    """Connection pool usage of the primary engine (reported, never a readiness input)."""
+    pool = database.engine.pool
+    stats = {"wait_ms": round(database.pool_wait.recent_ms(), 2)}
+    if hasattr(pool, "checkedout"):
+        capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "saturation": round(pool.checkedout() / capacity, 2) if capacity else None,
+        })
+    return stats
+
+CHECKS = {"database": check_database, "redis": check_redis, "storage": check_storage}
+REQUIRED = ("database",)
+
+class HealthChecker:
+    def __init__(self, checks: dict = CHECKS, required: tuple = REQUIRED):
+        self.checks = checks
+        self.required = required
+        self._cached: Optional[dict] = None
+        self._checked_at = 0.0
+        self._pending: Optional[asyncio.Future] = None
+
+    async def _run(self, check) -> dict:
+        started = time.perf_counter()
+        try:
+            result = {"status": "ok", **await asyncio.wait_for(run_in_threadpool(check), settings.health_check_timeout)}
+        except Disabled:
+            return {"status": "disabled"}
+        except asyncio.TimeoutError:
+            result = {"status": "error", "error": "timed out"}
+        except Exception as exc:
+            # Class name only: probes are reachable from outside
+            result = {"status": "error", "error": type(exc).__name__}
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+
+    async def _check(self) -> dict:
+        results = await asyncio.gather(*(self._run(check) for check in self.checks.values()))
+        checks = dict(zip(self.checks, results))
+        ready = all(checks[name]["status"] == "ok" for name in self.required)
+        if not ready:
+            overall = "unavailable"
+        elif any(result["status"] == "error" for result in checks.values()):
+            overall = "degraded"
+        else:
+            overall = "ok"
+        self._cached = {
+            "status": overall,
+            "ready": ready,
+            "checked_at": datetime.utcnow().isoformat(),
+            "uptime_s": round(time.monotonic() - STARTED, 1),
+            "checks": checks,
+            "pool": pool_stats(),
+        }
+        self._checked_at = time.monotonic()
+        return self._cached
+
+    async def report(self) -> dict:
+        if self._cached is not None and time.monotonic() - self._checked_at < settings.health_cache_seconds:
+            return self._cached
+        if self._pending is None or self._pending.done():
+            self._pending = asyncio.ensure_future(self._check())
+        # Shielded: a probe that gives up must not cancel the run others wait on
+        return await asyncio.shield(self._pending)
+
+checker = HealthChecker()
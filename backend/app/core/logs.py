@@ -0,0 +1,222 @@
+"""
+Structured logging.
+
+Every process (web workers, worker.py) logs one JSON object per line to
+stdout (``LOG_FORMAT=text`` for a readable development format). Callers only
+enqueue records: formatting and writing happen on a background thread fed
+by a bounded queue, so a slow stdout/log shipper never blocks a request and
+a full queue drops records (counted in `stats.dropped`) instead of stalling.
+
+`RequestLogMiddleware` gives each request an id (nginx's ``X-Request-ID``
+when present, echoed back on the response) that is attached to every record
+logged while handling it, and writes one ``request`` record per request
+with its status, duration and database time.
+
+Sampling keeps volume bounded under load:
+
+* the request record is written for ``LOG_REQUEST_SAMPLE_RATE`` of
+  successful requests, and always for errors and requests slower than
+  ``LOG_SLOW_REQUEST_MS``;
+* verbose records (DEBUG, and SQL statements when ``LOG_SQL`` is on) are
+  kept for ``LOG_VERBOSE_SAMPLE_RATE`` of requests, decided once per request
+  so a sampled request is logged completely.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger("app.request")
+
+# Loggers whose INFO records are verbose output, sampled like DEBUG
+VERBOSE_LOGGERS = ("sqlalchemy.engine",)
+
+_STANDARD_ATTRIBUTES = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime", "request_id"}
+
+class RequestContext:
+    __slots__ = ("request_id", "verbose", "db_queries", "db_ms")
+
+    def __init__(self, request_id: str, verbose: bool):
+        self.request_id = request_id
+        self.verbose = verbose
+        self.db_queries = 0
+        self.db_ms = 0.0
+
+_context: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+def current_request_id() -> Optional[str]:
+    context = _context.get()
+    return context.request_id if context else None
+
+class LogStats:
+    def __init__(self):
+        self.dropped = 0
+
+stats = LogStats()
+
+class ContextFilter(logging.Filter):
+    """Tags records with the request id and drops verbose records of unsampled requests."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _context.get()
+        record.request_id = context.request_id if context else None
+        if context is None or context.verbose or record.levelno >= logging.WARNING:
+            return True
+        return record.levelno > logging.DEBUG and not record.name.startswith(VERBOSE_LOGGERS)
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of blocking."""
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            stats.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render message and traceback here, where the arguments are still
+        # valid; the listener thread only serializes plain data
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, default=str)
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        if not getattr(record, "request_id", None):
+            record.request_id = "-"
+        return super().format(record)
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[NonBlockingQueueHandler] = None
+
+def _start_listener():
+    global _listener
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if settings.log_format == "json" else TextFormatter())
+    _handler.queue = queue.Queue(maxsize=settings.log_queue_size)
+    _listener = QueueListener(_handler.queue, output)
+    _listener.start()
+
+def _restart_after_fork():
+    # The listener thread does not survive a fork (gunicorn workers with
+    # preload_app): give the child its own queue and thread
+    if _handler is not None:
+        _start_listener()
+
+def configure_logging():
+    """Route all logging through the background queue; safe to call more than once."""
+    global _handler
+    if _handler is not None:
+        return
+    _handler = NonBlockingQueueHandler(queue.Queue())
+    _handler.addFilter(ContextFilter())
+    _start_listener()
+
+    root = logging.getLogger()
+    root.handlers = [_handler]
+    root.setLevel(settings.log_level.upper())
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if settings.log_sql else logging.WARNING)
+    # Requests are logged by RequestLogMiddleware
+    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+
+    os.register_at_fork(after_in_child=_restart_after_fork)
+    atexit.register(lambda: _listener and _listener.stop())
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    if _context.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    request = _context.get()
+    started = conn.info.get("query_started")
+    if request is not None and started:
+        request.db_queries += 1
+        request.db_ms += (time.perf_counter() - started.pop()) * 1000
+
+class RequestLogMiddleware:
+    """Assigns request ids, times requests and writes the sampled request log."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1")[:64] or uuid.uuid4().hex
+        context = RequestContext(request_id, random.random() < settings.log_verbose_sample_rate)
+        token = _context.set(context)
+        response_status = 500
+        started = time.perf_counter()
+
+        async def send_with_id(message):
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if (
+                response_status >= 400
+                or duration_ms >= settings.log_slow_request_ms
+                or random.random() < settings.log_request_sample_rate
+            ):
+                logger.log(
+                    logging.WARNING if response_status >= 500 else logging.INFO,
+                    "%s %s %d", scope["method"], scope["path"], response_status,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": response_status,
+                        "duration_ms": round(duration_ms, 2),
+                        "db_queries": context.db_queries,
+                        "db_ms": round(context.db_ms, 2),
+                    },
+                )
+            _context.reset(token)
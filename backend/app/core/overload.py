@@ -0,0 +1,45 @@
+import json
+from app.core.config import settings
+from app.core import database
+
+class LoadSheddingMiddleware:
+    """
+    Rejects requests with 503 before they queue when the worker is overloaded:
+    too many requests already in flight, or requests recently waiting longer
+    than the threshold for a database connection. Health probes are exempt.
+    """
+
+    def __init__(self, app, exempt_prefixes: tuple = ("/health", "/api/v1/health")):
+        self.app = app
+        self.exempt_prefixes = exempt_prefixes
+        self.in_flight = 0
+
+    def overloaded(self) -> bool:
+        if self.in_flight >= settings.shed_max_in_flight:
+            return True
+        return database.pool_wait.recent_ms() > settings.shed_max_pool_wait_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        if self.overloaded():
+            body = json.dumps({"detail": "Server overloaded, retry shortly"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", b"1"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
@@ -0,0 +1,136 @@
+"""
+Declarative ownership policies, evaluated in SQL.
+
+A `Policy` states who may act on rows of a model as a predicate built from
+the current user, e.g. "the farmer who owns the offer's listing". Endpoints
+use it in two ways, both without loading parent rows first:
+
+* `policy.fetch(session, id, user)` selects the row together with the
+  predicate's value in one query (joining parents the predicate needs) and
+  raises 404 when the row does not exist, 403 when the user may not act on it;
+* `policy.filter(statement, user)` adds the joins and predicate to a listing
+  query so only permitted rows come back.
+
+Role checks stay with `require_role` / `require_admin` in app.core.auth;
+a rule may still look at the user's role to decide which predicate applies.
+"""
+from typing import Callable, Optional, Sequence
+from fastapi import HTTPException, status
+from sqlalchemy import select, true
+from sqlmodel import Session
+from app.models.user import User, UserRole
+from app.models.farm import Farm
+from app.models.listing import Listing
+from app.models.offer import Offer
+from app.models.contract import Contract
+from app.models.escrow import Escrow
+from app.models.order import Order
+from app.models.buy_order import BuyOrder
+from app.models.kyc import KYC
+
+class Policy:
+    def __init__(self, model, rule: Callable[[User], object], joins: Sequence[tuple] = (), name: Optional[str] = None):
+        self.model = model
+        self.rule = rule
+        # (parent model, on clause) the rule's predicate refers to
+        self.joins = list(joins)
+        self.name = name or model.__name__
+
+    def predicate(self, user: User):
+        return self.rule(user)
+
+    def _joined(self, statement, include=()):
+        for parent, onclause in self.joins:
+            statement = statement.join(parent, onclause)
+        for entity in include:
+            if entity not in (parent for parent, _ in self.joins):
+                raise ValueError(f"{entity.__name__} is not joined by the {self.name} policy")
+        return statement
+
+    def filter(self, statement, user: User):
+        """`statement` (selecting the policy's model) narrowed to rows `user` may act on."""
+        return self._joined(statement).where(self.predicate(user))
+
+    def fetch(
+        self,
+        session: Session,
+        object_id: int,
+        user: User,
+        include: Sequence = (),
+        options: Sequence = (),
+        not_found: Optional[str] = None,
+        forbidden: str = "Not enough permissions",
+        not_found_status: int = status.HTTP_404_NOT_FOUND,
+    ):
+        """
+        Load the row with id `object_id` (plus joined parents in `include`)
+        in one query, enforcing the policy. Returns the row, or a tuple of
+        the row and the included parents.
+        """
+        statement = self._joined(
+            select(self.model, *include, self.predicate(user).label("allowed")),
+            include,
+        ).where(self.model.id == object_id)
+        if options:
+            statement = statement.options(*options)
+        row = session.execute(statement).first()
+        if row is None:
+            raise HTTPException(
+                status_code=not_found_status,
+                detail=not_found or f"{self.name} not found"
+            )
+        if not row.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=forbidden
+            )
+        return row[0] if not include else tuple(row[:-1])
+
+def _farmer(user: User) -> bool:
+    return user.role == UserRole.FARMER
+
+_offer_listing = (Listing, Listing.id == Offer.listing_id)
+
+# Farms and listings
+FARM_OWNER = Policy(Farm, lambda user: Farm.farmer_id == user.id, name="Farm")
+# Non-farmers browse all farms; farmers only see their own
+FARM_VIEWER = Policy(Farm, lambda user: Farm.farmer_id == user.id if _farmer(user) else true(), name="Farm")
+LISTING_OWNER = Policy(Listing, lambda user: Listing.farmer_id == user.id, name="Listing")
+
+# Offers: the selling farmer (owner of the listing) or the buyer who made it
+OFFER_SELLER = Policy(Offer, lambda user: Listing.farmer_id == user.id, joins=[_offer_listing], name="Offer")
+OFFER_VIEWER = Policy(
+    Offer,
+    lambda user: Listing.farmer_id == user.id if _farmer(user) else Offer.buyer_id == user.id,
+    joins=[_offer_listing],
+    name="Offer",
+)
+
+# Contracts, escrows and orders: the parties to the deal
+CONTRACT_PARTY = Policy(
+    Contract, lambda user: (Contract.farmer_id == user.id) | (Contract.buyer_id == user.id), name="Contract"
+)
+CONTRACT_BUYER = Policy(Contract, lambda user: Contract.buyer_id == user.id, name="Contract")
+ESCROW_PARTY = Policy(
+    Escrow, lambda user: (Escrow.buyer_id == user.id) | (Escrow.seller_id == user.id), name="Escrow"
+)
+ESCROW_BUYER = Policy(Escrow, lambda user: Escrow.buyer_id == user.id, name="Escrow")
+ORDER_PARTY = Policy(
+    Order,
+    lambda user: (Order.farmer_id == user.id) | (Order.buyer_id == user.id) | (Order.logistics_id == user.id),
+    name="Order",
+)
+ORDER_FARMER = Policy(Order, lambda user: Order.farmer_id == user.id, name="Order")
+# Whoever hands the goods over: the farmer, the assigned provider or any logistics user
+ORDER_CARRIER = Policy(
+    Order,
+    lambda user: true() if user.role == UserRole.LOGISTICS
+    else (Order.farmer_id == user.id) | (Order.logistics_id == user.id),
+    name="Order",
+)
+
+# Market
+BUY_ORDER_OWNER = Policy(BuyOrder, lambda user: BuyOrder.buyer_id == user.id, name="Buy order")
+
+# Identity documents: the applicant, and admins reviewing them
+KYC_VIEWER = Policy(KYC, lambda user: true() if user.role == UserRole.ADMIN else KYC.user_id == user.id, name="KYC")
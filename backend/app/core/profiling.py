@@ -0,0 +1,166 @@
+"""
+On-demand profiling of a running worker process (admin endpoints in
+app.api.v1.endpoints.profiling).
+
+Two tools, both per process: with several gunicorn workers a call profiles
+whichever worker served it (its pid is returned with the result).
+
+* `StackSampler` samples the Python stacks of every thread each few
+  milliseconds for a fixed time and returns them in the folded
+  ``frame;frame;frame count`` format read by flamegraph.pl, speedscope and
+  inferno. Sampling costs one stack walk per interval, so it is safe to run
+  against production traffic. Idle threads (waiting on locks, queues or the
+  event loop's selector) are left out unless asked for.
+* `RequestProfiler` runs cProfile around the next N requests whose path
+  starts with an armed prefix. cProfile slows the profiled request
+  noticeably and only sees the event loop thread, so one request is profiled
+  at a time; coroutines of other requests that run meanwhile show up in its
+  profile too.
+"""
+import cProfile
+import io
+import itertools
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+from app.core.config import settings
+
+# Leaf frames in these modules mean the thread is waiting, not working
+_IDLE_MODULES = ("threading.py", "selectors.py", "queue.py", "socket.py", "ssl.py")
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__") or os.path.basename(code.co_filename)
+    return f"{module}:{code.co_name}"
+
+class StackSampler:
+    """Samples all threads' stacks; one sampling run at a time per process."""
+
+    def __init__(self):
+        self.running = threading.Lock()
+
+    def sample(self, seconds: float, interval: float = 0.01, include_idle: bool = False) -> Counter:
+        """Folded stacks seen over `seconds` (blocking), counted per stack."""
+        stacks = Counter()
+        own = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                if not include_idle and frame.f_code.co_filename.endswith(_IDLE_MODULES):
+                    continue
+                names = []
+                while frame is not None:
+                    names.append(_frame_name(frame))
+                    frame = frame.f_back
+                stacks[";".join(reversed(names))] += 1
+            time.sleep(interval)
+        return stacks
+
+def folded(stacks: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+sampler = StackSampler()
+
+@dataclass
+class RequestProfile:
+    id: int
+    method: str
+    path: str
+    status: int
+    duration_ms: float
+    captured_at: datetime
+    profile: cProfile.Profile = field(repr=False)
+
+    def report(self, sort: str = "cumulative", limit: int = 50) -> str:
+        output = io.StringIO()
+        pstats.Stats(self.profile, stream=output).sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+    def dump(self) -> bytes:
+        """The profile in pstats' file format (for snakeviz, gprof2dot, pstats)."""
+        return marshal.dumps(self.profile.stats)
+
+class RequestProfiler:
+    def __init__(self, keep: int):
+        # Path prefix -> requests still to profile
+        self.armed: dict[str, int] = {}
+        self.profiles: deque[RequestProfile] = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self._active = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def arm(self, path_prefix: str, requests: int):
+        with self._lock:
+            self.armed[path_prefix] = requests
+
+    def disarm(self, path_prefix: Optional[str] = None):
+        with self._lock:
+            if path_prefix is None:
+                self.armed.clear()
+            else:
+                self.armed.pop(path_prefix, None)
+
+    def _claim(self, path: str) -> bool:
+        with self._lock:
+            for prefix, remaining in self.armed.items():
+                if path.startswith(prefix):
+                    if remaining <= 1:
+                        del self.armed[prefix]
+                    else:
+                        self.armed[prefix] = remaining - 1
+                    return True
+        return False
+
+    def get(self, profile_id: int) -> Optional[RequestProfile]:
+        return next((profile for profile in self.profiles if profile.id == profile_id), None)
+
+    def record(self, scope, status: int, duration_ms: float, profile: cProfile.Profile):
+        profile.create_stats()
+        self.profiles.append(RequestProfile(
+            next(self._ids), scope["method"], scope["path"], status, round(duration_ms, 2), datetime.utcnow(), profile,
+        ))
+
+request_profiler = RequestProfiler(keep=settings.profiling_keep)
+
+class ProfilingMiddleware:
+    """cProfiles requests on armed paths; free when nothing is armed."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        profiler = request_profiler
+        if scope["type"] != "http" or not profiler.armed or not profiler._active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        if not profiler._claim(scope["path"]):
+            profiler._active.release()
+            await self.app(scope, receive, send)
+            return
+
+        response_status = 500
+
+        async def send_with_status(message):
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+            await send(message)
+
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            profile.disable()
+            profiler._active.release()
+            profiler.record(scope, response_status, (time.perf_counter() - started) * 1000, profile)
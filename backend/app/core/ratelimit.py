@@ -0,0 +1,156 @@
+import functools
+import ipaddress
+import logging
+import math
+import threading
+import time
+from typing import Optional
+from fastapi import HTTPException, Request, status
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Atomic token bucket refill + take, timed by the Redis server clock so every
+# worker sees the same bucket. Returns {allowed, seconds_until_next_token}.
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(retry_after)}
+"""
+
+class LocalTokenBuckets:
+    """Per-process token buckets, used when Redis is unavailable."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: int) -> tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.get(key, (float(burst), now))
+            tokens = min(burst, tokens + (now - ts) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                allowed, retry_after = True, 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed, retry_after = False, (1 - tokens) / rate
+            if len(self._buckets) > self.max_keys:
+                self._prune(now, rate, burst)
+        return allowed, retry_after
+
+    def _prune(self, now: float, rate: float, burst: int):
+        # Buckets that have refilled completely carry no state worth keeping
+        refill_time = burst / rate
+        self._buckets = {
+            key: state for key, state in self._buckets.items()
+            if now - state[1] < refill_time
+        }
+
+class TokenBucketLimiter:
+    """Token buckets in Redis (shared by all workers) with a local fallback."""
+
+    def __init__(self):
+        self.local = LocalTokenBuckets()
+        self._script = None
+
+    def take(self, key: str, rate: float, burst: int) -> tuple[bool, float]:
+        client = get_redis()
+        if client is not None:
+            try:
+                if self._script is None:
+                    self._script = client.register_script(_TOKEN_BUCKET_LUA)
+                allowed, retry_after = self._script(keys=[f"rl:{key}"], args=[rate, burst])
+                return bool(int(allowed)), float(retry_after)
+            except Exception:
+                logger.warning("Redis rate limiter unavailable, using local buckets", exc_info=True)
+        return self.local.take(key, rate, burst)
+
+limiter = TokenBucketLimiter()
+
+@functools.lru_cache(maxsize=4)
+def _networks(proxies: tuple) -> tuple:
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in proxies)
+
+def _trusted(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _networks(tuple(settings.trusted_proxies)))
+
+def client_address(request: Request) -> str:
+    """
+    The caller's IP. Forwarding headers are only believed from a trusted
+    proxy, so a client reaching the backend directly cannot pick its own
+    address (and with it a fresh rate limit bucket).
+    """
+    peer = request.client.host if request.client else "unknown"
+    if not _trusted(peer):
+        return peer
+    # nginx sets X-Real-IP to the address connecting to it
+    real_ip = request.headers.get("x-real-ip", "").strip()
+    if real_ip:
+        return real_ip
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    # The nearest hop not added by one of our proxies
+    for hop in reversed(hops):
+        if not _trusted(hop):
+            return hop
+    return hops[0] if hops else peer
+
+def client_identity(request: Request) -> str:
+    """Rate limit key for the caller: the authenticated user, else the client IP."""
+    authorization = request.headers.get("authorization")
+    if authorization and authorization.lower().startswith("bearer "):
+        # Imported here: app.core.auth imports the database layer
+        from app.core.auth import verify_token
+        payload = verify_token(authorization[7:])
+        if payload and payload.get("sub"):
+            return f"user:{payload['sub']}"
+    return f"ip:{client_address(request)}"
+
+def rate_limit(per_second: Optional[float] = None, burst: Optional[int] = None, scope: Optional[str] = None):
+    """
+    Dependency factory enforcing a per-caller, per-route token bucket.
+
+    Buckets are keyed by caller identity and by `scope`, which defaults to
+    the route's method and path template plus the limit itself: a limit
+    declared on a router gives every route its own bucket, and a stricter
+    limit declared on one of those routes is counted separately rather than
+    refilled at the router's rate. Rejected requests get 429 with Retry-After.
+    """
+    def limit(request: Request):
+        if not settings.rate_limit_enabled:
+            return
+        rate = per_second or settings.rate_limit_per_second
+        capacity = burst or settings.rate_limit_burst
+        route = request.scope.get("route")
+        bucket_scope = scope or f"{request.method}:{getattr(route, 'path', request.url.path)}:{rate:g}/{capacity}"
+        allowed, retry_after = limiter.take(f"{bucket_scope}:{client_identity(request)}", rate, capacity)
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+    return limit
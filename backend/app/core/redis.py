@@ -0,0 +1,28 @@
+import logging
+from functools import lru_cache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=None)
+def get_redis():
+    """
+    Shared Redis client, or None when REDIS_URL is unset or redis-py is missing.
+
+    Callers must treat Redis as optional: any error talking to it should fall
+    back to the local, per-process behaviour rather than fail the request.
+    """
+    if not settings.redis_url:
+        return None
+    try:
+        # Imported lazily: redis-py adds noticeably to cold start
+        import redis
+    except ImportError:
+        logger.warning("REDIS_URL is set but the redis package is not installed")
+        return None
+    return redis.Redis.from_url(
+        settings.redis_url,
+        socket_timeout=settings.redis_socket_timeout,
+        socket_connect_timeout=settings.redis_socket_timeout,
+        health_check_interval=30,
+    )
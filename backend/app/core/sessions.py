@@ -0,0 +1,175 @@
+"""
+Login sessions: short-lived access tokens plus rotating refresh tokens.
+
+Login issues an access token (``ACCESS_TOKEN_EXPIRE_MINUTES``) carrying a
+session id (``sid``) and an opaque refresh token stored as a SHA-256 hash.
+POST /auth/refresh trades a refresh token for a new pair without bcrypt; each
+refresh token works once. Presenting an already used one means it leaked, so
+the whole session is revoked.
+
+Revoking a session marks its refresh tokens in the database and puts the
+session id in the revocation index, which `get_current_user` consults with
+one O(1) lookup. Entries only need to outlive the access tokens issued
+before the revocation, so they expire after one access token lifetime and
+the index stays small. Stored in Redis when configured (shared by all
+workers), otherwise per process.
+"""
+import hashlib
+import logging
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import update
+from sqlmodel import Session, select
+from app.core.auth import create_access_token
+from app.core.config import settings
+from app.core.identifiers import new_ulid
+from app.core.redis import get_redis
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+class RevocationIndex:
+    """Revoked session ids, each remembered for one access token lifetime."""
+
+    def __init__(self, max_local: int = 100_000):
+        self.max_local = max_local
+        self._local: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self) -> float:
+        return settings.access_token_expire_minutes * 60
+
+    def revoke(self, session_ids: Iterable[str]):
+        session_ids = list(session_ids)
+        if not session_ids:
+            return
+        client = get_redis()
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                for session_id in session_ids:
+                    pipe.set(f"auth:revoked:{session_id}", 1, px=int(self.ttl * 1000))
+                pipe.execute()
+            except Exception:
+                logger.warning("Redis revocation index unavailable, revoking locally", exc_info=True)
+        # Kept locally as well so this worker never depends on Redis for it
+        until = time.monotonic() + self.ttl
+        with self._lock:
+            if len(self._local) + len(session_ids) > self.max_local:
+                now = time.monotonic()
+                self._local = {key: expiry for key, expiry in self._local.items() if expiry > now}
+            for session_id in session_ids:
+                self._local[session_id] = until
+
+    def is_revoked(self, session_id: str) -> bool:
+        if self._local.get(session_id, 0.0) > time.monotonic():
+            return True
+        client = get_redis()
+        if client is not None:
+            try:
+                return bool(client.exists(f"auth:revoked:{session_id}"))
+            except Exception:
+                pass
+        return False
+
+revocations = RevocationIndex()
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _unauthorized(detail: str = "Invalid refresh token") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def issue_tokens(session: Session, user: User, session_id: Optional[str] = None) -> tuple[str, str]:
+    """
+    Access and refresh token for `user`, in a new session unless `session_id`
+    is given. The refresh token row is added to `session`; the caller commits.
+    """
+    session_id = session_id or new_ulid()
+    refresh_token = secrets.token_urlsafe(32)
+    session.add(RefreshToken(
+        token_hash=_hash(refresh_token),
+        session_id=session_id,
+        user_id=user.id,
+        expires_at=datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days),
+    ))
+    access_token = create_access_token(data={"sub": str(user.id), "sid": session_id})
+    return access_token, refresh_token
+
+def revoke_sessions(session: Session, session_ids: Iterable[str]):
+    """End sessions: refresh tokens stop working and access tokens are refused."""
+    session_ids = list(set(session_ids))
+    if not session_ids:
+        return
+    session.exec(
+        update(RefreshToken)
+        .where(RefreshToken.session_id.in_(session_ids), RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    revocations.revoke(session_ids)
+
+def revoke_user_sessions(session: Session, user_id: int):
+    session_ids = session.exec(
+        select(RefreshToken.session_id).where(
+            RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None)
+        ).distinct()
+    ).all()
+    revoke_sessions(session, session_ids)
+
+def rotate_refresh_token(session: Session, refresh_token: str) -> tuple[User, str, str]:
+    """Use a refresh token once: returns the user and a new access/refresh token pair."""
+    now = datetime.utcnow()
+    token_hash = _hash(refresh_token)
+
+    # Claim the token atomically so concurrent uses cannot both succeed
+    claimed = session.exec(
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.used_at.is_(None),
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        .values(used_at=now)
+        .returning(RefreshToken.session_id, RefreshToken.user_id)
+        .execution_options(synchronize_session=False)
+    ).first()
+
+    if claimed is None:
+        existing = session.exec(select(RefreshToken).where(RefreshToken.token_hash == token_hash)).first()
+        if existing is not None and existing.used_at is not None and existing.revoked_at is None:
+            # Replay of a rotated token: whoever holds it, the session is compromised
+            revoke_sessions(session, [existing.session_id])
+            session.commit()
+        raise _unauthorized()
+
+    session_id, user_id = claimed
+    user = session.get(User, user_id)
+    if user is None or not user.is_active:
+        revoke_sessions(session, [session_id])
+        session.commit()
+        raise _unauthorized("Inactive user account")
+
+    access_token, new_refresh_token = issue_tokens(session, user, session_id)
+    session.commit()
+    return user, access_token, new_refresh_token
+
+def end_session(session: Session, refresh_token: str):
+    """Log out the session a refresh token belongs to (unknown tokens are ignored)."""
+    session_id = session.exec(
+        select(RefreshToken.session_id).where(RefreshToken.token_hash == _hash(refresh_token))
+    ).first()
+    if session_id is not None:
+        revoke_sessions(session, [session_id])
+        session.commit()
@@ -0,0 +1,188 @@
+"""
+HS256 access tokens with key IDs, rotation and a verified-claims cache.
+
+Signing keys live in a key ring (``JWT_KEYS``, a JSON object of key id to
+secret). New tokens are signed with ``JWT_ACTIVE_KID`` and carry it in the
+``kid`` header; any key still in the ring verifies. To rotate: add the new
+key, make it active, and drop the old one once its tokens have expired
+(``ACCESS_TOKEN_EXPIRE_MINUTES`` later). Tokens without a ``kid``, issued
+before key IDs existed, are checked against the ring's ``default`` key: that
+is ``SECRET_KEY`` while no ring is configured, and once ``JWT_KEYS`` is set
+they verify only as long as it still holds a ``default`` entry, so the old
+secret is retired like any other key.
+
+Encoding and verification use only hmac/json, at about a quarter of
+python-jose's cost per token (see scripts/bench_jwt.py). A request verifies
+its bearer token several times (rate limiting, replica routing,
+authentication), so verified claims are also kept in a bounded LRU until the
+token expires; a cached check takes about two microseconds.
+"""
+import base64
+import calendar
+import hmac
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+from app.core.config import settings
+
+# Key id of the legacy single secret; also verifies tokens without a kid
+LEGACY_KID = "default"
+
+_UNPARSED = object()
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+class KeyRing:
+    """Signing keys by id; `active_kid` signs new tokens."""
+
+    def __init__(self, keys: dict[str, str], active_kid: Optional[str], legacy_secret: str):
+        if not keys:
+            keys = {LEGACY_KID: legacy_secret}
+            active_kid = LEGACY_KID
+        if active_kid not in keys:
+            raise ValueError(f"JWT_ACTIVE_KID {active_kid!r} is not in JWT_KEYS")
+        self.keys = {kid: secret.encode() for kid, secret in keys.items()}
+        self.active_kid = active_kid
+
+    def secret(self, kid: Optional[str]) -> Optional[bytes]:
+        return self.keys.get(LEGACY_KID if kid is None else kid)
+
+class ClaimsCache:
+    """Bounded LRU of verified token -> (claims, expiry, kid)."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[dict, float, Optional[str]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str, now: float) -> Optional[tuple[dict, Optional[str]]]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            claims, expires_at, kid = entry
+            if expires_at <= now:
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return claims, kid
+
+    def put(self, token: str, claims: dict, expires_at: float, kid: Optional[str]):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (claims, expires_at, kid)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, token: str):
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class TokenCodec:
+    def __init__(self, ring: KeyRing, cache: ClaimsCache):
+        self.ring = ring
+        self.cache = cache
+        self._headers: dict[str, bytes] = {}
+        self._kids: dict[bytes, Optional[str]] = {}
+
+    def encode(self, claims: dict) -> str:
+        kid = self.ring.active_kid
+        header = self._headers.get(kid)
+        if header is None:
+            header = self._headers[kid] = _b64encode(
+                json.dumps({"alg": "HS256", "typ": "JWT", "kid": kid}, separators=(",", ":")).encode()
+            )
+        payload = _b64encode(json.dumps(claims, separators=(",", ":"), default=_json_default).encode())
+        signing_input = header + b"." + payload
+        signature = hmac.digest(self.ring.keys[kid], signing_input, "sha256")
+        return (signing_input + b"." + _b64encode(signature)).decode()
+
+    def _header_kid(self, segment: bytes) -> Optional[str]:
+        # Only a handful of distinct headers exist (one per key), so parse each once
+        kid = self._kids.get(segment, _UNPARSED)
+        if kid is _UNPARSED:
+            header = json.loads(_b64decode(segment))
+            if header.get("alg") != "HS256":
+                # Refuses "none" and algorithm confusion
+                raise ValueError("unsupported algorithm")
+            kid = header.get("kid")
+            if len(self._kids) < 64:
+                self._kids[segment] = kid
+        return kid
+
+    def decode(self, token: str) -> Optional[dict]:
+        """Verified claims, or None for a malformed, forged or expired token."""
+        now = time.time()
+        cached = self.cache.get(token, now)
+        if cached is not None:
+            claims, kid = cached
+            # A key removed from the ring revokes its tokens, cached or not
+            if self.ring.secret(kid) is not None:
+                return dict(claims)
+            self.cache.discard(token)
+            return None
+
+        try:
+            signing_input, signature_segment = token.encode().rsplit(b".", 1)
+            header_segment, payload_segment = signing_input.split(b".")
+            kid = self._header_kid(header_segment)
+            secret = self.ring.secret(kid)
+            if secret is None:
+                return None
+            expected = hmac.digest(secret, signing_input, "sha256")
+            if not hmac.compare_digest(expected, _b64decode(signature_segment)):
+                return None
+            claims = json.loads(_b64decode(payload_segment))
+        except (ValueError, TypeError, AttributeError):
+            return None
+        if not isinstance(claims, dict):
+            return None
+
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)) or expires_at <= now:
+            return None
+        not_before = claims.get("nbf")
+        if isinstance(not_before, (int, float)) and not_before > now:
+            return None
+
+        self.cache.put(token, claims, expires_at, kid)
+        return dict(claims)
+
+def _json_default(value):
+    # Naive UTC datetimes (e.g. "exp") become NumericDate seconds, as python-jose did
+    if isinstance(value, datetime):
+        return calendar.timegm(value.utctimetuple())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+_codec: Optional[TokenCodec] = None
+_codec_lock = threading.Lock()
+
+def get_token_codec() -> TokenCodec:
+    global _codec
+    if _codec is None:
+        with _codec_lock:
+            if _codec is None:
+                _codec = TokenCodec(
+                    KeyRing(settings.jwt_keys, settings.jwt_active_kid, settings.secret_key),
+                    ClaimsCache(settings.jwt_cache_size),
+                )
+    return _codec
+
+def reset_token_codec():
+    """Rebuild the key ring from settings (after a rotation) and drop cached claims."""
+    global _codec
+    with _codec_lock:
+        _codec = None
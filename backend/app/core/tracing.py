@@ -0,0 +1,212 @@
+"""
+OpenTelemetry tracing.
+
+With ``TRACING_ENABLED=true`` and the OpenTelemetry SDK installed, each
+process records spans for:
+
+* HTTP requests (`TracingMiddleware`), named after the matched route and
+  continuing a W3C ``traceparent`` sent by the caller;
+* dependencies wrapped with `traced` (the session and the current user),
+  timed up to the value they hand to the endpoint;
+* SQL statements, from engine events;
+* file storage reads and writes, wrapped in `span`;
+* background jobs, which continue the trace of the request that queued them
+  (the context travels in the job payload, see app.services.jobs).
+
+Spans are exported by the SDK's batch processor on its own thread, to an
+OTLP/HTTP collector (``TRACING_EXPORTER=otlp``), a JSON lines file
+(``file``) or stdout (``console``). ``TRACING_SAMPLE_RATE`` is the share of
+new traces recorded; when the caller sent a sampled ``traceparent`` its
+decision is followed.
+
+Without the SDK, or while disabled, `span` and `traced` cost one check per
+call and `inject` returns an empty carrier.
+"""
+import asyncio
+import functools
+import inspect
+import logging
+from contextlib import nullcontext
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_tracer = None
+
+def enabled() -> bool:
+    return _tracer is not None
+
+def _exporter():
+    if settings.tracing_exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter(endpoint=settings.tracing_otlp_endpoint)
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+    if settings.tracing_exporter == "file":
+        output = open(settings.tracing_file, "a", buffering=1)
+        return ConsoleSpanExporter(out=output, formatter=lambda span: span.to_json(indent=None) + "\n")
+    return ConsoleSpanExporter()
+
+def configure_tracing(service_name: Optional[str] = None, span_processor=None):
+    """Start recording spans if tracing is enabled and the SDK is installed."""
+    global _tracer
+    if _tracer is not None or not settings.tracing_enabled:
+        return
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    except ImportError:
+        logger.warning("TRACING_ENABLED is set but opentelemetry-sdk is not installed")
+        return
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name or settings.tracing_service_name}),
+        sampler=ParentBased(TraceIdRatioBased(settings.tracing_sample_rate)),
+    )
+    try:
+        provider.add_span_processor(span_processor or BatchSpanProcessor(_exporter()))
+    except ImportError:
+        logger.warning("The %s trace exporter is not installed, tracing stays off", settings.tracing_exporter)
+        return
+    if span_processor is None:
+        trace.set_tracer_provider(provider)
+    _tracer = provider.get_tracer("agrilink")
+
+def _kind(kind: str):
+    from opentelemetry.trace import SpanKind
+    return getattr(SpanKind, kind.upper())
+
+def span(name: str, kind: str = "internal", context=None, **attributes):
+    """Context manager recording a span (a no-op while tracing is off)."""
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(name, context=context, kind=_kind(kind), attributes=attributes)
+
+def inject() -> dict:
+    """The current trace context as a carrier for another process; empty when off."""
+    if _tracer is None:
+        return {}
+    from opentelemetry.propagate import inject as inject_context
+    carrier = {}
+    inject_context(carrier)
+    return carrier
+
+def extract(carrier: Optional[dict]):
+    """Trace context from a carrier made by `inject` (or HTTP headers)."""
+    if _tracer is None or not carrier:
+        return None
+    from opentelemetry.propagate import extract as extract_context
+    return extract_context(carrier)
+
+def traced(name: Optional[str] = None):
+    """
+    Record a span around each call of the decorated function. Coroutines,
+    generators (FastAPI dependencies with teardown) and plain functions keep
+    their kind; a generator's span ends when it yields its value.
+    """
+    def decorate(func):
+        span_name = name or func.__qualname__
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                generator = func(*args, **kwargs)
+                with span(span_name):
+                    value = next(generator)
+                try:
+                    yield value
+                except BaseException as exc:
+                    # Forward teardown errors the way contextmanager does
+                    try:
+                        generator.throw(exc)
+                    except StopIteration:
+                        return
+                    raise RuntimeError(f"{span_name} did not stop after throw()")
+                next(generator, None)
+            return generator_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# -- SQL -------------------------------------------------------------------------
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _statement_started(conn, cursor, statement, parameters, context, executemany):
+    if _tracer is None:
+        return
+    statement_span = _tracer.start_span(
+        f"SQL {statement.split(None, 1)[0].upper()}" if statement else "SQL",
+        kind=_kind("client"),
+        attributes={"db.system": conn.dialect.name, "db.statement": statement[:2000]},
+    )
+    conn.info.setdefault("trace_spans", []).append(statement_span)
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _statement_finished(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        spans.pop().end()
+
+@event.listens_for(Engine, "handle_error")
+def _statement_failed(exception_context):
+    connection = exception_context.connection
+    spans = connection.info.get("trace_spans") if connection is not None else None
+    if spans:
+        from opentelemetry.trace import Status, StatusCode
+        failed = spans.pop()
+        failed.record_exception(exception_context.original_exception)
+        failed.set_status(Status(StatusCode.ERROR))
+        failed.end()
+
+# -- HTTP ------------------------------------------------------------------------
+
+class TracingMiddleware:
+    """Server span per request, renamed to the route template once routing is done."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if _tracer is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        from app.core.logs import current_request_id
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        attributes = {"http.method": scope["method"], "http.target": scope["path"]}
+        if current_request_id():
+            attributes["http.request_id"] = current_request_id()
+
+        with span(f"HTTP {scope['method']}", kind="server", context=extract(headers), **attributes) as server_span:
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    server_span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        from opentelemetry.trace import Status, StatusCode
+                        server_span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                # FastAPI stores the matched route in the scope while routing
+                route = scope.get("route")
+                if route is not None:
+                    server_span.set_attribute("http.route", route.path)
+                    server_span.update_name(f"{scope['method']} {route.path}")
@@ -7,10 +7,19 @@ from .contract import Contract
 from .escrow import Escrow
 from .order import Order
 from .kyc import KYC
+from .buy_order import BuyOrder
+from .counter import UserCounter
+from .refresh_token import RefreshToken
+from .job import Job
 
 # Base class for all models
 Base = SQLModel
 
+# Keeps dashboard counters in step with every flush that touches these models
+from app.services import counters  # noqa: E402,F401
+# Queues notifications for status changes, sent after commit
+from app.services import notifications  # noqa: E402,F401
+
 __all__ = [
     "Base",
     "User",
@@ -20,5 +29,9 @@ __all__ = [
     "Contract",
     "Escrow",
     "Order",
-    "KYC"
+    "KYC",
+    "BuyOrder",
+    "UserCounter",
+    "RefreshToken",
+    "Job"
 ]
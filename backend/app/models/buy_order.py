@@ -0,0 +1,38 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index, text
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+from app.models.listing import ProduceType
+
+class BuyOrderStatus(str, Enum):
+    OPEN = "open"
+    FILLED = "filled"
+    CANCELLED = "cancelled"
+
+class BuyOrder(SQLModel, table=True):
+    """Standing bid matched against listings by the matching engine."""
+    __table_args__ = (
+        Index(
+            "ix_buyorder_open_book", "produce_type", "quality_grade", "created_at",
+            postgresql_where=text("status = 'OPEN'"), sqlite_where=text("status = 'OPEN'"),
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    produce_type: ProduceType
+    quality_grade: Optional[str] = None
+    quantity_kg: float
+    remaining_kg: float
+    limit_price_ngn: float
+    delivery_location: str
+    delivery_date: Optional[datetime] = None
+    status: BuyOrderStatus = Field(default=BuyOrderStatus.OPEN)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    # Foreign keys
+    buyer_id: int = Field(foreign_key="user.id", index=True)
+    
+    class Config:
+        arbitrary_types_allowed = True
@@ -23,10 +23,10 @@ class Contract(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     # Foreign keys
-    farmer_id: int = Field(foreign_key="user.id")
-    buyer_id: int = Field(foreign_key="user.id")
-    listing_id: int = Field(foreign_key="listing.id")
-    offer_id: int = Field(foreign_key="offer.id")
+    farmer_id: int = Field(foreign_key="user.id", index=True)
+    buyer_id: int = Field(foreign_key="user.id", index=True)
+    listing_id: int = Field(foreign_key="listing.id", index=True)
+    offer_id: int = Field(foreign_key="offer.id", unique=True, index=True)
     
     # Relationships
     offer: "Offer" = Relationship(back_populates="contract")
@@ -0,0 +1,9 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+class UserCounter(SQLModel, table=True):
+    """Per-user dashboard counter, maintained by app.services.counters."""
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    name: str = Field(primary_key=True)
+    value: float = Field(default=0.0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
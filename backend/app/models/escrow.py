@@ -22,9 +22,9 @@ class Escrow(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     # Foreign keys
-    contract_id: int = Field(foreign_key="contract.id")
-    buyer_id: int = Field(foreign_key="user.id")
-    seller_id: int = Field(foreign_key="user.id")
+    contract_id: int = Field(foreign_key="contract.id", index=True)
+    buyer_id: int = Field(foreign_key="user.id", index=True)
+    seller_id: int = Field(foreign_key="user.id", index=True)
     
     # Relationships
     contract: "Contract" = Relationship(back_populates="escrow")
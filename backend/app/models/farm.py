@@ -1,8 +1,13 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, text
 from typing import Optional, List
 from datetime import datetime
 
 class Farm(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_farm_active", "id", postgresql_where=text("is_active"), sqlite_where=text("is_active")),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     description: Optional[str] = None
@@ -15,7 +20,7 @@ class Farm(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     # Foreign keys
-    farmer_id: int = Field(foreign_key="user.id")
+    farmer_id: int = Field(foreign_key="user.id", index=True)
     
     # Relationships
     listings: List["Listing"] = Relationship(back_populates="farm")
@@ -0,0 +1,35 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    DEAD = "dead"
+
+class Job(SQLModel, table=True):
+    """
+    A deferred task in the SQL job queue (app.services.jobs), used when Redis
+    is not configured or unreachable. RUNNING jobs whose lease has expired are
+    claimed again; DEAD jobs exhausted their attempts.
+    """
+    __table_args__ = (
+        Index("ix_job_status_run_at", "status", "run_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str
+    payload: str = "{}"
+    status: JobStatus = Field(default=JobStatus.QUEUED)
+    attempts: int = 0
+    max_attempts: int = 5
+    run_at: datetime = Field(default_factory=datetime.utcnow)
+    locked_until: Optional[datetime] = None
+    last_error: Optional[str] = None
+    # Deduplicates scheduled runs across workers
+    unique_key: Optional[str] = Field(default=None, unique=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index, text
 from typing import Optional
 from datetime import datetime
 from enum import Enum
@@ -19,6 +20,13 @@ class KYCStatus(str, Enum):
     UNDER_REVIEW = "under_review"
 
 class KYC(SQLModel, table=True):
+    __table_args__ = (
+        Index(
+            "ix_kyc_pending_created_at", "created_at",
+            postgresql_where=text("status = 'PENDING'"), sqlite_where=text("status = 'PENDING'"),
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id", unique=True)
     document_type: DocumentType
@@ -31,6 +39,9 @@ class KYC(SQLModel, table=True):
     admin_notes: Optional[str] = None
     reviewed_by: Optional[int] = Field(foreign_key="user.id", default=None)
     reviewed_at: Optional[datetime] = None
+    # JSON: document kind -> preview/thumbnail variants (app.services.kyc_images)
+    previews: Optional[str] = None
+    processed_at: Optional[datetime] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
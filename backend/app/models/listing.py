@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, text
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
@@ -17,12 +18,31 @@ class ListingStatus(str, Enum):
     EXPIRED = "expired"
     CANCELLED = "cancelled"
 
+def _initial_remaining(context):
+    # New listings start with their whole quantity available
+    return context.get_current_parameters()["quantity_kg"]
+
 class Listing(SQLModel, table=True):
+    __table_args__ = (
+        Index(
+            "ix_listing_active_produce_type", "produce_type", "unit_price_ngn",
+            postgresql_where=text("status = 'ACTIVE'"), sqlite_where=text("status = 'ACTIVE'"),
+        ),
+        Index(
+            "ix_listing_active_created_at", "created_at",
+            postgresql_where=text("status = 'ACTIVE'"), sqlite_where=text("status = 'ACTIVE'"),
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
     description: Optional[str] = None
     produce_type: ProduceType
     quantity_kg: float
+    # Quantity not yet under contract; changed only via app.services.inventory
+    remaining_kg: Optional[float] = Field(
+        default=None, nullable=False, sa_column_kwargs={"default": _initial_remaining}
+    )
     unit_price_ngn: float
     total_price_ngn: float
     harvest_date: Optional[datetime] = None
@@ -34,8 +54,8 @@ class Listing(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     # Foreign keys
-    farmer_id: int = Field(foreign_key="user.id")
-    farm_id: int = Field(foreign_key="farm.id")
+    farmer_id: int = Field(foreign_key="user.id", index=True)
+    farm_id: int = Field(foreign_key="farm.id", index=True)
     
     # Relationships
     farm: "Farm" = Relationship(back_populates="listings")
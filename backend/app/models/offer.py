@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional
 from datetime import datetime
 from enum import Enum
@@ -11,6 +12,10 @@ class OfferStatus(str, Enum):
     CANCELLED = "cancelled"
 
 class Offer(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_offer_listing_id_status", "listing_id", "status"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     quantity_kg: float
     unit_price_ngn: float
@@ -24,7 +29,7 @@ class Offer(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     # Foreign keys
-    buyer_id: int = Field(foreign_key="user.id")
+    buyer_id: int = Field(foreign_key="user.id", index=True)
     listing_id: int = Field(foreign_key="listing.id")
     
     # Relationships
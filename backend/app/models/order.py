@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, text
 from typing import Optional
 from datetime import datetime
 from enum import Enum
@@ -11,6 +12,13 @@ class OrderStatus(str, Enum):
     CANCELLED = "cancelled"
 
 class Order(SQLModel, table=True):
+    __table_args__ = (
+        Index(
+            "ix_order_logistics_id", "logistics_id",
+            postgresql_where=text("logistics_id IS NOT NULL"), sqlite_where=text("logistics_id IS NOT NULL"),
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     order_number: str = Field(unique=True, index=True)
     quantity_kg: float
@@ -24,9 +32,9 @@ class Order(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     # Foreign keys
-    contract_id: int = Field(foreign_key="contract.id")
-    farmer_id: int = Field(foreign_key="user.id")
-    buyer_id: int = Field(foreign_key="user.id")
+    contract_id: int = Field(foreign_key="contract.id", index=True)
+    farmer_id: int = Field(foreign_key="user.id", index=True)
+    buyer_id: int = Field(foreign_key="user.id", index=True)
     logistics_id: Optional[int] = Field(foreign_key="user.id", default=None)
     
     # Relationships
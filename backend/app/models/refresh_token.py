@@ -0,0 +1,19 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+class RefreshToken(SQLModel, table=True):
+    """
+    One refresh token of a login session. Only the SHA-256 of the token is
+    stored; each use replaces it with a new token in the same session.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    token_hash: str = Field(unique=True, index=True)
+    session_id: str = Field(index=True)
+    expires_at: datetime
+    used_at: Optional[datetime] = None
+    revoked_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    # Foreign keys
+    user_id: int = Field(foreign_key="user.id", index=True)
@@ -1,19 +1,23 @@
 from .user import UserCreate, UserLogin, UserResponse, UserUpdate
 from .farm import FarmCreate, FarmResponse, FarmUpdate
 from .listing import ListingCreate, ListingResponse, ListingUpdate
-from .offer import OfferCreate, OfferResponse, OfferUpdate
-from .contract import ContractResponse
+from .offer import OfferCreate, OfferResponse, OfferUpdate, OfferBatchAccept, OfferBatchItem, OfferBatchResult
+from .contract import ContractResponse, ContractTimeline, ListingSummary, TimelineEvent
 from .escrow import EscrowResponse
 from .order import OrderResponse
 from .kyc import KYCCreate, KYCResponse, KYCUpdate
+from .dashboard import DashboardSummary
+from .buy_order import BuyOrderCreate, BuyOrderResponse, BuyOrderResult, FillResponse, OrderBookDepth
 
 __all__ = [
     "UserCreate", "UserLogin", "UserResponse", "UserUpdate",
     "FarmCreate", "FarmResponse", "FarmUpdate",
     "ListingCreate", "ListingResponse", "ListingUpdate",
-    "OfferCreate", "OfferResponse", "OfferUpdate",
-    "ContractResponse",
+    "OfferCreate", "OfferResponse", "OfferUpdate", "OfferBatchAccept", "OfferBatchItem", "OfferBatchResult",
+    "ContractResponse", "ContractTimeline", "ListingSummary", "TimelineEvent",
     "EscrowResponse",
     "OrderResponse",
-    "KYCCreate", "KYCResponse", "KYCUpdate"
+    "KYCCreate", "KYCResponse", "KYCUpdate",
+    "DashboardSummary",
+    "BuyOrderCreate", "BuyOrderResponse", "BuyOrderResult", "FillResponse", "OrderBookDepth"
 ]
@@ -0,0 +1,55 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from app.models.buy_order import BuyOrderStatus
+from app.models.listing import ProduceType
+
+class BuyOrderCreate(BaseModel):
+    produce_type: ProduceType
+    quality_grade: Optional[str] = None
+    quantity_kg: float
+    limit_price_ngn: float
+    delivery_location: str
+    delivery_date: Optional[datetime] = None
+
+class BuyOrderResponse(BaseModel):
+    id: int
+    produce_type: ProduceType
+    quality_grade: Optional[str] = None
+    quantity_kg: float
+    remaining_kg: float
+    limit_price_ngn: float
+    delivery_location: str
+    delivery_date: Optional[datetime] = None
+    status: BuyOrderStatus
+    buyer_id: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class FillResponse(BaseModel):
+    buy_order_id: int
+    listing_id: int
+    quantity_kg: float
+    unit_price_ngn: float
+    matched_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class BuyOrderResult(BaseModel):
+    order: BuyOrderResponse
+    fills: list[FillResponse]
+
+class BookLevel(BaseModel):
+    price_ngn: float
+    quantity_kg: float
+    orders: int
+
+class OrderBookDepth(BaseModel):
+    produce_type: ProduceType
+    quality_grade: Optional[str] = None
+    bids: list[BookLevel]
+    asks: list[BookLevel]
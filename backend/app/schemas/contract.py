@@ -2,6 +2,10 @@ from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
 from app.models.contract import ContractStatus
+from app.models.listing import ListingStatus, ProduceType
+from app.schemas.escrow import EscrowResponse
+from app.schemas.offer import OfferResponse
+from app.schemas.order import OrderResponse
 
 class ContractResponse(BaseModel):
     id: int
@@ -22,3 +26,30 @@ class ContractResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+class ListingSummary(BaseModel):
+    id: int
+    title: str
+    produce_type: ProduceType
+    quality_grade: Optional[str] = None
+    quantity_kg: float
+    remaining_kg: float
+    unit_price_ngn: float
+    status: ListingStatus
+    farm_id: int
+
+    class Config:
+        from_attributes = True
+
+class TimelineEvent(BaseModel):
+    at: datetime
+    event: str
+    reference: str
+
+class ContractTimeline(BaseModel):
+    contract: ContractResponse
+    offer: OfferResponse
+    listing: ListingSummary
+    escrow: Optional[EscrowResponse] = None
+    orders: list[OrderResponse]
+    events: list[TimelineEvent]
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+class DashboardSummary(BaseModel):
+    active_listings: int = 0
+    pending_offers: int = 0
+    active_contracts: int = 0
+    funded_escrows: int = 0
+    funded_escrow_ngn: float = 0.0
+    orders_pending: int = 0
+    orders_confirmed: int = 0
+    orders_in_transit: int = 0
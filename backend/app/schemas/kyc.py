@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+import json
+from pydantic import BaseModel, field_validator
 from typing import Optional
 from datetime import datetime
 from app.models.kyc import DocumentType, KYCStatus
@@ -21,9 +22,19 @@ class KYCResponse(BaseModel):
     admin_notes: Optional[str] = None
     reviewed_by: Optional[int] = None
     reviewed_at: Optional[datetime] = None
+    previews: list[str] = []
+    processed_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
+    @field_validator("previews", mode="before")
+    @classmethod
+    def preview_kinds(cls, value):
+        # Stored as JSON of kind -> variants; clients only need the kinds
+        if not value:
+            return []
+        return list(json.loads(value)) if isinstance(value, str) else value
+
     class Config:
         from_attributes = True
 
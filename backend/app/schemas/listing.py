@@ -21,6 +21,7 @@ class ListingResponse(BaseModel):
     description: Optional[str] = None
     produce_type: ProduceType
     quantity_kg: float
+    remaining_kg: float
     unit_price_ngn: float
     total_price_ngn: float
     harvest_date: Optional[datetime] = None
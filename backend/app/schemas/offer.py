@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 from app.models.offer import OfferStatus
@@ -35,3 +35,18 @@ class OfferUpdate(BaseModel):
     delivery_date: Optional[datetime] = None
     delivery_location: Optional[str] = None
     notes: Optional[str] = None
+
+class OfferBatchAccept(BaseModel):
+    offer_ids: list[int] = Field(min_length=1, max_length=500)
+
+class OfferBatchItem(BaseModel):
+    offer_id: int
+    accepted: bool
+    contract_id: Optional[int] = None
+    contract_number: Optional[str] = None
+    error: Optional[str] = None
+
+class OfferBatchResult(BaseModel):
+    accepted: int
+    rejected: int
+    results: list[OfferBatchItem]
@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+class ProfiledRoute(BaseModel):
+    path_prefix: str = Field(pattern="^/")
+    requests: int = Field(default=10, ge=1, le=1000)
+
+class RequestProfileSummary(BaseModel):
+    id: int
+    method: str
+    path: str
+    status: int
+    duration_ms: float
+    captured_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -47,4 +47,9 @@ class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
     expires_in: int
+    refresh_token: Optional[str] = None
+    refresh_expires_in: Optional[int] = None
     user: UserResponse
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
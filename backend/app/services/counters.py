@@ -0,0 +1,176 @@
+"""
+Per-user dashboard counters, maintained incrementally.
+
+Every status transition of a listing, offer, contract, escrow or order made
+through the ORM adjusts the counters of the users involved in the same
+transaction (an ``after_flush`` hook), so the dashboard reads a handful of
+rows instead of scanning the trade tables. Code that changes statuses with
+Core UPDATE/INSERT statements (inventory reservations, batch acceptance)
+calls `add_counts` itself.
+
+Counter names are ``<kind>.<status>``, e.g. ``listings.active``,
+``offers.pending`` or ``orders.in_transit``; funded escrows also keep
+``escrow.funded_ngn``, the amount held. `rebuild_counters` recomputes them
+from the trade tables (after bulk imports, or to repair drift).
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, Optional
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session
+from app.models.contract import Contract, ContractStatus
+from app.models.counter import UserCounter
+from app.models.escrow import Escrow, EscrowStatus
+from app.models.listing import Listing, ListingStatus
+from app.models.offer import Offer, OfferStatus
+from app.models.order import Order, OrderStatus
+
+# model: (counter prefix, status enum, counted statuses, party columns, amount column)
+TRACKED = {
+    Listing: ("listings", ListingStatus, {ListingStatus.ACTIVE}, ("farmer_id",), None),
+    Offer: ("offers", OfferStatus, {OfferStatus.PENDING}, ("buyer_id",), None),
+    Contract: ("contracts", ContractStatus, {ContractStatus.ACTIVE}, ("farmer_id", "buyer_id"), None),
+    Escrow: ("escrow", EscrowStatus, {EscrowStatus.FUNDED}, ("buyer_id", "seller_id"), "amount_ngn"),
+    Order: (
+        "orders", OrderStatus,
+        {OrderStatus.PENDING, OrderStatus.CONFIRMED, OrderStatus.IN_TRANSIT},
+        ("farmer_id", "buyer_id"), None,
+    ),
+}
+
+def counter_name(model, status) -> str:
+    prefix, enum, *_ = TRACKED[model]
+    return f"{prefix}.{enum(status).value}"
+
+def add_counts(session: Session, changes: Iterable[tuple[int, str, float]]):
+    """Apply (user_id, counter name, delta) changes in the session's transaction."""
+    totals: dict[tuple[int, str], float] = defaultdict(float)
+    for user_id, name, delta in changes:
+        totals[(user_id, name)] += delta
+    # Sorted so concurrent transactions lock counter rows in the same order
+    rows = [
+        {"user_id": user_id, "name": name, "value": delta, "updated_at": datetime.utcnow()}
+        for (user_id, name), delta in sorted(totals.items())
+        if delta
+    ]
+    if not rows:
+        return
+
+    connection = session.connection()
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = insert(UserCounter).values(rows)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=["user_id", "name"],
+            set_={
+                "value": UserCounter.value + statement.excluded.value,
+                "updated_at": statement.excluded.updated_at,
+            },
+        ))
+        return
+
+    for row in rows:
+        updated = connection.execute(
+            UserCounter.__table__.update()
+            .where(UserCounter.user_id == row["user_id"], UserCounter.name == row["name"])
+            .values(value=UserCounter.value + row["value"], updated_at=row["updated_at"])
+        )
+        if updated.rowcount == 0:
+            connection.execute(UserCounter.__table__.insert().values(row))
+
+def _load_previous_status(target, value, oldvalue, initiator):
+    return value
+
+# Load the old status when assigning to an expired object (e.g. after a
+# commit), so the transition knows which counter to decrement
+for _model in TRACKED:
+    event.listen(_model.status, "set", _load_previous_status, active_history=True, retval=True)
+
+def status_change(obj) -> tuple[Optional[str], Optional[str]]:
+    history = inspect(obj).attrs.status.history
+    if not history.has_changes():
+        return None, None
+    old = history.deleted[0] if history.deleted else None
+    new = history.added[0] if history.added else None
+    return old, new
+
+@event.listens_for(Session, "after_flush")
+def _count_transitions(session, flush_context):
+    transitions = []
+    for obj in list(session.new) + list(session.dirty):
+        if type(obj) not in TRACKED:
+            continue
+        if obj in session.new:
+            old, new = None, obj.status
+        else:
+            old, new = status_change(obj)
+            if old is None and new is None:
+                continue
+        transitions.append((obj, old, new))
+    if not transitions:
+        return
+
+    # Offers count towards the farmer who owns the listing as well
+    listing_ids = {obj.listing_id for obj, _, _ in transitions if isinstance(obj, Offer)}
+    farmers = {}
+    if listing_ids:
+        farmers = dict(session.connection().execute(
+            select(Listing.id, Listing.farmer_id).where(Listing.id.in_(listing_ids))
+        ).all())
+
+    changes = []
+    for obj, old, new in transitions:
+        model = type(obj)
+        _, enum, counted, parties, amount_column = TRACKED[model]
+        users = [getattr(obj, party) for party in parties]
+        if model is Offer and obj.listing_id in farmers:
+            users.append(farmers[obj.listing_id])
+        for status, sign in ((old, -1), (new, 1)):
+            if status is None or enum(status) not in counted:
+                continue
+            name = counter_name(model, status)
+            for user_id in users:
+                changes.append((user_id, name, sign))
+                if amount_column:
+                    changes.append((user_id, f"{name}_ngn", sign * getattr(obj, amount_column)))
+    add_counts(session, changes)
+
+def _party_counts(model, party_column, user_ids):
+    _, _, counted, _, amount_column = TRACKED[model]
+    status_column = model.status
+    columns = [party_column.label("user_id"), status_column.label("status"), func.count().label("value")]
+    if amount_column:
+        columns.append(func.sum(getattr(model, amount_column)).label("amount"))
+    query = (
+        select(*columns)
+        .select_from(model)
+        .where(status_column.in_(counted))
+        .group_by(party_column, status_column)
+    )
+    if model is Offer and party_column is Listing.farmer_id:
+        query = query.join(Listing, Listing.id == Offer.listing_id)
+    if user_ids is not None:
+        query = query.where(party_column.in_(user_ids))
+    return query
+
+def rebuild_counters(session: Session, user_ids: Optional[list[int]] = None):
+    """Recompute counters from the trade tables (for all users, or just `user_ids`)."""
+    clear = delete(UserCounter)
+    if user_ids is not None:
+        clear = clear.where(UserCounter.user_id.in_(user_ids))
+    session.exec(clear)
+
+    changes = []
+    for model, (_, _, _, parties, amount_column) in TRACKED.items():
+        party_columns = [getattr(model, party) for party in parties]
+        if model is Offer:
+            party_columns.append(Listing.farmer_id)
+        for party_column in party_columns:
+            for row in session.exec(_party_counts(model, party_column, user_ids)).all():
+                name = counter_name(model, row.status)
+                changes.append((row.user_id, name, row.value))
+                if amount_column:
+                    changes.append((row.user_id, f"{name}_ngn", row.amount or 0.0))
+    add_counts(session, changes)
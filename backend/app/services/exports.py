@@ -0,0 +1,92 @@
+"""
+Streaming CSV / NDJSON exports of trade history.
+
+Rows are read with `yield_per`, which on PostgreSQL uses a server-side cursor,
+and each fetched batch is encoded and sent as one chunk. Memory use stays at
+one batch however many rows are exported, and the first bytes go out as soon
+as the first batch is read. The export opens its own session on the caller's
+database so it does not depend on the request's session outliving the
+endpoint; StreamingResponse iterates it in the threadpool.
+
+Users export the records they are party to. Admins (finance, audit) can ask
+for ``scope=all`` to export the full history of every party.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Iterator
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, true
+from sqlmodel import Session
+from app.core.config import settings
+from app.core.policies import Policy
+from app.models.user import User, UserRole
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow("" if value is None else _plain(value) for value in row)
+    return buffer.getvalue()
+
+def _ndjson_chunk(columns: list[str], rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(columns, map(_plain, row))), separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+def stream_export(bind, model, where, export_format: str, batch_size: int) -> Iterator[str]:
+    """Yield `model` rows matching `where` in id order, one encoded chunk per batch."""
+    table = model.__table__
+    columns = [column.name for column in table.columns]
+    statement = (
+        select(*table.columns)
+        .where(where)
+        .order_by(table.c.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+    if export_format == "csv":
+        yield _csv_chunk([columns])
+    with Session(bind) as session:
+        for rows in session.execute(statement).partitions():
+            if export_format == "csv":
+                yield _csv_chunk(rows)
+            else:
+                yield _ndjson_chunk(columns, rows)
+
+def export_filter(policy: Policy, user: User, scope: str):
+    """Rows `user` may export: those `policy` grants, or every row for an admin asking for all."""
+    if scope != "all":
+        return policy.predicate(user)
+    if user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return true()
+
+def export_response(session: Session, model, where, export_format: str, name: str) -> StreamingResponse:
+    """Streaming download of an export, read from the database `session` is bound to."""
+    filename = f"{name}-{datetime.utcnow():%Y%m%dT%H%M%SZ}.{export_format}"
+    return StreamingResponse(
+        stream_export(session.get_bind(), model, where, export_format, settings.export_batch_size),
+        media_type=EXPORT_FORMATS[export_format],
+        # X-Accel-Buffering: pass chunks through nginx as they are produced
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,257 @@
+"""
+Bulk import of legacy farm and listing records (see scripts/import_legacy.py).
+
+Rows are processed in batches: each batch is validated against
+`FarmCreate` / `ListingCreate` with a single `TypeAdapter` call, checked
+against the database with one lookup query, inserted with one multi-row
+statement (`bulk_insert`: COPY on PostgreSQL) and committed. Rows that fail
+validation or a business rule are skipped and reported with their row
+number and reason; the rest of the batch is still imported.
+
+Farm rows name their farmer by ``farmer_email`` or ``farmer_id`` and may
+carry a ``ref`` (the legacy farm key). Listing rows name their farm by
+``farm_id`` or by ``farm_ref``, resolved against farms imported in the same
+run; the listing's farmer is the farm's owner.
+"""
+import csv
+import io
+import itertools
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Iterable, Iterator, Optional
+from pydantic import TypeAdapter, ValidationError
+from sqlmodel import Session, select
+from app.models.farm import Farm
+from app.models.listing import Listing, ListingStatus
+from app.models.user import User, UserRole
+from app.schemas.farm import FarmCreate
+from app.schemas.listing import ListingCreate
+from app.services.counters import add_counts, counter_name
+
+DEFAULT_BATCH_SIZE = 5000
+
+_farm_batch = TypeAdapter(list[FarmCreate])
+_listing_batch = TypeAdapter(list[ListingCreate])
+
+@dataclass
+class ImportReport:
+    read: int = 0
+    imported: int = 0
+    # (row number, reason); rows are numbered from 1, not counting a CSV header
+    rejects: list[tuple[int, str]] = field(default_factory=list)
+
+def read_rows(path: str) -> Iterator[dict]:
+    """Rows of a CSV, JSON array or NDJSON (.ndjson / .jsonl) file."""
+    if path.endswith((".ndjson", ".jsonl")):
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+    elif path.endswith(".json"):
+        with open(path, encoding="utf-8") as handle:
+            yield from json.load(handle)
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as handle:
+            for row in csv.DictReader(handle):
+                # Empty CSV cells are missing values, not empty strings
+                yield {key: value for key, value in row.items() if value not in ("", None)}
+
+def _batches(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    rows = iter(rows)
+    while batch := list(itertools.islice(rows, size)):
+        yield batch
+
+def _validate(adapter: TypeAdapter, rows: list[dict]) -> tuple[list[tuple[int, object]], dict[int, str]]:
+    """Validate a whole batch at once; returns (position, model) pairs and rejects by position."""
+    try:
+        return list(enumerate(adapter.validate_python(rows))), {}
+    except ValidationError as exc:
+        rejects = {}
+        for error in exc.errors():
+            position, *location = error["loc"]
+            rejects.setdefault(position, f"{'.'.join(map(str, location))}: {error['msg']}")
+    positions = [position for position in range(len(rows)) if position not in rejects]
+    models = adapter.validate_python([rows[position] for position in positions])
+    return list(zip(positions, models)), rejects
+
+def _executemany(session: Session, table, values: list[dict]):
+    # The driver's executemany with values converted once per column type,
+    # skipping SQLAlchemy's per-row parameter processing
+    connection = session.connection()
+    compiled = table.insert().compile(dialect=connection.dialect, column_keys=list(values[0]))
+    columns = compiled.positiontup if compiled.positional else list(values[0])
+    processors = [
+        (column, table.c[column].type.dialect_impl(connection.dialect).bind_processor(connection.dialect))
+        for column in columns
+    ]
+    converted = [
+        [processor(row[column]) if processor else row[column] for column, processor in processors]
+        for row in values
+    ]
+    if compiled.positional:
+        connection.exec_driver_sql(compiled.string, [tuple(row) for row in converted])
+    else:
+        connection.exec_driver_sql(compiled.string, [dict(zip(columns, row)) for row in converted])
+
+def _copy(session: Session, table, values: list[dict]):
+    # COPY takes enum labels as stored (member names) and ISO timestamps
+    connection = session.connection()
+    preparer = connection.dialect.identifier_preparer
+    columns = list(values[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in values:
+        writer.writerow(
+            value.name if isinstance(value, Enum)
+            else value.isoformat() if isinstance(value, datetime)
+            else value
+            for value in (row[column] for column in columns)
+        )
+    buffer.seek(0)
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {preparer.format_table(table)} ({', '.join(map(preparer.quote, columns))}) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+def bulk_insert(session: Session, table, values: list[dict]):
+    """
+    Insert rows (dicts with the same keys) in the session's transaction: COPY
+    on PostgreSQL, the driver's executemany elsewhere. No ORM events fire.
+    """
+    if not values:
+        return
+    if session.get_bind().dialect.name == "postgresql":
+        _copy(session, table, values)
+    else:
+        _executemany(session, table, values)
+
+def import_farms(
+    session: Session,
+    rows: Iterable[dict],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    refs: Optional[dict[str, int]] = None,
+) -> ImportReport:
+    """Import farm rows; `refs` collects legacy ``ref`` -> new farm id."""
+    report = ImportReport()
+    table = Farm.__table__
+    for batch in _batches(rows, batch_size):
+        first_row = report.read + 1
+        report.read += len(batch)
+        valid, rejects = _validate(_farm_batch, batch)
+
+        emails = {batch[position]["farmer_email"] for position, _ in valid if "farmer_email" in batch[position]}
+        ids = {
+            int(batch[position]["farmer_id"]) for position, _ in valid
+            if str(batch[position].get("farmer_id", "")).isdigit()
+        }
+        farmers = session.exec(
+            select(User).where(User.email.in_(emails) | User.id.in_(ids))
+        ).all()
+        by_email = {farmer.email: farmer for farmer in farmers}
+        by_id = {str(farmer.id): farmer for farmer in farmers}
+
+        now = datetime.utcnow()
+        values, keys = [], []
+        for position, farm in valid:
+            raw = batch[position]
+            if "farmer_id" in raw:
+                farmer = by_id.get(str(raw["farmer_id"]))
+            else:
+                farmer = by_email.get(raw.get("farmer_email"))
+            if farmer is None:
+                rejects[position] = "farmer not found"
+            elif farmer.role != UserRole.FARMER or not farmer.is_active:
+                rejects[position] = "user is not an active farmer"
+            elif not farmer.is_verified:
+                rejects[position] = "KYC verification required to create farms"
+            else:
+                values.append({
+                    **farm.model_dump(), "farmer_id": farmer.id,
+                    "is_active": True, "created_at": now, "updated_at": now,
+                })
+                keys.append(raw.get("ref"))
+
+        if values:
+            if refs is not None and any(key is not None for key in keys):
+                # insertmanyvalues: still one statement per page of rows
+                new_ids = session.connection().execute(
+                    table.insert().returning(table.c.id, sort_by_parameter_order=True), values
+                ).scalars().all()
+                refs.update((str(key), new_id) for key, new_id in zip(keys, new_ids) if key is not None)
+            else:
+                bulk_insert(session, table, values)
+        session.commit()
+
+        report.imported += len(values)
+        report.rejects.extend((first_row + position, reason) for position, reason in sorted(rejects.items()))
+    return report
+
+def import_listings(
+    session: Session,
+    rows: Iterable[dict],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    farm_refs: Optional[dict[str, int]] = None,
+) -> ImportReport:
+    """Import listing rows; ``farm_ref`` values are looked up in `farm_refs`."""
+    report = ImportReport()
+    farm_refs = farm_refs or {}
+    for batch in _batches(rows, batch_size):
+        first_row = report.read + 1
+        report.read += len(batch)
+        rejects = {}
+        for position, raw in enumerate(batch):
+            if "farm_id" not in raw and "farm_ref" in raw:
+                if str(raw["farm_ref"]) in farm_refs:
+                    batch[position] = {**raw, "farm_id": farm_refs[str(raw["farm_ref"])]}
+                else:
+                    rejects[position] = "unknown farm_ref"
+        candidates = [position for position in range(len(batch)) if position not in rejects]
+        valid, invalid = _validate(_listing_batch, [batch[position] for position in candidates])
+        rejects.update((candidates[index], reason) for index, reason in invalid.items())
+        valid = [(candidates[index], listing) for index, listing in valid]
+
+        farms = dict(session.exec(
+            select(Farm.id, Farm.farmer_id).where(
+                Farm.id.in_({listing.farm_id for _, listing in valid}), Farm.is_active
+            )
+        ).all())
+
+        now = datetime.utcnow()
+        values = []
+        for position, listing in valid:
+            if listing.farm_id not in farms:
+                rejects[position] = "farm not found"
+            elif listing.quantity_kg <= 0 or listing.unit_price_ngn <= 0:
+                rejects[position] = "quantity and price must be positive"
+            else:
+                values.append({
+                    **listing.model_dump(),
+                    "farmer_id": farms[listing.farm_id],
+                    "remaining_kg": listing.quantity_kg,
+                    "total_price_ngn": listing.quantity_kg * listing.unit_price_ngn,
+                    "status": ListingStatus.ACTIVE,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+
+        if values:
+            bulk_insert(session, Listing.__table__, values)
+            # Core inserts bypass the ORM flush hook that maintains counters
+            active = Counter(row["farmer_id"] for row in values)
+            add_counts(session, [
+                (farmer_id, counter_name(Listing, ListingStatus.ACTIVE), count)
+                for farmer_id, count in active.items()
+            ])
+        session.commit()
+
+        report.imported += len(values)
+        report.rejects.extend((first_row + position, reason) for position, reason in sorted(rejects.items()))
+    return report
@@ -0,0 +1,100 @@
+"""
+Listing inventory: remaining quantity is tracked on the listing row and only
+ever changed by single conditional UPDATE statements, so concurrent offers
+and contracts on the same listing cannot oversell it. Each statement locks
+just that row for the rest of the caller's transaction; no read-modify-write
+round trip is needed.
+
+A listing is SOLD exactly when nothing is left: reservations and resizes
+clamp the remaining quantity to zero below ``EPSILON_KG`` and flip the
+status in the same statement, and keep the ``listings.active`` counter in
+step.
+"""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import and_, case, literal, select, update
+from sqlmodel import Session
+from app.models.listing import Listing, ListingStatus
+from app.services.counters import add_counts, counter_name
+
+# Float kg arithmetic tolerance; a listing with less than this left is sold out
+EPSILON_KG = 1e-6
+
+def reserve_quantity(session: Session, listing_id: int, quantity_kg: float) -> Optional[float]:
+    """
+    Take `quantity_kg` from an ACTIVE listing, marking it SOLD when exhausted.
+
+    Returns the quantity left, or None when the listing is not active or does
+    not have enough left (nothing is changed then). Runs in the caller's
+    transaction: commit to make the reservation visible, roll back to undo it.
+    """
+    left = Listing.remaining_kg - quantity_kg
+    result = session.exec(
+        update(Listing)
+        .where(
+            Listing.id == listing_id,
+            Listing.status == ListingStatus.ACTIVE,
+            Listing.remaining_kg >= quantity_kg - EPSILON_KG,
+        )
+        .values(
+            remaining_kg=case((left < EPSILON_KG, 0.0), else_=left),
+            status=case((left < EPSILON_KG, literal(ListingStatus.SOLD, Listing.status.type)), else_=Listing.status),
+            updated_at=datetime.utcnow(),
+        )
+        .returning(Listing.remaining_kg, Listing.farmer_id)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    remaining, farmer_id = row
+    if remaining == 0:
+        add_counts(session, [(farmer_id, counter_name(Listing, ListingStatus.ACTIVE), -1)])
+    return remaining
+
+def resize_listing(session: Session, listing_id: int, quantity_kg: float) -> bool:
+    """
+    Change a listing's total quantity, moving its remaining quantity by the
+    same amount. Refused (returns False) when the new total is below what is
+    already under contract.
+
+    Shrinking an ACTIVE listing to what is under contract marks it SOLD;
+    growing a SOLD listing re-opens it as ACTIVE, since SOLD only means
+    nothing was left. Other statuses (EXPIRED, CANCELLED) are kept.
+    """
+    # The counter change depends on the status before the update: lock the row
+    # first so a concurrent reservation cannot change it in between
+    before = session.exec(
+        select(Listing.status).where(Listing.id == listing_id).with_for_update()
+    ).first()
+    if before is None:
+        return False
+    previous_status = ListingStatus(before[0])
+
+    left = Listing.remaining_kg + (quantity_kg - Listing.quantity_kg)
+    status_type = Listing.status.type
+    result = session.exec(
+        update(Listing)
+        .where(Listing.id == listing_id, left >= -EPSILON_KG)
+        .values(
+            quantity_kg=quantity_kg,
+            remaining_kg=case((left < EPSILON_KG, 0.0), else_=left),
+            status=case(
+                (and_(Listing.status == ListingStatus.ACTIVE, left < EPSILON_KG), literal(ListingStatus.SOLD, status_type)),
+                (and_(Listing.status == ListingStatus.SOLD, left >= EPSILON_KG), literal(ListingStatus.ACTIVE, status_type)),
+                else_=Listing.status,
+            ),
+            # Picked up by the matching engine's listing sync
+            updated_at=datetime.utcnow(),
+        )
+        .returning(Listing.status, Listing.farmer_id)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.first()
+    if row is None:
+        return False
+    status, farmer_id = ListingStatus(row[0]), row[1]
+    if status != previous_status:
+        active = counter_name(Listing, ListingStatus.ACTIVE)
+        add_counts(session, [(farmer_id, active, 1 if status == ListingStatus.ACTIVE else -1)])
+    return True
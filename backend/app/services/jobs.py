@@ -0,0 +1,474 @@
+"""
+Background jobs: a small durable queue plus the worker that drains it.
+
+Request handlers call `enqueue(session, name, **payload)`; the job runs in
+the worker process (``python worker.py``) with its own database session.
+Handlers are plain functions registered with `@job(name)` in
+app.services.tasks and must be idempotent: a job runs at least once.
+
+Two stores hold queued jobs:
+
+* Redis, when ``REDIS_URL`` is set: jobs are pushed once the enqueuing
+  transaction commits (so a rolled back request never runs its jobs) and
+  claimed by a Lua script, without touching the database;
+* the ``job`` table otherwise, or when Redis cannot be reached at enqueue
+  time: jobs are inserted in the caller's transaction and claimed with
+  ``FOR UPDATE SKIP LOCKED`` so several workers never take the same row.
+
+The worker always drains both. A claimed job holds a lease
+(``JOB_LEASE_SECONDS``); jobs of a worker that died are claimed again once
+it expires. Failures are retried with exponential backoff
+(``JOB_RETRY_BACKOFF`` * 2^attempt) and, after their last attempt, moved to
+the dead-letter set for inspection and `requeue_dead`. Periodic jobs
+registered with `every()` are enqueued by whichever worker gets there first
+in each interval.
+"""
+import json
+import logging
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from sqlalchemy import event, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.core import tracing
+from app.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+_SESSION_KEY = "pending_jobs"
+# Payload key carrying the enqueuing request's trace context
+TRACE_KEY = "_trace"
+
+@dataclass
+class JobSpec:
+    name: str
+    func: Callable
+    max_attempts: int
+
+@dataclass
+class Schedule:
+    name: str
+    interval: float
+    payload: dict
+
+@dataclass
+class QueuedJob:
+    """A claimed job, as handed to the worker."""
+    id: str
+    name: str
+    payload: dict
+    attempts: int
+    max_attempts: int
+
+REGISTRY: dict[str, JobSpec] = {}
+SCHEDULES: list[Schedule] = []
+
+def job(name: str, max_attempts: Optional[int] = None):
+    """Register `func(session, **payload)` as the handler for jobs called `name`."""
+    def register(func):
+        REGISTRY[name] = JobSpec(name, func, max_attempts or settings.job_max_attempts)
+        return func
+    return register
+
+def every(seconds: float, name: str, **payload):
+    """Run job `name` once per `seconds` across all workers."""
+    SCHEDULES.append(Schedule(name, seconds, payload))
+
+def _max_attempts(name: str) -> int:
+    spec = REGISTRY.get(name)
+    return spec.max_attempts if spec else settings.job_max_attempts
+
+def _add_row(session: Session, name: str, payload: dict, run_at: datetime, unique_key: Optional[str] = None):
+    session.add(Job(
+        name=name, payload=json.dumps(payload), run_at=run_at,
+        max_attempts=_max_attempts(name), unique_key=unique_key,
+    ))
+
+# -- SQL store -----------------------------------------------------------------
+
+class SQLJobStore:
+    name = "sql"
+
+    def __init__(self, session_factory: Callable[[], Session]):
+        self.session_factory = session_factory
+
+    def push(self, jobs: list[tuple[str, dict, datetime]]):
+        with self.session_factory() as session:
+            for name, payload, run_at in jobs:
+                _add_row(session, name, payload, run_at)
+            session.commit()
+
+    def push_unique(self, key: str, name: str, payload: dict, ttl: float) -> bool:
+        with self.session_factory() as session:
+            _add_row(session, name, payload, datetime.utcnow(), unique_key=key)
+            try:
+                session.commit()
+            except IntegrityError:
+                session.rollback()
+                return False
+        return True
+
+    def claim(self, limit: int, lease_seconds: float) -> list[QueuedJob]:
+        now = datetime.utcnow()
+        due = (
+            select(Job.id)
+            .where(or_(
+                (Job.status == JobStatus.QUEUED) & (Job.run_at <= now),
+                (Job.status == JobStatus.RUNNING) & (Job.locked_until < now),
+            ))
+            .order_by(Job.run_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        with self.session_factory() as session:
+            rows = session.execute(
+                update(Job)
+                .where(Job.id.in_(due))
+                .values(
+                    status=JobStatus.RUNNING, attempts=Job.attempts + 1,
+                    locked_until=now + timedelta(seconds=lease_seconds), updated_at=now,
+                )
+                .returning(Job.id, Job.name, Job.payload, Job.attempts, Job.max_attempts)
+                .execution_options(synchronize_session=False)
+            ).all()
+            session.commit()
+        return [
+            QueuedJob(str(row.id), row.name, json.loads(row.payload), row.attempts, row.max_attempts)
+            for row in rows
+        ]
+
+    def _finish(self, queued: QueuedJob, **values):
+        with self.session_factory() as session:
+            session.execute(
+                update(Job).where(Job.id == int(queued.id))
+                .values(locked_until=None, updated_at=datetime.utcnow(), **values)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+
+    def complete(self, queued: QueuedJob):
+        self._finish(queued, status=JobStatus.DONE)
+
+    def retry(self, queued: QueuedJob, run_at: datetime, error: str):
+        self._finish(queued, status=JobStatus.QUEUED, run_at=run_at, last_error=error)
+
+    def bury(self, queued: QueuedJob, error: str):
+        self._finish(queued, status=JobStatus.DEAD, last_error=error)
+
+    def dead(self, limit: int = 100) -> list[dict]:
+        with self.session_factory() as session:
+            jobs = session.execute(
+                select(Job).where(Job.status == JobStatus.DEAD).order_by(Job.updated_at.desc()).limit(limit)
+            ).scalars().all()
+            return [
+                {"id": str(row.id), "name": row.name, "payload": json.loads(row.payload),
+                 "attempts": row.attempts, "error": row.last_error}
+                for row in jobs
+            ]
+
+    def requeue_dead(self, ids: Optional[list[str]] = None) -> int:
+        statement = update(Job).where(Job.status == JobStatus.DEAD)
+        if ids is not None:
+            statement = statement.where(Job.id.in_([int(job_id) for job_id in ids]))
+        with self.session_factory() as session:
+            result = session.execute(
+                statement.values(status=JobStatus.QUEUED, attempts=0, run_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+            return result.rowcount
+
+# -- Redis store ---------------------------------------------------------------
+
+# Reclaim expired leases, then move up to ARGV[2] due jobs to the running set.
+# KEYS: due zset, running zset, data hash. ARGV: now, limit, lease expiry.
+_CLAIM_LUA = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for _, id in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], id)
+    redis.call('ZADD', KEYS[1], ARGV[1], id)
+end
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+local claimed = {}
+for _, id in ipairs(ids) do
+    redis.call('ZREM', KEYS[1], id)
+    local data = redis.call('HGET', KEYS[3], id)
+    if data then
+        local job = cjson.decode(data)
+        job['attempts'] = job['attempts'] + 1
+        data = cjson.encode(job)
+        redis.call('HSET', KEYS[3], id, data)
+        redis.call('ZADD', KEYS[2], ARGV[3], id)
+        table.insert(claimed, data)
+    end
+end
+return claimed
+"""
+
+class RedisJobStore:
+    name = "redis"
+    DUE, RUNNING, DATA = "jobs:due", "jobs:running", "jobs:data"
+    # Dead-lettered jobs by id, plus their ids scored by burial time (newest first, as in the table)
+    DEAD, DEAD_AT = "jobs:dead", "jobs:dead:at"
+
+    def __init__(self, client):
+        self.client = client
+        self._claim = client.register_script(_CLAIM_LUA)
+
+    def push(self, jobs: list[tuple[str, dict, datetime]]):
+        pipe = self.client.pipeline(transaction=True)
+        for name, payload, run_at in jobs:
+            job_id = uuid.uuid4().hex
+            pipe.hset(self.DATA, job_id, json.dumps({
+                "id": job_id, "name": name, "payload": payload,
+                "attempts": 0, "max_attempts": _max_attempts(name),
+            }))
+            pipe.zadd(self.DUE, {job_id: _epoch(run_at)})
+        pipe.execute()
+
+    def push_unique(self, key: str, name: str, payload: dict, ttl: float) -> bool:
+        if not self.client.set(f"jobs:unique:{key}", 1, nx=True, px=int(ttl * 1000)):
+            return False
+        self.push([(name, payload, datetime.utcnow())])
+        return True
+
+    def claim(self, limit: int, lease_seconds: float) -> list[QueuedJob]:
+        now = time.time()
+        claimed = self._claim(keys=[self.DUE, self.RUNNING, self.DATA], args=[now, limit, now + lease_seconds])
+        jobs = []
+        for data in claimed:
+            item = json.loads(data)
+            jobs.append(QueuedJob(item["id"], item["name"], item["payload"], item["attempts"], item["max_attempts"]))
+        return jobs
+
+    def complete(self, queued: QueuedJob):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrem(self.RUNNING, queued.id)
+        pipe.hdel(self.DATA, queued.id)
+        pipe.execute()
+
+    def retry(self, queued: QueuedJob, run_at: datetime, error: str):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrem(self.RUNNING, queued.id)
+        pipe.hset(self.DATA, queued.id, json.dumps({
+            "id": queued.id, "name": queued.name, "payload": queued.payload,
+            "attempts": queued.attempts, "max_attempts": queued.max_attempts, "last_error": error,
+        }))
+        pipe.zadd(self.DUE, {queued.id: _epoch(run_at)})
+        pipe.execute()
+
+    def bury(self, queued: QueuedJob, error: str):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrem(self.RUNNING, queued.id)
+        pipe.hdel(self.DATA, queued.id)
+        pipe.hset(self.DEAD, queued.id, json.dumps({
+            "id": queued.id, "name": queued.name, "payload": queued.payload,
+            "attempts": queued.attempts, "error": error,
+        }))
+        pipe.zadd(self.DEAD_AT, {queued.id: time.time()})
+        pipe.execute()
+
+    def dead(self, limit: int = 100) -> list[dict]:
+        ids = self.client.zrevrange(self.DEAD_AT, 0, limit - 1)
+        if not ids:
+            return []
+        return [json.loads(data) for data in self.client.hmget(self.DEAD, ids) if data]
+
+    def requeue_dead(self, ids: Optional[list[str]] = None) -> int:
+        entries = [json.loads(data) for data in self.client.hvals(self.DEAD)]
+        entries = [entry for entry in entries if ids is None or entry["id"] in ids]
+        if entries:
+            self.push([(entry["name"], entry["payload"], datetime.utcnow()) for entry in entries])
+            buried = [entry["id"] for entry in entries]
+            pipe = self.client.pipeline(transaction=True)
+            pipe.hdel(self.DEAD, *buried)
+            pipe.zrem(self.DEAD_AT, *buried)
+            pipe.execute()
+        return len(entries)
+
+def _epoch(moment: datetime) -> float:
+    return (moment - datetime(1970, 1, 1)).total_seconds()
+
+def get_job_stores(session_factory: Optional[Callable[[], Session]] = None) -> list:
+    """The stores a worker drains: Redis (when configured) and the job table."""
+    if session_factory is None:
+        from app.core.database import engine as db_engine
+        session_factory = lambda: Session(db_engine)  # noqa: E731
+    stores = []
+    client = get_redis()
+    if client is not None:
+        stores.append(RedisJobStore(client))
+    stores.append(SQLJobStore(session_factory))
+    return stores
+
+# -- enqueueing ----------------------------------------------------------------
+
+def enqueue(session: Session, name: str, delay: float = 0, **payload):
+    """
+    Queue job `name` to run after the session's transaction commits (in the
+    job table, as part of that transaction, when Redis is not configured).
+    """
+    run_at = datetime.utcnow() + timedelta(seconds=delay)
+    # The job's span continues the enqueuing request's trace
+    carrier = tracing.inject()
+    if carrier:
+        payload[TRACE_KEY] = carrier
+    if get_redis() is None:
+        _add_row(session, name, payload, run_at)
+    else:
+        session.info.setdefault(_SESSION_KEY, []).append((name, payload, run_at))
+
+@event.listens_for(Session, "after_commit")
+def _push_pending(session):
+    pending = session.info.pop(_SESSION_KEY, None)
+    if not pending:
+        return
+    client = get_redis()
+    try:
+        RedisJobStore(client).push(pending)
+        return
+    except Exception:
+        logger.warning("Redis job queue unavailable, queueing %d jobs in the job table", len(pending), exc_info=True)
+    # The request's transaction is over; the fallback insert gets its own
+    with Session(session.get_bind()) as fallback:
+        for name, payload, run_at in pending:
+            _add_row(fallback, name, payload, run_at)
+        fallback.commit()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_SESSION_KEY, None)
+
+# -- worker --------------------------------------------------------------------
+
+@dataclass
+class WorkerStats:
+    completed: int = 0
+    retried: int = 0
+    dead: int = 0
+
+class Worker:
+    """Claims jobs from the stores and runs them on a bounded thread pool."""
+
+    def __init__(
+        self,
+        stores: list,
+        session_factory: Callable[[], Session],
+        concurrency: int = 4,
+        lease_seconds: float = 300,
+        retry_backoff: float = 10.0,
+        schedules: Optional[list[Schedule]] = None,
+    ):
+        self.stores = stores
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.retry_backoff = retry_backoff
+        self.schedules = SCHEDULES if schedules is None else schedules
+        self.stats = WorkerStats()
+        self._next_runs: dict[str, float] = {}
+        self._slots = threading.Semaphore(concurrency)
+        self._stop = threading.Event()
+
+    def schedule_due(self, now: Optional[float] = None) -> int:
+        """Enqueue periodic jobs whose interval has come round; returns how many this worker added."""
+        now = time.time() if now is None else now
+        added = 0
+        for schedule in self.schedules:
+            if self._next_runs.get(schedule.name, 0) > now:
+                continue
+            slot = int(now // schedule.interval)
+            self._next_runs[schedule.name] = (slot + 1) * schedule.interval
+            key = f"{schedule.name}:{slot}"
+            try:
+                if self.stores[0].push_unique(key, schedule.name, schedule.payload, schedule.interval * 2):
+                    added += 1
+            except Exception:
+                logger.exception("Scheduling %s failed", schedule.name)
+        return added
+
+    def execute(self, store, queued: QueuedJob):
+        spec = REGISTRY.get(queued.name)
+        payload = dict(queued.payload)
+        parent = tracing.extract(payload.pop(TRACE_KEY, None))
+        try:
+            if spec is None:
+                raise LookupError(f"No handler registered for job {queued.name!r}")
+            attributes = {"job.id": queued.id, "job.attempt": queued.attempts}
+            with tracing.span(f"job {queued.name}", kind="consumer", context=parent, **attributes):
+                with self.session_factory() as session:
+                    spec.func(session, **payload)
+                    session.commit()
+        except Exception as exc:
+            error = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+            if queued.attempts >= queued.max_attempts or spec is None:
+                logger.error("Job %s %s failed for good after %d attempts: %s", queued.name, queued.id, queued.attempts, error)
+                store.bury(queued, error)
+                self.stats.dead += 1
+            else:
+                delay = self.retry_backoff * 2 ** (queued.attempts - 1)
+                logger.warning("Job %s %s failed (attempt %d), retrying in %.0fs: %s", queued.name, queued.id, queued.attempts, delay, error)
+                store.retry(queued, datetime.utcnow() + timedelta(seconds=delay), error)
+                self.stats.retried += 1
+            return
+        store.complete(queued)
+        self.stats.completed += 1
+
+    def run_pending(self) -> int:
+        """Claim and run everything due, inline (for tests and one-off runs)."""
+        ran = 0
+        for store in self.stores:
+            while True:
+                claimed = store.claim(self.concurrency, self.lease_seconds)
+                if not claimed:
+                    break
+                for queued in claimed:
+                    self.execute(store, queued)
+                    ran += 1
+        return ran
+
+    def _run_and_release(self, store, queued: QueuedJob):
+        try:
+            self.execute(store, queued)
+        except Exception:
+            logger.exception("Job bookkeeping failed for %s %s", queued.name, queued.id)
+        finally:
+            self._slots.release()
+
+    def run(self, poll_interval: float = 1.0):
+        """Poll until `stop()`, keeping at most `concurrency` jobs in flight."""
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="job") as pool:
+            while not self._stop.is_set():
+                self.schedule_due()
+                busy = False
+                for store in self.stores:
+                    free = 0
+                    while free < self.concurrency and self._slots.acquire(blocking=False):
+                        free += 1
+                    if not free:
+                        break
+                    try:
+                        claimed = store.claim(free, self.lease_seconds)
+                    except Exception:
+                        logger.exception("Claiming jobs from the %s store failed", store.name)
+                        claimed = []
+                    for _ in range(free - len(claimed)):
+                        self._slots.release()
+                    for queued in claimed:
+                        pool.submit(self._run_and_release, store, queued)
+                    busy = busy or bool(claimed)
+                if not busy:
+                    self._stop.wait(poll_interval)
+        # Leaving the with block waits for jobs in flight to finish
+
+    def stop(self):
+        self._stop.set()
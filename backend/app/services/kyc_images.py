@@ -0,0 +1,107 @@
+"""
+Review previews for KYC uploads.
+
+Uploads are kept untouched for audit. After an upload commits, the worker
+(`kyc.process` job) renders two JPEG variants of every image document: a
+preview (``KYC_PREVIEW_MAX_PX`` on the longest side) for the review screen
+and a thumbnail (``KYC_THUMBNAIL_MAX_PX``) for the queue. Variants are
+rotated upright from the EXIF orientation, flattened to RGB and re-encoded
+from pixels only, so camera metadata (GPS position, device, timestamps)
+never reaches the reviewer. Non-image uploads such as PDFs get no variants
+and are reviewed from the original.
+
+Pillow is optional: without it uploads are accepted as before and simply
+have no previews.
+"""
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Optional
+from sqlmodel import Session
+from app.core.config import settings
+from app.core.tracing import traced
+from app.models.kyc import KYC
+
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError
+except ImportError:  # pragma: no cover - exercised only without Pillow
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+VARIANTS = ("preview", "thumbnail")
+
+def previews_dir() -> str:
+    return os.path.join(settings.file_storage_dir, "previews")
+
+def documents(kyc: KYC) -> dict[str, str]:
+    """The uploaded files of a submission by kind."""
+    paths = {
+        "document": kyc.document_file_path,
+        "selfie": kyc.selfie_file_path,
+        "business_registration": kyc.business_registration,
+    }
+    return {kind: path for kind, path in paths.items() if path}
+
+@traced("kyc.render_variants")
+def render_variants(source_path: str, output_dir: str, stem: str) -> Optional[dict]:
+    """
+    Write `<stem>_preview.jpg` and `<stem>_thumbnail.jpg` for an image; returns
+    their file names and sizes, or None when the file is not an image.
+    """
+    try:
+        with Image.open(source_path) as original:
+            image = ImageOps.exif_transpose(original)
+            if image.mode in ("RGBA", "LA", "P"):
+                # Flatten transparency onto white rather than black
+                image = image.convert("RGBA")
+                background = Image.new("RGB", image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel("A"))
+                image = background
+            else:
+                image = image.convert("RGB")
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        return None
+
+    os.makedirs(output_dir, exist_ok=True)
+    limits = {"preview": settings.kyc_preview_max_px, "thumbnail": settings.kyc_thumbnail_max_px}
+    variants = {}
+    for variant in VARIANTS:
+        resized = image.copy()
+        resized.thumbnail((limits[variant], limits[variant]), Image.LANCZOS)
+        filename = f"{stem}_{variant}.jpg"
+        path = os.path.join(output_dir, filename)
+        # Saved without exif/icc arguments: only the pixels are written
+        resized.save(path, "JPEG", quality=settings.kyc_preview_quality, optimize=True, progressive=True)
+        variants[variant] = {
+            "file": filename, "width": resized.width, "height": resized.height, "bytes": os.path.getsize(path),
+        }
+    return variants
+
+def process_kyc(session: Session, kyc: KYC) -> dict:
+    """Render previews for every image document of `kyc` and record them."""
+    if Image is None:
+        logger.warning("Pillow is not installed, KYC %s gets no previews", kyc.id)
+        return {}
+    previews = {}
+    for kind, path in documents(kyc).items():
+        if not os.path.exists(path):
+            logger.warning("KYC %s %s file %s is missing", kyc.id, kind, path)
+            continue
+        variants = render_variants(path, previews_dir(), f"kyc_{kyc.id}_{kind}")
+        if variants:
+            previews[kind] = variants
+    kyc.previews = json.dumps(previews)
+    kyc.processed_at = datetime.utcnow()
+    session.add(kyc)
+    return previews
+
+def preview_path(kyc: KYC, kind: str, variant: str) -> Optional[str]:
+    """Path of a rendered variant, or None if there is none."""
+    if not kyc.previews or variant not in VARIANTS:
+        return None
+    entry = json.loads(kyc.previews).get(kind)
+    if not entry:
+        return None
+    return os.path.join(previews_dir(), entry[variant]["file"])
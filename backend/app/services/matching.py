@@ -0,0 +1,599 @@
+"""
+Price-time priority matching engine for standing buy orders against listings.
+
+One order book per (produce type, quality grade). Asks are ACTIVE listings
+with quantity left; bids are OPEN buy orders. A new bid trades against the
+cheapest asks first (oldest first at equal price) while the ask price is
+within the bid's limit; a new ask trades against the highest bids. Trades
+execute at the resting order's price and may partially fill either side.
+
+The book lives in memory so matching never touches the database. Fills are
+handed to a write-behind persister that writes them in batches (an ACCEPTED
+Offer plus a Contract per fill, buy order remaining quantity, sold-out
+listings) on a background thread.
+
+The engine is authoritative only within a single process: run it in one
+worker (the `market` service) with MATCHING_ENGINE_ENABLED=true. Listings
+created or changed by other workers are picked up by a periodic sync, and the
+persister reserves quantity with the same conditional UPDATE as contracts
+created through the API, so a listing sold elsewhere is never oversold.
+A fill that cannot be written (it keeps raising) is retried on its own with
+backoff and, after ``MATCHING_WRITE_ATTEMPTS``, dropped and logged; its
+quantity goes back to the book like a rejected fill.
+"""
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from sqlmodel import Session, select
+from app.core.config import settings
+from app.core.identifiers import CONTRACT_PREFIX, new_business_id
+from app.models.buy_order import BuyOrder, BuyOrderStatus
+from app.models.contract import Contract
+from app.models.listing import Listing, ListingStatus, ProduceType
+from app.models.offer import Offer, OfferStatus
+from app.services.inventory import EPSILON_KG, reserve_quantity
+
+logger = logging.getLogger(__name__)
+
+BookKey = tuple[ProduceType, str]
+
+def book_key(produce_type: ProduceType, quality_grade: Optional[str]) -> BookKey:
+    return ProduceType(produce_type), (quality_grade or "").strip().upper()
+
+@dataclass
+class Ask:
+    listing_id: int
+    farmer_id: int
+    price: float
+    remaining: float
+    seq: int
+    active: bool = True
+
+@dataclass
+class Bid:
+    order_id: int
+    buyer_id: int
+    limit_price: float
+    remaining: float
+    seq: int
+    delivery_location: str
+    delivery_date: Optional[datetime]
+    active: bool = True
+
+@dataclass
+class Fill:
+    buy_order_id: int
+    buyer_id: int
+    listing_id: int
+    farmer_id: int
+    quantity_kg: float
+    unit_price_ngn: float
+    delivery_location: str
+    delivery_date: Optional[datetime]
+    order_remaining_kg: float
+    listing_remaining_kg: float
+    matched_at: datetime = field(default_factory=datetime.utcnow)
+    attempts: int = 0
+
+class OrderBook:
+    """
+    Both sides of one (produce type, grade) market, as lazy-deletion heaps.
+
+    Entries are ``(price key, seq, push, order)``. An order put back on the
+    book keeps its `seq` (time priority) while its old entry is still in the
+    heap, so the per-push counter breaks that tie before the order objects
+    themselves would be compared.
+    """
+
+    def __init__(self):
+        self.asks: list[tuple[float, int, int, Ask]] = []
+        self.bids: list[tuple[float, int, int, Bid]] = []
+        self._pushes = itertools.count()
+
+    @staticmethod
+    def _best(side: list) -> Optional[object]:
+        while side and not (side[0][-1].active and side[0][-1].remaining > EPSILON_KG):
+            heapq.heappop(side)
+        return side[0][-1] if side else None
+
+    def best_ask(self) -> Optional[Ask]:
+        return self._best(self.asks)
+
+    def best_bid(self) -> Optional[Bid]:
+        return self._best(self.bids)
+
+    def rest_ask(self, ask: Ask):
+        heapq.heappush(self.asks, (ask.price, ask.seq, next(self._pushes), ask))
+
+    def rest_bid(self, bid: Bid):
+        heapq.heappush(self.bids, (-bid.limit_price, bid.seq, next(self._pushes), bid))
+
+    def match_bid(self, bid: Bid) -> list[Fill]:
+        fills = []
+        while bid.remaining > EPSILON_KG:
+            ask = self.best_ask()
+            if ask is None or ask.price > bid.limit_price:
+                break
+            fills.append(self._trade(bid, ask, ask.price))
+        if bid.remaining > EPSILON_KG:
+            self.rest_bid(bid)
+        return fills
+
+    def match_ask(self, ask: Ask) -> list[Fill]:
+        fills = []
+        while ask.remaining > EPSILON_KG:
+            bid = self.best_bid()
+            if bid is None or bid.limit_price < ask.price:
+                break
+            fills.append(self._trade(bid, ask, bid.limit_price))
+        if ask.remaining > EPSILON_KG:
+            self.rest_ask(ask)
+        return fills
+
+    @staticmethod
+    def _trade(bid: Bid, ask: Ask, price: float) -> Fill:
+        quantity = min(bid.remaining, ask.remaining)
+        bid.remaining -= quantity
+        ask.remaining -= quantity
+        return Fill(
+            buy_order_id=bid.order_id,
+            buyer_id=bid.buyer_id,
+            listing_id=ask.listing_id,
+            farmer_id=ask.farmer_id,
+            quantity_kg=quantity,
+            unit_price_ngn=price,
+            delivery_location=bid.delivery_location,
+            delivery_date=bid.delivery_date,
+            order_remaining_kg=max(bid.remaining, 0.0),
+            listing_remaining_kg=max(ask.remaining, 0.0),
+        )
+
+    def depth(self, levels: int) -> dict:
+        def aggregate(entries, sign):
+            by_price: dict[float, list] = {}
+            for *_, order in entries:
+                if order.active and order.remaining > EPSILON_KG:
+                    price = order.price if sign > 0 else order.limit_price
+                    level = by_price.setdefault(price, [0.0, 0])
+                    level[0] += order.remaining
+                    level[1] += 1
+            ordered = sorted(by_price.items(), key=lambda item: sign * item[0])[:levels]
+            return [{"price_ngn": price, "quantity_kg": qty, "orders": count} for price, (qty, count) in ordered]
+
+        return {"bids": aggregate(self.bids, -1), "asks": aggregate(self.asks, 1)}
+
+class FillPersister:
+    """
+    Write-behind persistence for fills. Fills are queued by the engine and
+    written in batches of up to `batch_size` per transaction, either by the
+    background thread or synchronously via `flush()`. When a batch fails its
+    fills are written one by one, so a single bad fill cannot hold up the
+    others; fills still failing wait out a backoff and are dropped after
+    `max_attempts`.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        on_rejected: Callable[[list[Fill]], None],
+        batch_size: int = 500,
+        max_attempts: int = 5,
+        retry_backoff: float = 0.5,
+    ):
+        self.session_factory = session_factory
+        self.on_rejected = on_rejected
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.queue: "queue.Queue[Fill]" = queue.Queue()
+        self.dropped = 0
+        self._retry_at = 0.0
+        self._write_lock = threading.Lock()
+        self._pending: dict[int, float] = {}
+        self._pending_lock = threading.Lock()
+
+    def submit(self, fills: list[Fill]):
+        self._track(fills, 1)
+        for fill in fills:
+            self.queue.put(fill)
+
+    def _drain(self) -> list[Fill]:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self) -> int:
+        """Persist everything queued so far; returns the number of fills written."""
+        written = 0
+        with self._write_lock:
+            if time.monotonic() < self._retry_at:
+                return written
+            while True:
+                batch = self._drain()
+                if not batch:
+                    return written
+                try:
+                    written += self._write(batch)
+                except Exception:
+                    logger.exception("Persisting %d fills failed, writing them one by one", len(batch))
+                    done, retrying = self._write_each(batch)
+                    written += done
+                    if retrying:
+                        return written
+
+    def _write_each(self, batch: list[Fill]) -> tuple[int, bool]:
+        """Write fills in their own transactions; returns (written, whether any wait for a retry)."""
+        written, retry, dropped = 0, [], []
+        for fill in batch:
+            try:
+                written += self._write([fill])
+            except Exception as exc:
+                fill.attempts += 1
+                if fill.attempts < self.max_attempts:
+                    retry.append(fill)
+                    continue
+                logger.error(
+                    "Dropping fill of %g kg (buy order %s, listing %s) after %d attempts: %s",
+                    fill.quantity_kg, fill.buy_order_id, fill.listing_id, fill.attempts, exc,
+                )
+                dropped.append(fill)
+        if retry:
+            attempts = max(fill.attempts for fill in retry)
+            self._retry_at = time.monotonic() + min(self.retry_backoff * 2 ** (attempts - 1), 60.0)
+            for fill in retry:
+                self.queue.put(fill)
+        if dropped:
+            self.dropped += len(dropped)
+            self._track(dropped, -1)
+            self._reject(dropped)
+        return written, bool(retry)
+
+    def _reject(self, fills: list[Fill]):
+        # Called once the fills are settled: an error here must not make them be written again
+        try:
+            self.on_rejected(fills)
+        except Exception:
+            logger.exception("Restoring %d rejected fills failed", len(fills))
+
+    def pending_kg(self, listing_id: int) -> float:
+        """Quantity matched against a listing but not yet written."""
+        with self._pending_lock:
+            return self._pending.get(listing_id, 0.0)
+
+    def _track(self, fills: list[Fill], sign: int):
+        with self._pending_lock:
+            for fill in fills:
+                pending = self._pending.get(fill.listing_id, 0.0) + sign * fill.quantity_kg
+                if pending > EPSILON_KG:
+                    self._pending[fill.listing_id] = pending
+                else:
+                    self._pending.pop(fill.listing_id, None)
+
+    def _write(self, batch: list[Fill]) -> int:
+        now = datetime.utcnow()
+        with self.session_factory() as session:
+            # Same conditional reservation as contracts created through the API,
+            # so a listing sold elsewhere in the meantime is never oversold
+            accepted, rejected = [], []
+            for fill in batch:
+                if reserve_quantity(session, fill.listing_id, fill.quantity_kg) is None:
+                    rejected.append(fill)
+                else:
+                    accepted.append(fill)
+
+            offers = [
+                Offer(
+                    quantity_kg=fill.quantity_kg,
+                    unit_price_ngn=fill.unit_price_ngn,
+                    total_price_ngn=fill.quantity_kg * fill.unit_price_ngn,
+                    delivery_date=fill.delivery_date,
+                    delivery_location=fill.delivery_location,
+                    notes=f"Matched from buy order {fill.buy_order_id}",
+                    status=OfferStatus.ACCEPTED,
+                    expires_at=now,
+                    buyer_id=fill.buyer_id,
+                    listing_id=fill.listing_id,
+                )
+                for fill in accepted
+            ]
+            session.add_all(offers)
+            session.flush()
+
+            session.add_all([
+                Contract(
+                    contract_number=new_business_id(CONTRACT_PREFIX),
+                    quantity_kg=fill.quantity_kg,
+                    unit_price_ngn=fill.unit_price_ngn,
+                    total_amount_ngn=fill.quantity_kg * fill.unit_price_ngn,
+                    delivery_date=fill.delivery_date or now,
+                    delivery_location=fill.delivery_location,
+                    farmer_id=fill.farmer_id,
+                    buyer_id=fill.buyer_id,
+                    listing_id=fill.listing_id,
+                    offer_id=offer.id,
+                )
+                for fill, offer in zip(accepted, offers)
+            ])
+
+            filled: dict[int, float] = {}
+            for fill in accepted:
+                filled[fill.buy_order_id] = filled.get(fill.buy_order_id, 0.0) + fill.quantity_kg
+            orders = session.exec(select(BuyOrder).where(BuyOrder.id.in_(list(filled)))).all()
+            for order in orders:
+                order.remaining_kg = max(order.remaining_kg - filled.get(order.id, 0.0), 0.0)
+                if order.remaining_kg <= EPSILON_KG and order.status == BuyOrderStatus.OPEN:
+                    order.status = BuyOrderStatus.FILLED
+                order.updated_at = now
+
+            session.commit()
+
+        self._track(batch, -1)
+        if rejected:
+            self._reject(rejected)
+        return len(accepted)
+
+class MatchingEngine:
+    """In-memory order books plus the write-behind persister and listing sync."""
+
+    def __init__(self, session_factory: Callable[[], Session], sync_interval: float = 1.0):
+        self.session_factory = session_factory
+        self.sync_interval = sync_interval
+        self.books: dict[BookKey, OrderBook] = {}
+        self.asks: dict[int, tuple[BookKey, Ask]] = {}
+        self.bids: dict[int, tuple[BookKey, Bid]] = {}
+        # Orders cancelled on the book whose cancel may not be committed yet
+        self.cancelled: set[int] = set()
+        self.persister = FillPersister(
+            session_factory, self._restore, settings.matching_batch_size,
+            settings.matching_write_attempts, settings.matching_retry_backoff,
+        )
+        self._seq = itertools.count()
+        self._lock = threading.RLock()
+        self._synced_at: Optional[datetime] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _book(self, key: BookKey) -> OrderBook:
+        if key not in self.books:
+            self.books[key] = OrderBook()
+        return self.books[key]
+
+    # -- loading and syncing -------------------------------------------------
+
+    def load(self):
+        """Rebuild the books from OPEN buy orders and ACTIVE listings."""
+        with self.session_factory() as session:
+            self._synced_at = datetime.utcnow()
+            orders = session.exec(
+                select(BuyOrder).where(BuyOrder.status == BuyOrderStatus.OPEN).order_by(BuyOrder.created_at)
+            ).all()
+            listings = session.exec(
+                select(Listing).where(Listing.status == ListingStatus.ACTIVE).order_by(Listing.created_at)
+            ).all()
+
+        with self._lock:
+            self.books.clear()
+            self.asks.clear()
+            self.bids.clear()
+            self.cancelled.clear()
+            for order in orders:
+                self._rest_order(order)
+            fills = []
+            for listing in listings:
+                fills.extend(self._add_ask(listing, listing.remaining_kg))
+        self.persister.submit(fills)
+
+    def sync(self):
+        """Pick up listings created or changed (e.g. by other workers) since the last sync."""
+        # Timestamps are set before commit, so a row stamped just before the
+        # last sync may only have become visible after it: re-read a margin
+        # (refreshing a listing that did not change is harmless)
+        overlap = timedelta(seconds=self.sync_interval + settings.matching_sync_overlap)
+        since = self._synced_at - overlap if self._synced_at else datetime.min
+        with self.session_factory() as session:
+            self._synced_at = datetime.utcnow()
+            changed = session.exec(
+                select(Listing).where((Listing.updated_at >= since) | (Listing.created_at >= since))
+            ).all()
+        self._refresh_listings(changed)
+
+    def _refresh_listings(self, listings: list[Listing]):
+        # The database does not yet reflect fills still queued for writing
+        fills = []
+        with self._lock:
+            for listing in listings:
+                previous = self.asks.get(listing.id)
+                self._remove_ask(listing.id)
+                if listing.status != ListingStatus.ACTIVE:
+                    continue
+                # A listing keeps its time priority unless its price changed
+                seq = previous[1].seq if previous and previous[1].price == listing.unit_price_ngn else None
+                remaining = listing.remaining_kg - self.persister.pending_kg(listing.id)
+                fills.extend(self._add_ask(listing, remaining, seq))
+        self.persister.submit(fills)
+
+    # -- order entry ---------------------------------------------------------
+
+    def _bid(self, order: BuyOrder, remaining: float, seq: Optional[int] = None) -> Bid:
+        return Bid(
+            order_id=order.id,
+            buyer_id=order.buyer_id,
+            limit_price=order.limit_price_ngn,
+            remaining=remaining,
+            seq=next(self._seq) if seq is None else seq,
+            delivery_location=order.delivery_location,
+            delivery_date=order.delivery_date,
+        )
+
+    def _rest_order(self, order: BuyOrder):
+        key = book_key(order.produce_type, order.quality_grade)
+        bid = self._bid(order, order.remaining_kg)
+        self.bids[order.id] = (key, bid)
+        self._book(key).rest_bid(bid)
+
+    def submit_buy_order(self, order: BuyOrder) -> list[Fill]:
+        """Match a new buy order; whatever is left rests on the book."""
+        key = book_key(order.produce_type, order.quality_grade)
+        bid = self._bid(order, order.remaining_kg)
+        with self._lock:
+            self.bids[order.id] = (key, bid)
+            fills = self._book(key).match_bid(bid)
+            self._forget_filled(fills)
+        self.persister.submit(fills)
+        return fills
+
+    def _add_ask(self, listing: Listing, remaining: float, seq: Optional[int] = None) -> list[Fill]:
+        if remaining <= EPSILON_KG:
+            return []
+        key = book_key(listing.produce_type, listing.quality_grade)
+        ask = Ask(
+            listing_id=listing.id,
+            farmer_id=listing.farmer_id,
+            price=listing.unit_price_ngn,
+            remaining=remaining,
+            seq=next(self._seq) if seq is None else seq,
+        )
+        self.asks[listing.id] = (key, ask)
+        fills = self._book(key).match_ask(ask)
+        self._forget_filled(fills)
+        return fills
+
+    def add_listing(self, listing: Listing, remaining: Optional[float] = None) -> list[Fill]:
+        """Put a listing on the book (replacing any previous entry) and match it."""
+        with self._lock:
+            self._remove_ask(listing.id)
+            fills = self._add_ask(listing, listing.remaining_kg if remaining is None else remaining)
+        self.persister.submit(fills)
+        return fills
+
+    def _remove_ask(self, listing_id: int):
+        entry = self.asks.pop(listing_id, None)
+        if entry:
+            entry[1].active = False
+
+    def remove_listing(self, listing_id: int):
+        with self._lock:
+            self._remove_ask(listing_id)
+
+    def cancel_buy_order(self, order_id: int) -> bool:
+        with self._lock:
+            entry = self.bids.pop(order_id, None)
+            if entry is None:
+                return False
+            entry[1].active = False
+            # Still OPEN in the database until the cancel commits: keep
+            # rejected fills from putting it back on the book meanwhile
+            self.cancelled.add(order_id)
+            return True
+
+    def remaining_for(self, order_id: int) -> Optional[float]:
+        entry = self.bids.get(order_id)
+        return entry[1].remaining if entry else None
+
+    def _forget_filled(self, fills: list[Fill]):
+        for fill in fills:
+            if fill.order_remaining_kg <= EPSILON_KG:
+                self.bids.pop(fill.buy_order_id, None)
+            if fill.listing_remaining_kg <= EPSILON_KG:
+                self.asks.pop(fill.listing_id, None)
+
+    def _restore(self, rejected: list[Fill]):
+        """
+        Give quantity back to buy orders whose fills hit a listing that was no
+        available at persist time, correct those listings from the database and
+        re-match the restored quantity (keeping the order's time priority).
+        """
+        restored: dict[int, float] = {}
+        for fill in rejected:
+            restored[fill.buy_order_id] = restored.get(fill.buy_order_id, 0.0) + fill.quantity_kg
+        with self.session_factory() as session:
+            orders = session.exec(
+                select(BuyOrder).where(BuyOrder.id.in_(list(restored)), BuyOrder.status == BuyOrderStatus.OPEN)
+            ).all()
+            listings = session.exec(
+                select(Listing).where(Listing.id.in_({fill.listing_id for fill in rejected}))
+            ).all()
+        self._refresh_listings(listings)
+
+        fills = []
+        with self._lock:
+            open_ids = {order.id for order in orders}
+            # Cancels of orders no longer OPEN have committed
+            self.cancelled.difference_update(set(restored) - open_ids)
+            for order in orders:
+                if order.id in self.cancelled:
+                    continue
+                key = book_key(order.produce_type, order.quality_grade)
+                previous = self.bids.pop(order.id, None)
+                remaining, seq = restored[order.id], None
+                if previous:
+                    previous[1].active = False
+                    remaining += previous[1].remaining
+                    seq = previous[1].seq
+                bid = self._bid(order, remaining, seq)
+                self.bids[order.id] = (key, bid)
+                book_fills = self._book(key).match_bid(bid)
+                self._forget_filled(book_fills)
+                fills.extend(book_fills)
+        self.persister.submit(fills)
+
+    def depth(self, produce_type: ProduceType, quality_grade: Optional[str], levels: int = 10) -> dict:
+        with self._lock:
+            book = self.books.get(book_key(produce_type, quality_grade))
+            return book.depth(levels) if book else {"bids": [], "asks": []}
+
+    # -- background loop -----------------------------------------------------
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.load()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="matching-engine", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.persister.flush()
+
+    def _run(self):
+        next_sync = time.monotonic() + self.sync_interval
+        while not self._stop.is_set():
+            self.persister.flush()
+            if time.monotonic() >= next_sync:
+                try:
+                    self.sync()
+                except Exception:
+                    logger.exception("Listing sync failed")
+                next_sync = time.monotonic() + self.sync_interval
+            self._stop.wait(settings.matching_flush_interval)
+
+_engine: Optional[MatchingEngine] = None
+_engine_lock = threading.Lock()
+
+def get_matching_engine() -> Optional[MatchingEngine]:
+    """The process-wide engine, started on first use; None when disabled."""
+    global _engine
+    if not settings.matching_engine_enabled:
+        return None
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                from app.core.database import engine as db_engine
+                matching = MatchingEngine(lambda: Session(db_engine), settings.matching_sync_interval)
+                matching.start()
+                _engine = matching
+    return _engine
@@ -0,0 +1,473 @@
+"""
+SMS and email notifications for trade events, delivered off the request path.
+
+Status transitions of offers, contracts, escrows and orders made through the
+ORM are recorded as events during the flush (an ``after_flush`` hook, like
+the dashboard counters) and handed to the notifier only once the transaction
+commits; a rollback drops them. Code that changes statuses with Core
+statements calls `record_events` itself.
+
+The notifier runs on a background thread in each process. It renders events
+into messages (two queries per drain, whatever the number of events), holds
+each recipient's messages for ``NOTIFICATION_BATCH_WINDOW`` seconds so a
+burst of updates goes out as one SMS or email, takes a token from the
+provider's bucket (``NOTIFICATION_RATE_PER_SECOND``, shared through Redis
+when configured) and retries failed sends with exponential backoff. Batches
+still failing after ``NOTIFICATION_MAX_ATTEMPTS`` are logged and dropped.
+
+Providers are chosen per channel: ``smtp`` (email), ``file`` (appends JSON
+lines under ``NOTIFICATION_OUTBOX_DIR``, for development) and ``loopback``
+(kept in memory, for tests). Queued events live in memory: a process that
+shuts down cleanly (application shutdown under uvicorn/gunicorn, including
+recycled workers, and worker.py on exit) keeps sending what it holds through
+`shutdown_notifier`, waiting out rate limits and retries for up to
+``NOTIFICATION_SHUTDOWN_TIMEOUT`` seconds and logging whatever is left, but
+messages not yet sent are lost if the process is killed.
+"""
+import json
+import logging
+import os
+import queue
+import smtplib
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from email.message import EmailMessage
+from typing import Callable, Iterable, Optional
+from sqlalchemy import event, select
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeout
+from sqlmodel import Session
+from app.core import tracing
+from app.core.config import settings
+from app.core.ratelimit import limiter
+from app.models.contract import Contract, ContractStatus
+from app.models.escrow import Escrow, EscrowStatus
+from app.models.listing import Listing
+from app.models.offer import Offer, OfferStatus
+from app.models.order import Order, OrderStatus
+from app.models.user import User
+from app.services.counters import status_change
+
+logger = logging.getLogger(__name__)
+
+# The database is unreachable: events are kept for the next pass
+_UNAVAILABLE = (OperationalError, PoolTimeout)
+
+# event: (model, recipients, message). "farmer" on offers is the listing's owner;
+# messages are formatted with the row as `obj` and, for offers, its `listing`.
+EVENTS = {
+    "offer.created": (
+        Offer, ("farmer",),
+        "New offer on {listing.title}: {obj.quantity_kg:g} kg at NGN {obj.unit_price_ngn:,.2f}/kg",
+    ),
+    "offer.accepted": (Offer, ("buyer_id",), "Your offer on {listing.title} was accepted"),
+    "offer.rejected": (Offer, ("buyer_id",), "Your offer on {listing.title} was declined"),
+    "contract.created": (
+        Contract, ("farmer_id", "buyer_id"),
+        "Contract {obj.contract_number} is active: {obj.quantity_kg:g} kg for NGN {obj.total_amount_ngn:,.2f}",
+    ),
+    "escrow.funded": (
+        Escrow, ("seller_id",), "Escrow {obj.escrow_number} funded: NGN {obj.amount_ngn:,.2f} is held for you",
+    ),
+    "escrow.released": (
+        Escrow, ("seller_id",), "Escrow {obj.escrow_number} released: NGN {obj.amount_ngn:,.2f} is on its way",
+    ),
+    "order.created": (Order, ("farmer_id",), "New order {obj.order_number} for delivery to {obj.delivery_address}"),
+    "order.confirmed": (Order, ("buyer_id",), "Order {obj.order_number} was confirmed by the farmer"),
+    "order.in_transit": (Order, ("buyer_id",), "Order {obj.order_number} is on its way"),
+    "order.delivered": (Order, ("buyer_id", "farmer_id"), "Order {obj.order_number} was delivered"),
+}
+
+# (model, status reached) -> event; new rows fire the event for their initial status
+TRANSITIONS = {
+    (Offer, OfferStatus.PENDING): "offer.created",
+    (Offer, OfferStatus.ACCEPTED): "offer.accepted",
+    (Offer, OfferStatus.REJECTED): "offer.rejected",
+    (Contract, ContractStatus.ACTIVE): "contract.created",
+    (Escrow, EscrowStatus.FUNDED): "escrow.funded",
+    (Escrow, EscrowStatus.RELEASED): "escrow.released",
+    (Order, OrderStatus.PENDING): "order.created",
+    (Order, OrderStatus.CONFIRMED): "order.confirmed",
+    (Order, OrderStatus.IN_TRANSIT): "order.in_transit",
+    (Order, OrderStatus.DELIVERED): "order.delivered",
+}
+
+_BY_STATUS = {(model, status.value): name for (model, status), name in TRANSITIONS.items()}
+_TRACKED = {model for model, _ in TRANSITIONS}
+_SESSION_KEY = "notification_events"
+
+# -- providers -----------------------------------------------------------------
+
+class NotificationProvider:
+    """Delivers a batch of messages to one address; raises on failure."""
+
+    name = "provider"
+
+    def send(self, channel: str, address: str, messages: list[str]):
+        raise NotImplementedError
+
+class LoopbackProvider(NotificationProvider):
+    """Keeps what it is given, for tests."""
+
+    name = "loopback"
+
+    def __init__(self):
+        self.sent: list[tuple[str, str, list[str]]] = []
+
+    def send(self, channel: str, address: str, messages: list[str]):
+        self.sent.append((channel, address, list(messages)))
+
+class FileProvider(NotificationProvider):
+    """Appends each batch as a JSON line to <outbox>/<channel>.ndjson."""
+
+    name = "file"
+
+    def __init__(self, outbox_dir: str):
+        self.outbox_dir = outbox_dir
+        self._lock = threading.Lock()
+
+    def send(self, channel: str, address: str, messages: list[str]):
+        os.makedirs(self.outbox_dir, exist_ok=True)
+        line = json.dumps({
+            "at": datetime.utcnow().isoformat(), "to": address, "messages": messages,
+        })
+        with self._lock, open(os.path.join(self.outbox_dir, f"{channel}.ndjson"), "a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+
+class SMTPProvider(NotificationProvider):
+    """Email through an SMTP relay (STARTTLS when credentials are set)."""
+
+    name = "smtp"
+
+    def send(self, channel: str, address: str, messages: list[str]):
+        email = EmailMessage()
+        email["From"] = settings.smtp_from
+        email["To"] = address
+        email["Subject"] = messages[0] if len(messages) == 1 else f"{len(messages)} updates on AgriLink"
+        email.set_content("\n\n".join(messages))
+        with smtplib.SMTP(settings.smtp_host, settings.smtp_port, timeout=10) as client:
+            if settings.smtp_username:
+                client.starttls()
+                client.login(settings.smtp_username, settings.smtp_password or "")
+            client.send_message(email)
+
+def build_provider(name: str) -> NotificationProvider:
+    if name == "smtp":
+        return SMTPProvider()
+    if name == "file":
+        return FileProvider(settings.notification_outbox_dir)
+    if name == "loopback":
+        return LoopbackProvider()
+    raise ValueError(f"Unknown notification provider {name!r}")
+
+# -- notifier ------------------------------------------------------------------
+
+@dataclass
+class Batch:
+    """Messages waiting for one recipient on one channel."""
+    user_id: int
+    channel: str
+    address: str
+    messages: list[str]
+    due: float
+    attempts: int = 0
+
+@dataclass
+class NotifierStats:
+    sent: int = 0
+    failed: int = 0
+    dropped: int = 0
+    throttled: int = 0
+
+class Notifier:
+    """Event queue, per-recipient batching and rate-limited delivery with retries."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        providers: dict[str, NotificationProvider],
+        batch_window: float = 2.0,
+        rate_per_second: float = 10.0,
+        burst: int = 20,
+        max_attempts: int = 5,
+        retry_backoff: float = 2.0,
+    ):
+        self.session_factory = session_factory
+        self.providers = providers
+        self.batch_window = batch_window
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.events: "queue.Queue[tuple[str, int]]" = queue.Queue()
+        self.batches: list[Batch] = []
+        # Batches still collecting messages, by (user id, channel)
+        self._open: dict[tuple[int, str], Batch] = {}
+        self.stats = NotifierStats()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def submit(self, events: Iterable[tuple[str, int]]):
+        for item in events:
+            self.events.put(item)
+
+    def _drain(self) -> list[tuple[str, int]]:
+        drained = []
+        while True:
+            try:
+                drained.append(self.events.get_nowait())
+            except queue.Empty:
+                return drained
+
+    def render(self, events: list[tuple[str, int]]) -> list[tuple[int, str]]:
+        """(user id, message) for each recipient of each event."""
+        ids: dict[type, set[int]] = {}
+        for name, object_id in events:
+            ids.setdefault(EVENTS[name][0], set()).add(object_id)
+
+        with self.session_factory() as session:
+            rows: dict[tuple[type, int], tuple] = {}
+            for model, object_ids in ids.items():
+                if model is Offer:
+                    statement = select(Offer, Listing).join(Listing, Listing.id == Offer.listing_id)
+                else:
+                    statement = select(model)
+                for row in session.execute(statement.where(model.id.in_(object_ids))).all():
+                    rows[(model, row[0].id)] = (row[0], row[1] if model is Offer else None)
+
+        rendered = []
+        for name, object_id in events:
+            model, recipients, template = EVENTS[name]
+            found = rows.get((model, object_id))
+            if found is None:
+                continue
+            obj, listing = found
+            text = template.format(obj=obj, listing=listing)
+            for recipient in recipients:
+                user_id = listing.farmer_id if recipient == "farmer" else getattr(obj, recipient)
+                if user_id is not None:
+                    rendered.append((user_id, text))
+        return rendered
+
+    def _render_each(self, events: list[tuple[str, int]]) -> list[tuple[int, str]]:
+        """`render`, falling back to one event at a time so a bad event only drops itself."""
+        try:
+            return self.render(events)
+        except _UNAVAILABLE:
+            raise
+        except Exception:
+            logger.exception("Rendering %d notification events failed, rendering them one by one", len(events))
+        rendered = []
+        for name, object_id in events:
+            try:
+                rendered.extend(self.render([(name, object_id)]))
+            except _UNAVAILABLE:
+                raise
+            except Exception:
+                self.stats.dropped += 1
+                logger.exception("Dropping notification event %s for %s", name, object_id)
+        return rendered
+
+    def _collect(self, now: float):
+        events = self._drain()
+        if not events:
+            return
+        try:
+            rendered = self._render_each(events)
+            user_ids = {user_id for user_id, _ in rendered}
+            with self.session_factory() as session:
+                contacts = {
+                    row.id: row for row in session.execute(
+                        select(User.id, User.email, User.phone).where(User.id.in_(user_ids), User.is_active == True)
+                    ).all()
+                } if user_ids else {}
+        except _UNAVAILABLE:
+            self.submit(events)
+            raise
+
+        for user_id, text in rendered:
+            contact = contacts.get(user_id)
+            if contact is None:
+                continue
+            for channel in self.providers:
+                address = contact.email if channel == "email" else contact.phone
+                if not address:
+                    continue
+                batch = self._open.get((user_id, channel))
+                if batch is None:
+                    batch = self._open[(user_id, channel)] = Batch(
+                        user_id, channel, address, [], due=now + self.batch_window
+                    )
+                    self.batches.append(batch)
+                batch.messages.append(text)
+
+    def flush(self, now: Optional[float] = None) -> int:
+        """Collect queued events and send every batch that is due; returns batches sent."""
+        now = time.monotonic() if now is None else now
+        sent = 0
+        with self._lock:
+            try:
+                self._collect(now)
+            except Exception:
+                logger.exception("Rendering notifications failed")
+            for batch in list(self.batches):
+                if batch.due > now:
+                    continue
+                provider = self.providers[batch.channel]
+                allowed, retry_after = limiter.take(
+                    f"notify:{provider.name}:{batch.channel}", self.rate_per_second, self.burst
+                )
+                if not allowed:
+                    self.stats.throttled += 1
+                    batch.due = now + retry_after
+                    continue
+                # Once sending starts the batch is closed; later messages start a new one
+                if self._open.get((batch.user_id, batch.channel)) is batch:
+                    del self._open[(batch.user_id, batch.channel)]
+                try:
+                    attributes = {"notification.provider": provider.name, "notification.messages": len(batch.messages)}
+                    with tracing.span(f"notify {batch.channel}", kind="client", **attributes):
+                        provider.send(batch.channel, batch.address, batch.messages)
+                except Exception as exc:
+                    batch.attempts += 1
+                    self.stats.failed += 1
+                    if batch.attempts >= self.max_attempts:
+                        logger.error(
+                            "Dropping %s notification to user %s after %d attempts: %s",
+                            batch.channel, batch.user_id, batch.attempts, exc,
+                        )
+                        self.stats.dropped += 1
+                        self.batches.remove(batch)
+                    else:
+                        batch.due = now + self.retry_backoff * 2 ** (batch.attempts - 1)
+                    continue
+                self.batches.remove(batch)
+                self.stats.sent += 1
+                sent += 1
+        return sent
+
+    # -- background loop -----------------------------------------------------
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="notifier", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the background thread and send what is still held, without
+        waiting for batch windows but honouring rate limits and retry backoff,
+        for up to `timeout` seconds. Whatever is left then is logged as lost.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        timeout = settings.notification_shutdown_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            try:
+                self._collect(time.monotonic())
+            except Exception:
+                logger.exception("Rendering notifications failed")
+            for batch in self.batches:
+                batch.due = min(batch.due, time.monotonic())
+        while self.batches or not self.events.empty():
+            self.flush()
+            remaining = deadline - time.monotonic()
+            if not self.batches or remaining <= 0:
+                break
+            next_due = min(batch.due for batch in self.batches) - time.monotonic()
+            time.sleep(min(max(next_due, 0.01), remaining))
+        if self.batches:
+            self.stats.dropped += len(self.batches)
+            logger.error(
+                "Dropping %d notification batches still unsent at shutdown: %s",
+                len(self.batches),
+                ", ".join(f"{batch.channel} to user {batch.user_id}" for batch in self.batches),
+            )
+            self.batches.clear()
+            self._open.clear()
+        if not self.events.empty():
+            logger.error("Dropping %d notification events not rendered at shutdown", self.events.qsize())
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.flush()
+            self._stop.wait(settings.notification_poll_interval)
+
+_notifier: Optional[Notifier] = None
+_notifier_lock = threading.Lock()
+
+def get_notifier() -> Optional[Notifier]:
+    """The process-wide notifier, started on first use; None when disabled."""
+    global _notifier
+    if not settings.notifications_enabled:
+        return None
+    if _notifier is None:
+        with _notifier_lock:
+            if _notifier is None:
+                from app.core.database import engine as db_engine
+                providers = {
+                    "email": build_provider(settings.notification_email_provider),
+                    "sms": build_provider(settings.notification_sms_provider),
+                }
+                notifier = Notifier(
+                    lambda: Session(db_engine),
+                    {channel: provider for channel, provider in providers.items() if channel in settings.notification_channels},
+                    batch_window=settings.notification_batch_window,
+                    rate_per_second=settings.notification_rate_per_second,
+                    burst=settings.notification_burst,
+                    max_attempts=settings.notification_max_attempts,
+                    retry_backoff=settings.notification_retry_backoff,
+                )
+                notifier.start()
+                _notifier = notifier
+    return _notifier
+
+def shutdown_notifier():
+    """Stop the process-wide notifier, sending whatever it still holds."""
+    global _notifier
+    with _notifier_lock:
+        notifier, _notifier = _notifier, None
+    if notifier is not None:
+        notifier.stop()
+
+# -- session hooks -------------------------------------------------------------
+
+def record_events(session: Session, name: str, object_ids: Iterable[int]):
+    """Queue `name` for these rows, sent once the session's transaction commits."""
+    session.info.setdefault(_SESSION_KEY, []).extend((name, object_id) for object_id in object_ids)
+
+@event.listens_for(Session, "after_flush")
+def _record_transitions(session, flush_context):
+    for obj in list(session.new) + list(session.dirty):
+        model = type(obj)
+        if model not in _TRACKED:
+            continue
+        if obj in session.new:
+            new = obj.status
+        else:
+            _, new = status_change(obj)
+        if new is None:
+            continue
+        name = _BY_STATUS.get((model, getattr(new, "value", new)))
+        if name is not None:
+            record_events(session, name, [obj.id])
+
+@event.listens_for(Session, "after_commit")
+def _send_recorded(session):
+    events = session.info.pop(_SESSION_KEY, None)
+    if not events:
+        return
+    notifier = get_notifier()
+    if notifier is not None:
+        notifier.submit(events)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_recorded(session):
+    session.info.pop(_SESSION_KEY, None)
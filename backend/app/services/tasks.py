@@ -0,0 +1,47 @@
+"""
+Job handlers run by the worker (see app.services.jobs).
+
+Each handler receives the worker's session plus the job payload and must be
+safe to run more than once; the worker commits after it returns.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import delete
+from sqlmodel import Session, select
+from app.core.config import settings
+from app.models.escrow import Escrow, EscrowStatus
+from app.models.job import Job, JobStatus
+from app.models.kyc import KYC
+from app.models.refresh_token import RefreshToken
+from app.services.jobs import every, job
+from app.services.kyc_images import process_kyc
+
+@job("escrow.release")
+def release_escrow(session: Session, contract_id: int):
+    """Release the funded escrow of a delivered contract (payment release goes here)."""
+    escrow = session.exec(
+        select(Escrow).where(Escrow.contract_id == contract_id, Escrow.status == EscrowStatus.FUNDED)
+    ).first()
+    if escrow:
+        escrow.status = EscrowStatus.RELEASED
+        escrow.released_at = datetime.utcnow()
+
+@job("kyc.process")
+def process_kyc_uploads(session: Session, kyc_id: int):
+    """Render the review previews of a KYC submission."""
+    kyc = session.get(KYC, kyc_id)
+    if kyc:
+        process_kyc(session, kyc)
+
+@job("refresh_tokens.purge")
+def purge_refresh_tokens(session: Session):
+    """Drop refresh tokens that can no longer be used or replayed."""
+    session.exec(delete(RefreshToken).where(RefreshToken.expires_at < datetime.utcnow()))
+
+@job("jobs.purge")
+def purge_jobs(session: Session):
+    """Drop finished jobs after JOB_RETENTION_DAYS."""
+    cutoff = datetime.utcnow() - timedelta(days=settings.job_retention_days)
+    session.exec(delete(Job).where(Job.status == JobStatus.DONE, Job.updated_at < cutoff))
+
+every(3600, "refresh_tokens.purge")
+every(86400, "jobs.purge")
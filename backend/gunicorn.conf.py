@@ -0,0 +1,55 @@
+"""
+Gunicorn configuration for production.
+
+Runs the FastAPI app under N uvicorn workers:
+
+    gunicorn -c gunicorn.conf.py main:app
+
+Every knob comes from app.core.config.settings, so the same environment
+variables / .env file drive both the app and the process manager. With
+preload_app the application (and settings) is imported once in the master and
+shared copy-on-write with the forked workers.
+
+Signals:
+    HUP   graceful reload: start new workers, then stop old ones after they
+          finish in-flight requests. With preload_app the application code is
+          not re-imported; deploy new code with a container restart.
+    TTIN / TTOU   add / remove one worker at runtime.
+"""
+import multiprocessing
+
+from app.core.config import settings
+
+
+def _default_workers() -> int:
+    # Async workers are CPU bound on serialization, one per core is the sweet spot
+    return max(2, min(multiprocessing.cpu_count(), settings.max_workers))
+
+
+bind = settings.bind
+workers = settings.web_concurrency or _default_workers()
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = settings.preload_app
+
+# Recycle workers periodically to bound memory growth; jitter avoids all
+# workers restarting at the same moment
+max_requests = settings.max_requests
+max_requests_jitter = settings.max_requests_jitter
+
+timeout = settings.worker_timeout
+graceful_timeout = settings.graceful_timeout
+keepalive = settings.keepalive
+
+accesslog = None
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # Connections opened in the master while preloading must not be shared
+    # across processes: give each worker a fresh pool without closing the
+    # parent's sockets. Replicas too: the master may have opened them while
+    # preloading (e.g. a replica health check)
+    from app.core.database import engine, replica_router
+
+    engine.dispose(close=False)
+    replica_router.dispose(close=False)
@@ -1,12 +1,18 @@
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 import os
 
 from app.core.config import settings
-from app.core.database import engine
+from app.core.logs import RequestLogMiddleware, configure_logging
+from app.core.tracing import TracingMiddleware, configure_tracing
+from app.core.overload import LoadSheddingMiddleware
+from app.core.profiling import ProfilingMiddleware
 from app.api.v1.api import api_router
 from app.core.auth import get_current_user
+from app.services.notifications import shutdown_notifier
+
+configure_logging()
+configure_tracing()
 
 app = FastAPI(
     title="AgriLink API",
@@ -16,6 +22,13 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Innermost: cProfile armed routes (admin profiling endpoints); a no-op otherwise
+app.add_middleware(ProfilingMiddleware)
+
+# Shed load with a fast 503 instead of queueing when the worker is saturated
+# (added before CORS so rejected requests still carry CORS headers)
+app.add_middleware(LoadSheddingMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -25,17 +38,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files for KYC documents
-app.mount("/storage", StaticFiles(directory="storage"), name="storage")
+# Stored files (KYC documents) are not mounted publicly: they are served by
+# authorizing endpoints through app.core.files.send_file
+
+app.add_middleware(TracingMiddleware)
+
+# Outermost: request ids and timing cover shed and CORS-rejected requests too
+app.add_middleware(RequestLogMiddleware)
 
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
-# Create database tables after app is created
-@app.on_event("startup")
-async def startup_event():
-    from sqlmodel import SQLModel
-    SQLModel.metadata.create_all(bind=engine)
+# Schema changes are applied out of band with `alembic upgrade head`
+# (see the `migrate` service in docker-compose), never at startup.
+
+@app.on_event("shutdown")
+def send_pending_notifications():
+    # Runs on graceful worker exit too (gunicorn max_requests recycling, deploys)
+    shutdown_notifier()
 
 @app.get("/")
 async def root():
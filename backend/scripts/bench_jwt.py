@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Access token verification cost: python-jose vs ``app.core.tokens``.
+
+Times HS256 verification of one token with python-jose (the previous
+implementation), with the stdlib codec on a cold cache (every call does the
+full signature check), and with the claims cache warm (what the second and
+later checks within a request, and later requests with the same token, pay).
+
+Usage (from the backend directory):
+
+    python -m scripts.bench_jwt
+    python -m scripts.bench_jwt --iterations 200000
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def timed(label: str, verify, iterations: int):
+    assert verify() is not None, label
+    started = time.perf_counter()
+    for _ in range(iterations):
+        verify()
+    per_call = (time.perf_counter() - started) / iterations * 1e6
+    print(f"{label:>24} {per_call:>8.2f} us/verify {1e6 / per_call:>12.0f} verifies/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark access token verification")
+    parser.add_argument("--iterations", type=int, default=50_000)
+    args = parser.parse_args()
+
+    from app.core.tokens import ClaimsCache, KeyRing, TokenCodec
+
+    secret = "bench-secret"
+    claims = {"sub": "42", "exp": datetime.utcnow() + timedelta(hours=1)}
+    cold = TokenCodec(KeyRing({}, None, secret), ClaimsCache(0))
+    warm = TokenCodec(KeyRing({}, None, secret), ClaimsCache(10_000))
+    token = cold.encode(claims)
+
+    try:
+        from jose import jwt
+    except ImportError:
+        print("python-jose not installed; skipping it")
+    else:
+        jose_token = jwt.encode(claims, secret, algorithm="HS256")
+        timed("python-jose", lambda: jwt.decode(jose_token, secret, algorithms=["HS256"]), args.iterations)
+    timed("stdlib (cold cache)", lambda: cold.decode(token), args.iterations)
+    timed("stdlib (cached claims)", lambda: warm.decode(token), args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Single vs multi-worker throughput on the listing browse path.
+
+Seeds a scratch SQLite database, then for each worker count starts
+``gunicorn -c gunicorn.conf.py main:app`` against it and drives
+``GET /api/v1/listings/`` as a buyer with a fixed number of concurrent
+clients, reporting requests/second and latency percentiles.
+
+Usage (from the backend directory):
+
+    python -m scripts.bench_workers
+    python -m scripts.bench_workers --workers 1 2 4 8 --concurrency 64 --duration 15
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def seed(database_url: str, listings: int) -> str:
+    """Create the schema, seed active listings and return a buyer token."""
+    from sqlmodel import Session, SQLModel, create_engine
+    from app.core.auth import create_access_token
+    from app.models.farm import Farm
+    from app.models.listing import Listing, ListingStatus, ProduceType
+    from app.models.user import User, UserRole
+
+    engine = create_engine(database_url)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        farmer = User(
+            email="farmer@bench.local", username="bench_farmer", hashed_password="x",
+            full_name="Bench Farmer", role=UserRole.FARMER, is_verified=True,
+        )
+        buyer = User(
+            email="buyer@bench.local", username="bench_buyer", hashed_password="x",
+            full_name="Bench Buyer", role=UserRole.BUYER, is_verified=True,
+        )
+        session.add(farmer)
+        session.add(buyer)
+        session.commit()
+
+        farm = Farm(name="Bench Farm", location="Kaduna", size_hectares=50.0, farmer_id=farmer.id)
+        session.add(farm)
+        session.commit()
+
+        produce_types = list(ProduceType)
+        for i in range(listings):
+            quantity = 100.0 + i
+            price = 250.0 + (i % 40) * 5
+            session.add(Listing(
+                title=f"Lot {i}",
+                produce_type=produce_types[i % len(produce_types)],
+                quantity_kg=quantity,
+                unit_price_ngn=price,
+                total_price_ngn=quantity * price,
+                expiry_date=datetime.utcnow() + timedelta(days=30),
+                status=ListingStatus.ACTIVE,
+                farmer_id=farmer.id,
+                farm_id=farm.id,
+            ))
+        session.commit()
+        token = create_access_token(data={"sub": str(buyer.id)})
+    engine.dispose()
+    return token
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int, database_url: str) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=database_url, WEB_CONCURRENCY=str(workers), BIND=f"127.0.0.1:{port}")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"server with {workers} workers did not start")
+
+
+async def drive(url: str, token: str, concurrency: int, duration: float):
+    import httpx
+
+    latencies = []
+    errors = 0
+    stop_at = time.perf_counter() + duration
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=30) as client:
+        async def client_loop():
+            nonlocal errors
+            while time.perf_counter() < stop_at:
+                start = time.perf_counter()
+                response = await client.get(url)
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        # Warm every worker before measuring
+        await asyncio.gather(*(client.get(url) for _ in range(concurrency)))
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return latencies, errors, elapsed
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark listing browse throughput per worker count")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 2])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per run")
+    parser.add_argument("--listings", type=int, default=200, help="active listings returned per request")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        database_url = f"sqlite:///{os.path.join(scratch, 'bench.db')}"
+        token = seed(database_url, args.listings)
+        os.makedirs(os.path.join(BACKEND_DIR, "storage"), exist_ok=True)
+
+        print(f"GET /api/v1/listings/ ({args.listings} listings), {args.concurrency} clients, {args.duration:.0f}s per run")
+        print(f"{'workers':>8} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        baseline = None
+        for workers in args.workers:
+            port = free_port()
+            server = start_server(workers, port, database_url)
+            try:
+                latencies, errors, elapsed = asyncio.run(
+                    drive(f"http://127.0.0.1:{port}/api/v1/listings/", token, args.concurrency, args.duration)
+                )
+            finally:
+                server.send_signal(signal.SIGTERM)
+                server.wait(timeout=30)
+
+            throughput = len(latencies) / elapsed
+            baseline = baseline or throughput
+            print(
+                f"{workers:>8} {throughput:>10.1f} {statistics.median(latencies) * 1000:>9.1f} "
+                f"{percentile(latencies, 0.99) * 1000:>9.1f} {errors:>7}   x{throughput / baseline:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
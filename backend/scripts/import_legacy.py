@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Bulk import of legacy farm and listing data (cooperative onboarding).
+
+Reads CSV, JSON arrays or NDJSON and writes straight to the database in
+validated batches (see ``app.services.imports``) instead of one API request
+per record. Farms are imported before listings so listing rows can point at
+farms from the same run through ``farm_ref``. Rejected rows are written to a
+CSV report (file, row, reason); everything else is imported.
+
+Farm columns: the ``FarmCreate`` fields plus ``farmer_email`` or
+``farmer_id``, and optionally ``ref``. Listing columns: the
+``ListingCreate`` fields, with ``farm_ref`` accepted in place of ``farm_id``.
+
+Usage (from the backend directory):
+
+    python -m scripts.import_legacy --farms farms.csv --listings listings.csv
+    python -m scripts.import_legacy --listings listings.ndjson --batch-size 10000 \\
+        --rejects rejects.csv --database-url postgresql+psycopg2://...
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import legacy farms and listings")
+    parser.add_argument("--farms", help="farm rows (.csv, .json, .ndjson)")
+    parser.add_argument("--listings", help="listing rows (.csv, .json, .ndjson)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per validated, committed batch")
+    parser.add_argument("--rejects", default="rejects.csv", help="where to write rejected rows")
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL from the settings")
+    args = parser.parse_args()
+    if not args.farms and not args.listings:
+        parser.error("nothing to import: pass --farms and/or --listings")
+
+    from sqlmodel import Session, create_engine
+    from app.core.config import settings
+    from app.services.imports import import_farms, import_listings, read_rows
+
+    engine = create_engine(args.database_url or settings.database_url)
+    farm_refs: dict[str, int] = {}
+    steps = []
+    if args.farms:
+        steps.append((args.farms, lambda session, rows: import_farms(session, rows, args.batch_size, refs=farm_refs)))
+    if args.listings:
+        steps.append((args.listings, lambda session, rows: import_listings(
+            session, rows, args.batch_size, farm_refs=farm_refs
+        )))
+
+    rejects = []
+    with Session(engine) as session:
+        for path, run in steps:
+            started = time.perf_counter()
+            report = run(session, read_rows(path))
+            elapsed = time.perf_counter() - started
+            print(
+                f"{os.path.basename(path)}: {report.imported}/{report.read} imported, "
+                f"{len(report.rejects)} rejected in {elapsed:.1f}s "
+                f"({report.read / elapsed if elapsed else 0:.0f} rows/s)"
+            )
+            rejects.extend((path, row, reason) for row, reason in report.rejects)
+    engine.dispose()
+
+    if rejects:
+        with open(args.rejects, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["file", "row", "reason"])
+            writer.writerows(rejects)
+        print(f"rejected rows written to {args.rejects}")
+    return 1 if rejects else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,8 +4,9 @@ from sqlmodel import SQLModel, create_engine, Session
 from sqlmodel.pool import StaticPool
 from fastapi.testclient import TestClient
 from app.main import app
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
 from app.core.auth import create_access_token
+from app.core.ratelimit import LocalTokenBuckets, limiter
 from app.models.user import User, UserRole
 from app.models.farm import Farm
 from app.models.listing import Listing, ListingStatus
@@ -51,6 +52,9 @@ def client(session):
         yield session
     
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
+    # Every test starts with full rate limit buckets (user ids repeat across tests)
+    limiter.local = LocalTokenBuckets()
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -0,0 +1,98 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app.models.contract import Contract
+from app.models.escrow import Escrow, EscrowStatus
+from app.models.offer import Offer, OfferStatus
+from app.models.order import Order, OrderStatus
+
+@pytest.fixture
+def deal(session, test_user, test_buyer, test_listing):
+    """Contract id of an accepted offer with a funded escrow and confirmed order."""
+    now = datetime.utcnow()
+    offer = Offer(
+        quantity_kg=40.0,
+        unit_price_ngn=500.0,
+        total_price_ngn=20000.0,
+        delivery_location="Lagos",
+        status=OfferStatus.ACCEPTED,
+        expires_at=now + timedelta(days=7),
+        buyer_id=test_buyer.id,
+        listing_id=test_listing.id,
+    )
+    session.add(offer)
+    session.commit()
+    contract = Contract(
+        contract_number="CTR-TIMELINE",
+        quantity_kg=40.0,
+        unit_price_ngn=500.0,
+        total_amount_ngn=20000.0,
+        delivery_date=now + timedelta(days=7),
+        delivery_location="Lagos",
+        farmer_id=test_user.id,
+        buyer_id=test_buyer.id,
+        listing_id=test_listing.id,
+        offer_id=offer.id,
+    )
+    session.add(contract)
+    session.commit()
+    session.add(Escrow(
+        escrow_number="ESC-TIMELINE",
+        amount_ngn=20000.0,
+        status=EscrowStatus.FUNDED,
+        funded_at=now + timedelta(minutes=5),
+        contract_id=contract.id,
+        buyer_id=test_buyer.id,
+        seller_id=test_user.id,
+    ))
+    session.add(Order(
+        order_number="ORD-TIMELINE",
+        quantity_kg=40.0,
+        delivery_address="Lagos",
+        status=OrderStatus.CONFIRMED,
+        confirmed_at=now + timedelta(minutes=10),
+        contract_id=contract.id,
+        farmer_id=test_user.id,
+        buyer_id=test_buyer.id,
+    ))
+    session.commit()
+    contract_id = contract.id
+    session.expire_all()
+    return contract_id
+
+class TestContractTimeline:
+    """Test the aggregated contract timeline endpoint."""
+
+    def test_timeline_contents(self, client, auth_headers, deal, test_listing):
+        """Test that one call returns the whole deal in event order."""
+        response = client.get(f"/api/v1/contracts/{deal}/timeline", headers=auth_headers)
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["contract"]["contract_number"] == "CTR-TIMELINE"
+        assert body["offer"]["status"] == "accepted"
+        assert body["listing"]["id"] == test_listing.id
+        assert body["escrow"]["escrow_number"] == "ESC-TIMELINE"
+        assert [order["order_number"] for order in body["orders"]] == ["ORD-TIMELINE"]
+        events = [event["event"] for event in body["events"]]
+        assert events.index("contract_created") < events.index("escrow_funded") < events.index("order_confirmed")
+
+    def test_timeline_query_count(self, client, engine, auth_headers, deal):
+        """Test that the deal is loaded with at most two statements beyond authentication."""
+        statements = []
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            client.get(f"/api/v1/contracts/{deal}/timeline", headers=auth_headers)
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        deal_statements = [statement for statement in statements if "FROM user" not in statement]
+        assert len(deal_statements) == 2
+
+    def test_timeline_requires_party(self, client, admin_headers, deal):
+        """Test that only the contract parties can see the timeline."""
+        response = client.get(f"/api/v1/contracts/{deal}/timeline", headers=admin_headers)
+
+        assert response.status_code == 403
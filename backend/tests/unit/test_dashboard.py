@@ -0,0 +1,76 @@
+from sqlmodel import select
+from app.models.counter import UserCounter
+from app.models.listing import ListingStatus
+from app.models.offer import OfferStatus
+from app.services.counters import rebuild_counters
+from app.services.inventory import reserve_quantity
+from tests.unit.test_offers import pending_offer
+
+def counters(session, user):
+    session.expire_all()
+    rows = session.exec(select(UserCounter).where(UserCounter.user_id == user.id)).all()
+    return {row.name: row.value for row in rows if row.value}
+
+class TestCounters:
+    """Test incremental maintenance of dashboard counters."""
+
+    def test_listing_and_offer_transitions(self, session, test_user, test_buyer, test_listing):
+        """Test that status changes through the ORM move both parties' counters."""
+        offer = pending_offer(session, test_buyer, test_listing, 10)
+        assert counters(session, test_user) == {"listings.active": 1, "offers.pending": 1}
+        assert counters(session, test_buyer) == {"offers.pending": 1}
+
+        offer.status = OfferStatus.REJECTED
+        session.add(offer)
+        session.commit()
+        assert counters(session, test_user) == {"listings.active": 1}
+        assert counters(session, test_buyer) == {}
+
+    def test_reservation_selling_out_listing(self, session, test_user, test_listing):
+        """Test that a Core reservation that sells the listing out is counted."""
+        reserve_quantity(session, test_listing.id, test_listing.quantity_kg)
+        session.commit()
+
+        assert counters(session, test_user) == {}
+
+    def test_batch_accept(self, client, session, auth_headers, test_user, test_buyer, test_listing):
+        """Test that batch acceptance moves offers to contracts in the counters."""
+        offers = [pending_offer(session, test_buyer, test_listing, 20) for _ in range(2)]
+
+        response = client.post(
+            "/api/v1/offers/batch-accept",
+            json={"offer_ids": [offer.id for offer in offers]},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 200
+        assert counters(session, test_user) == {"listings.active": 1, "contracts.active": 2}
+        assert counters(session, test_buyer) == {"contracts.active": 2}
+
+    def test_rebuild_matches_incremental(self, session, test_user, test_buyer, test_listing):
+        """Test that recomputing from the trade tables gives the same counters."""
+        pending_offer(session, test_buyer, test_listing, 10)
+        pending_offer(session, test_buyer, test_listing, 15)
+        expected = {user.id: counters(session, user) for user in (test_user, test_buyer)}
+
+        session.exec(UserCounter.__table__.delete())
+        rebuild_counters(session)
+        session.commit()
+
+        assert {user.id: counters(session, user) for user in (test_user, test_buyer)} == expected
+
+class TestDashboardSummary:
+    """Test the dashboard summary endpoint."""
+
+    def test_summary(self, client, session, auth_headers, test_buyer, test_listing):
+        """Test that the summary reports the user's counters."""
+        pending_offer(session, test_buyer, test_listing, 10)
+
+        response = client.get("/api/v1/dashboard/summary", headers=auth_headers)
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["active_listings"] == 1
+        assert body["pending_offers"] == 1
+        assert body["active_contracts"] == 0
+        assert body["funded_escrow_ngn"] == 0
@@ -0,0 +1,106 @@
+import pytest
+from sqlmodel import Session
+from starlette.requests import Request
+from app.core import database
+from app.core.auth import create_access_token
+from app.core.database import ReplicaRouter, ReadYourWrites, get_read_session
+
+def make_request(headers=None):
+    """Build a bare Starlette request carrying the given headers."""
+    raw_headers = [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw_headers})
+
+class TestReplicaRouter:
+    """Test replica selection and health checking."""
+    
+    def test_round_robin_over_healthy_replicas(self, tmp_path):
+        """Test that reads rotate across replicas."""
+        router = ReplicaRouter(
+            [f"sqlite:///{tmp_path / 'a.db'}", f"sqlite:///{tmp_path / 'b.db'}"],
+            health_check_interval=60,
+        )
+        picked = [router.pick() for _ in range(4)]
+        
+        assert picked[0] is router.engines[0]
+        assert picked[1] is router.engines[1]
+        assert picked[2] is router.engines[0]
+        assert picked[3] is router.engines[1]
+    
+    def test_unhealthy_replica_is_skipped(self, tmp_path):
+        """Test that a replica failing its health check is not used."""
+        router = ReplicaRouter(
+            [f"sqlite:///{tmp_path / 'missing' / 'a.db'}", f"sqlite:///{tmp_path / 'b.db'}"],
+            health_check_interval=60,
+        )
+        
+        assert {router.pick() for _ in range(4)} == {router.engines[1]}
+    
+    def test_no_healthy_replica_returns_none(self, tmp_path):
+        """Test that callers fall back to the primary when every replica is down."""
+        router = ReplicaRouter([f"sqlite:///{tmp_path / 'missing' / 'a.db'}"], health_check_interval=60)
+        
+        assert router.pick() is None
+    
+    def test_dispose_replaces_replica_pools(self, tmp_path):
+        """Test that disposing gives every replica a fresh pool (as after a fork)."""
+        router = ReplicaRouter(
+            [f"sqlite:///{tmp_path / 'a.db'}", f"sqlite:///{tmp_path / 'b.db'}"],
+            health_check_interval=60,
+        )
+        pools = [replica.pool for replica in router.engines]
+
+        router.dispose(close=False)
+
+        assert all(replica.pool is not pool for replica, pool in zip(router.engines, pools))
+    
+    def test_disabled_without_urls(self):
+        """Test that no replicas means the router is disabled."""
+        assert ReplicaRouter([], health_check_interval=60).enabled is False
+
+class TestReadYourWrites:
+    """Test primary stickiness after a user's own writes."""
+    
+    def test_mark_and_expire(self, monkeypatch):
+        """Test that stickiness lasts for the configured window."""
+        clock = [100.0]
+        monkeypatch.setattr(database.time, "monotonic", lambda: clock[0])
+        sticky = ReadYourWrites(window=5)
+        
+        sticky.mark("42")
+        assert sticky.is_sticky("42") is True
+        assert sticky.is_sticky("7") is False
+        
+        clock[0] += 6
+        assert sticky.is_sticky("42") is False
+    
+    def test_read_session_routes_to_replica_unless_sticky(self, tmp_path, monkeypatch, test_user):
+        """Test that a recent writer reads from the primary."""
+        router = ReplicaRouter([f"sqlite:///{tmp_path / 'replica.db'}"], health_check_interval=60)
+        sticky = ReadYourWrites(window=5)
+        monkeypatch.setattr(database, "replica_router", router)
+        monkeypatch.setattr(database, "read_your_writes", sticky)
+        token = create_access_token(data={"sub": str(test_user.id)})
+        request = make_request({"Authorization": f"Bearer {token}"})
+        
+        session = next(get_read_session(request))
+        assert session.bind is router.engines[0]
+        
+        sticky.mark(str(test_user.id))
+        session = next(get_read_session(request))
+        assert session.bind is database.engine
+    
+    def test_commit_marks_writer_sticky(self, engine, tmp_path, monkeypatch, test_user):
+        """Test that committing a write through the primary session marks the caller."""
+        router = ReplicaRouter([f"sqlite:///{tmp_path / 'replica.db'}"], health_check_interval=60)
+        sticky = ReadYourWrites(window=5)
+        monkeypatch.setattr(database, "replica_router", router)
+        monkeypatch.setattr(database, "read_your_writes", sticky)
+        token = create_access_token(data={"sub": str(test_user.id)})
+        
+        with Session(engine) as session:
+            session.info["authorization"] = f"Bearer {token}"
+            user = session.get(type(test_user), test_user.id)
+            user.full_name = "Renamed"
+            session.commit()
+        
+        assert sticky.is_sticky(str(test_user.id)) is True
@@ -0,0 +1,96 @@
+import csv
+import io
+import json
+from datetime import datetime
+from app.core.config import settings
+from app.models.contract import Contract, ContractStatus
+from app.models.escrow import Escrow, EscrowStatus
+from tests.unit.test_offers import pending_offer
+
+def make_contracts(session, farmer, buyer, listing, count):
+    contracts = [
+        Contract(
+            contract_number=f"CTR-EXPORT{index:04d}",
+            quantity_kg=10,
+            unit_price_ngn=500,
+            total_amount_ngn=5000,
+            delivery_date=datetime(2026, 1, 1),
+            delivery_location="Lagos",
+            farmer_id=farmer.id,
+            buyer_id=buyer.id,
+            listing_id=listing.id,
+            offer_id=pending_offer(session, buyer, listing, 10).id,
+        )
+        for index in range(count)
+    ]
+    session.add_all(contracts)
+    session.commit()
+    return contracts
+
+class TestExports:
+    """Test streaming CSV and NDJSON exports."""
+
+    def test_contracts_csv_in_batches(self, client, session, auth_headers, test_user, test_buyer, test_listing, monkeypatch):
+        """Test that all contracts are exported across several batches."""
+        monkeypatch.setattr(settings, "export_batch_size", 2)
+        make_contracts(session, test_user, test_buyer, test_listing, 5)
+
+        response = client.get("/api/v1/contracts/export", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "attachment" in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["contract_number"] for row in rows] == [f"CTR-EXPORT{index:04d}" for index in range(5)]
+        assert rows[0]["status"] == ContractStatus.ACTIVE.value
+        assert rows[0]["delivery_date"] == "2026-01-01T00:00:00"
+
+    def test_escrows_ndjson(self, client, session, auth_headers, test_user, test_buyer, test_listing):
+        """Test NDJSON export with one JSON object per line."""
+        contract = make_contracts(session, test_user, test_buyer, test_listing, 1)[0]
+        session.add(Escrow(
+            escrow_number="ESC-EXPORT",
+            amount_ngn=5000,
+            status=EscrowStatus.FUNDED,
+            contract_id=contract.id,
+            buyer_id=test_buyer.id,
+            seller_id=test_user.id,
+        ))
+        session.commit()
+
+        response = client.get("/api/v1/escrow/export?format=ndjson", headers=auth_headers)
+
+        assert response.status_code == 200
+        lines = response.text.splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["status"] == "funded"
+
+    def test_only_own_rows(self, client, session, test_admin, test_user, test_buyer, test_listing):
+        """Test that users export only the records they are party to."""
+        from app.core.auth import create_access_token
+        make_contracts(session, test_user, test_buyer, test_listing, 2)
+        token = create_access_token(data={"sub": str(test_admin.id)})
+
+        response = client.get("/api/v1/orders/export?format=ndjson", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        assert response.text == ""
+
+        response = client.get("/api/v1/contracts/export", headers={"Authorization": f"Bearer {token}"})
+        assert response.text.strip().count("\n") == 0
+
+    def test_unknown_format_rejected(self, client, auth_headers):
+        """Test that only csv and ndjson are accepted."""
+        response = client.get("/api/v1/contracts/export?format=xml", headers=auth_headers)
+        assert response.status_code == 422
+
+    def test_admin_exports_full_history(self, client, session, auth_headers, test_admin, test_user, test_buyer, test_listing):
+        """Test that admins export every party's records with scope=all and others get 403."""
+        from app.core.auth import create_access_token
+        make_contracts(session, test_user, test_buyer, test_listing, 3)
+        token = create_access_token(data={"sub": str(test_admin.id)})
+
+        response = client.get("/api/v1/contracts/export?scope=all&format=ndjson", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        assert len(response.text.splitlines()) == 3
+
+        assert client.get("/api/v1/contracts/export?scope=all", headers=auth_headers).status_code == 403
@@ -0,0 +1,71 @@
+import pytest
+from app.core.auth import create_access_token
+from app.core.config import settings
+
+@pytest.fixture
+def stored_kyc(tmp_path, monkeypatch, session, test_kyc):
+    """The test KYC with its document in a temporary file storage."""
+    monkeypatch.setattr(settings, "file_storage_dir", str(tmp_path))
+    document = tmp_path / "kyc_1_national_id_id.pdf"
+    document.write_bytes(bytes(range(256)) * 4)
+    test_kyc.document_file_path = str(document)
+    session.add(test_kyc)
+    session.commit()
+    return test_kyc
+
+class TestDocumentAccess:
+    """Test who may fetch stored KYC documents."""
+
+    def test_owner_and_admin_only(self, client, stored_kyc, auth_headers, admin_headers, test_buyer):
+        """Test that only the applicant and admins get the document."""
+        url = f"/api/v1/kyc/{stored_kyc.id}/documents/document"
+        buyer_headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(test_buyer.id)})}"}
+
+        assert client.get(url).status_code in (401, 403)
+        assert client.get(url, headers=buyer_headers).status_code == 403
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.content == bytes(range(256)) * 4
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.headers["cache-control"].startswith("private")
+        assert client.get(url, headers=admin_headers).status_code == 200
+
+    def test_missing_and_outside_storage(self, client, stored_kyc, auth_headers):
+        """Test that unknown kinds and paths outside storage are not served."""
+        assert client.get(f"/api/v1/kyc/{stored_kyc.id}/documents/passport", headers=auth_headers).status_code == 404
+        # The fixture's selfie path is not inside FILE_STORAGE_DIR
+        assert client.get(f"/api/v1/kyc/{stored_kyc.id}/documents/selfie", headers=auth_headers).status_code == 404
+
+    def test_storage_is_not_mounted(self, client, stored_kyc):
+        """Test that documents are not reachable without authorization."""
+        assert client.get("/storage/kyc_1_national_id_id.pdf").status_code == 404
+
+class TestTransfer:
+    """Test range requests and the nginx hand-off."""
+
+    def test_byte_ranges(self, client, stored_kyc, auth_headers):
+        """Test single ranges, suffix ranges and unsatisfiable ranges."""
+        url = f"/api/v1/kyc/{stored_kyc.id}/documents/document"
+
+        partial = client.get(url, headers={**auth_headers, "Range": "bytes=10-19"})
+        assert partial.status_code == 206
+        assert partial.content == bytes(range(10, 20))
+        assert partial.headers["content-range"] == "bytes 10-19/1024"
+
+        suffix = client.get(url, headers={**auth_headers, "Range": "bytes=-6"})
+        assert suffix.content == bytes(range(250, 256))
+
+        beyond = client.get(url, headers={**auth_headers, "Range": "bytes=2000-"})
+        assert beyond.status_code == 416
+        assert beyond.headers["content-range"] == "bytes */1024"
+
+    def test_accel_redirect(self, client, stored_kyc, auth_headers, monkeypatch):
+        """Test that behind nginx only the internal redirect is returned."""
+        monkeypatch.setattr(settings, "file_accel_redirect", True)
+
+        response = client.get(f"/api/v1/kyc/{stored_kyc.id}/documents/document", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.content == b""
+        assert response.headers["x-accel-redirect"] == "/_protected/storage/kyc_1_national_id_id.pdf"
+        assert response.headers["content-type"] == "application/pdf"
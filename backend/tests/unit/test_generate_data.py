@@ -0,0 +1,79 @@
+import time
+from datetime import datetime, timezone
+from sqlmodel import SQLModel, Session, create_engine, func, select
+from app.core.identifiers import ulid_timestamp
+from app.models.contract import Contract
+from app.models.counter import UserCounter
+from app.models.listing import Listing, ListingStatus
+from app.models.offer import Offer, OfferStatus
+from app.services.counters import rebuild_counters
+from scripts.generate_data import TABLES, generate
+
+END = datetime(2026, 6, 1)
+HASH = "$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPj4J/HS.i8rG"
+
+def generated(path, seed=1):
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    session = Session(engine)
+    generate(session, seed, users=200, listings=500, end=END, batch_size=97, password_hash=HASH)
+    return session
+
+def snapshot(session):
+    return {
+        model.__table__.name: session.connection().execute(model.__table__.select().order_by(model.__table__.c.id)).all()
+        for model in TABLES
+    }
+
+class TestGenerateData:
+    """Test the seeded synthetic data generator."""
+
+    def test_same_seed_same_data(self, tmp_path):
+        """Test that generation is deterministic for a seed and end date."""
+        first = generated(tmp_path / "a.db")
+        second = generated(tmp_path / "b.db")
+        other = generated(tmp_path / "c.db", seed=2)
+
+        assert snapshot(first) == snapshot(second)
+        assert snapshot(first)["listing"] != snapshot(other)["listing"]
+
+    def test_records_are_consistent(self, tmp_path):
+        """Test that contracts, remaining quantities and counters follow the marketplace rules."""
+        session = generated(tmp_path / "data.db")
+
+        contracted = dict(session.exec(
+            select(Contract.listing_id, func.sum(Contract.quantity_kg)).group_by(Contract.listing_id)
+        ).all())
+        for listing in session.exec(select(Listing)).all():
+            assert abs(listing.quantity_kg - contracted.get(listing.id, 0) - listing.remaining_kg) < 1e-3
+            assert (listing.status == ListingStatus.SOLD) == (listing.remaining_kg == 0)
+        statuses = session.exec(
+            select(Offer.status).join(Contract, Contract.offer_id == Offer.id)
+        ).all()
+        assert statuses and set(statuses) == {OfferStatus.ACCEPTED}
+
+        counters = session.exec(select(UserCounter.user_id, UserCounter.name, UserCounter.value)).all()
+        rebuild_counters(session)
+        assert sorted(session.exec(select(UserCounter.user_id, UserCounter.name, UserCounter.value)).all()) == sorted(counters)
+
+    def test_business_ids_encode_utc_time(self, tmp_path, monkeypatch):
+        """Test that identifiers carry the row's UTC creation time whatever the host time zone."""
+        monkeypatch.setenv("TZ", "Africa/Lagos")
+        time.tzset()
+        try:
+            session = generated(tmp_path / "data.db")
+        finally:
+            monkeypatch.undo()
+            time.tzset()
+
+        contract = session.exec(select(Contract)).first()
+        created = contract.created_at.replace(tzinfo=timezone.utc).timestamp()
+        assert abs(ulid_timestamp(contract.contract_number) - created) < 0.001
+
+    def test_buyers_are_skewed(self, tmp_path):
+        """Test that a few whale buyers place a large share of offers."""
+        session = generated(tmp_path / "data.db")
+
+        per_buyer = sorted(session.exec(select(func.count()).select_from(Offer).group_by(Offer.buyer_id)).all())
+        top = sum(per_buyer[-max(len(per_buyer) // 20, 1):])
+        assert top > 0.25 * sum(per_buyer)
@@ -0,0 +1,93 @@
+import time
+import pytest
+from sqlalchemy import create_engine
+from app.core import database, health
+from app.core.config import settings
+from app.core.health import HealthChecker
+
+@pytest.fixture
+def probes(engine, tmp_path, monkeypatch):
+    """Probes against the test database and a temporary storage directory."""
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(settings, "file_storage_dir", str(tmp_path))
+    monkeypatch.setattr(health, "checker", HealthChecker())
+    monkeypatch.setattr("app.api.v1.endpoints.health.checker", health.checker)
+    return health.checker
+
+class TestProbes:
+    """Test the health, readiness and liveness endpoints."""
+
+    def test_healthy(self, client, probes):
+        """Test that a reachable database makes the application ready."""
+        response = client.get("/api/v1/health")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["status"], body["ready"]) == ("ok", True)
+        assert body["checks"]["database"]["status"] == "ok"
+        assert body["checks"]["database"]["latency_ms"] >= 0
+        assert body["checks"]["redis"] == {"status": "disabled"}
+        assert body["checks"]["storage"]["free_bytes"] > 0
+        assert "wait_ms" in body["pool"]
+        assert response.headers["cache-control"] == "no-store"
+        assert client.get("/api/v1/health/ready").json() == {"ready": True, "status": "ok"}
+
+    def test_database_down_is_not_ready(self, client, probes, monkeypatch):
+        """Test that a failing database gives 503 without leaking the error text."""
+        def broken():
+            raise ConnectionError("password=secret host=db")
+        monkeypatch.setitem(probes.checks, "database", broken)
+
+        response = client.get("/api/v1/health/ready")
+
+        assert response.status_code == 503
+        assert response.json() == {"ready": False, "status": "unavailable"}
+        assert client.get("/api/v1/health").json()["checks"]["database"]["error"] == "ConnectionError"
+        assert client.get("/api/v1/health/live").status_code == 200
+
+    def test_saturated_pool_stays_ready(self, client, probes, tmp_path, monkeypatch):
+        """Test that an exhausted request pool is reported without failing readiness."""
+        busy = create_engine(
+            f"sqlite:///{tmp_path / 'busy.db'}", poolclass=database.TimedQueuePool,
+            pool_size=1, max_overflow=0, pool_timeout=5,
+        )
+        monkeypatch.setattr(database, "engine", busy)
+
+        with busy.connect():
+            body = client.get("/api/v1/health").json()
+
+        assert (body["status"], body["ready"]) == ("ok", True)
+        assert body["pool"]["saturation"] == 1.0
+        busy.dispose()
+
+    def test_storage_failure_is_degraded(self, client, probes, monkeypatch):
+        """Test that optional dependencies do not take the application out of rotation."""
+        monkeypatch.setattr(settings, "file_storage_dir", "/nonexistent/storage")
+
+        response = client.get("/api/v1/health")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "degraded"
+
+    def test_slow_check_times_out(self, client, probes, monkeypatch):
+        """Test that a hung dependency fails the probe after the timeout."""
+        monkeypatch.setattr(settings, "health_check_timeout", 0.05)
+        monkeypatch.setitem(probes.checks, "database", lambda: time.sleep(0.5) or {})
+
+        body = client.get("/api/v1/health").json()
+
+        assert body["checks"]["database"]["error"] == "timed out"
+
+    def test_results_are_cached(self, client, probes, monkeypatch):
+        """Test that probes within the cache window share one round of checks."""
+        calls = []
+        monkeypatch.setitem(probes.checks, "database", lambda: calls.append(1) or {})
+
+        for _ in range(5):
+            client.get("/api/v1/health/ready")
+
+        assert len(calls) == 1
+
+    def test_old_route_is_gone(self, client, probes):
+        """Test that the doubled /health/health path no longer exists."""
+        assert client.get("/api/v1/health/health").status_code == 404
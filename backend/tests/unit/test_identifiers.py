@@ -0,0 +1,53 @@
+import re
+import threading
+import time
+from app.core import identifiers
+from app.core.identifiers import ULIDGenerator, new_business_id, new_business_ids, ulid_timestamp
+
+class TestBusinessIdentifiers:
+    """Test time-ordered business identifiers."""
+
+    def test_format(self):
+        """Test the prefix and Crockford base32 body."""
+        contract_number = new_business_id("CTR")
+
+        assert re.fullmatch(r"CTR-[0-9A-HJKMNP-TV-Z]{26}", contract_number)
+
+    def test_sorted_by_creation_within_a_millisecond(self, monkeypatch):
+        """Test that IDs from the same millisecond still increase."""
+        monkeypatch.setattr(identifiers.time, "time_ns", lambda: 1_760_000_000_000_000_000)
+        generator = ULIDGenerator()
+
+        values = [generator.new() for _ in range(1000)]
+
+        assert values == sorted(values)
+        assert len(set(values)) == 1000
+
+    def test_sorted_across_milliseconds(self):
+        """Test lexical order follows creation order."""
+        first = new_business_id("ORD")
+        time.sleep(0.002)
+        second = new_business_id("ORD")
+
+        assert first < second
+
+    def test_timestamp_round_trip(self):
+        """Test that the creation time can be read back from an ID."""
+        before = time.time()
+        escrow_number = new_business_id("ESC")
+
+        assert abs(ulid_timestamp(escrow_number) - before) < 1
+
+    def test_unique_across_threads(self):
+        """Test that concurrent generation never repeats an ID."""
+        generated = []
+        def generate():
+            generated.extend(new_business_ids("CTR", 2000))
+
+        threads = [threading.Thread(target=generate) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(set(generated)) == 16000
@@ -0,0 +1,72 @@
+from sqlmodel import select
+from app.models.counter import UserCounter
+from app.models.farm import Farm
+from app.models.listing import Listing, ListingStatus
+from app.services.imports import import_farms, import_listings, read_rows
+
+def farm_row(farmer, ref, **overrides):
+    return {"ref": ref, "name": f"Farm {ref}", "location": "Kano", "size_hectares": "2.5",
+            "farmer_email": farmer.email, **overrides}
+
+def listing_row(**overrides):
+    return {"title": "Maize", "produce_type": "grains", "quantity_kg": 100, "unit_price_ngn": 300, **overrides}
+
+class TestImportFarms:
+    """Test bulk farm import."""
+
+    def test_imports_valid_rows_and_reports_rejects(self, session, test_user, test_buyer):
+        """Test that bad rows are rejected by row number without blocking the batch."""
+        rows = [
+            farm_row(test_user, "A"),
+            farm_row(test_user, "B", size_hectares="large"),
+            farm_row(test_buyer, "C"),
+            farm_row(test_user, "D", farmer_email="nobody@example.com"),
+            farm_row(test_user, "E"),
+        ]
+        refs = {}
+
+        report = import_farms(session, rows, batch_size=2, refs=refs)
+
+        assert report.read == 5
+        assert report.imported == 2
+        assert [row for row, _ in report.rejects] == [2, 3, 4]
+        assert report.rejects[0][1].startswith("size_hectares")
+        farms = session.exec(select(Farm).where(Farm.farmer_id == test_user.id)).all()
+        assert {farm.name for farm in farms} == {"Farm A", "Farm E"}
+        assert set(refs) == {"A", "E"}
+
+class TestImportListings:
+    """Test bulk listing import."""
+
+    def test_imports_listings_by_farm_ref(self, session, test_user, test_farm):
+        """Test that listings resolve farm refs, derive fields and update counters."""
+        refs = {}
+        import_farms(session, [farm_row(test_user, "A")], refs=refs)
+        rows = [
+            listing_row(farm_ref="A"),
+            listing_row(farm_id=test_farm.id, quantity_kg=50),
+            listing_row(farm_ref="missing"),
+            listing_row(farm_id=test_farm.id, produce_type="gold"),
+            listing_row(farm_id=999),
+        ]
+
+        report = import_listings(session, rows, batch_size=3, farm_refs=refs)
+
+        assert report.imported == 2
+        assert [row for row, _ in report.rejects] == [3, 4, 5]
+        listings = session.exec(select(Listing).order_by(Listing.id)).all()
+        assert [listing.farm_id for listing in listings] == [refs["A"], test_farm.id]
+        assert listings[1].remaining_kg == 50
+        assert listings[1].total_price_ngn == 15000
+        assert listings[1].status == ListingStatus.ACTIVE
+        assert listings[1].farmer_id == test_user.id
+        counter = session.get(UserCounter, (test_user.id, "listings.active"))
+        assert counter.value == 2
+
+    def test_reads_csv_and_ndjson(self, tmp_path):
+        """Test that empty CSV cells are treated as missing values."""
+        (tmp_path / "rows.csv").write_text("title,description,quantity_kg\nMaize,,10\n")
+        (tmp_path / "rows.ndjson").write_text('{"title": "Maize"}\n\n{"title": "Rice"}\n')
+
+        assert list(read_rows(str(tmp_path / "rows.csv"))) == [{"title": "Maize", "quantity_kg": "10"}]
+        assert [row["title"] for row in read_rows(str(tmp_path / "rows.ndjson"))] == ["Maize", "Rice"]
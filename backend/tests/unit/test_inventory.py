@@ -0,0 +1,152 @@
+import threading
+from datetime import datetime, timedelta
+from sqlmodel import SQLModel, Session, create_engine
+from app.core.auth import create_access_token
+from app.models.listing import Listing, ListingStatus
+from app.models.offer import Offer, OfferStatus
+from app.services.inventory import EPSILON_KG, reserve_quantity, resize_listing
+from tests.unit.test_dashboard import counters
+
+def accepted_offer(session, buyer, listing, quantity):
+    offer = Offer(
+        quantity_kg=quantity,
+        unit_price_ngn=listing.unit_price_ngn,
+        total_price_ngn=quantity * listing.unit_price_ngn,
+        delivery_location="Lagos",
+        status=OfferStatus.ACCEPTED,
+        expires_at=datetime.utcnow() + timedelta(days=7),
+        buyer_id=buyer.id,
+        listing_id=listing.id,
+    )
+    session.add(offer)
+    session.commit()
+    session.refresh(offer)
+    return offer
+
+class TestReservation:
+    """Test conditional listing quantity reservation."""
+
+    def test_new_listing_starts_fully_available(self, test_listing):
+        """Test that remaining quantity defaults to the listing quantity."""
+        assert test_listing.remaining_kg == test_listing.quantity_kg
+
+    def test_reserve_until_exhausted(self, session, test_listing):
+        """Test that reservations decrement and the last one marks the listing SOLD."""
+        assert reserve_quantity(session, test_listing.id, 60) == 40
+        assert reserve_quantity(session, test_listing.id, 50) is None
+        assert reserve_quantity(session, test_listing.id, 40) == 0
+        session.commit()
+        session.refresh(test_listing)
+
+        assert test_listing.remaining_kg == 0
+        assert test_listing.status == ListingStatus.SOLD
+        assert reserve_quantity(session, test_listing.id, 1) is None
+
+    def test_resize_cannot_drop_below_contracted(self, session, test_listing):
+        """Test that quantity changes move remaining quantity and respect contracts."""
+        reserve_quantity(session, test_listing.id, 30)
+
+        assert resize_listing(session, test_listing.id, 20) is False
+        assert resize_listing(session, test_listing.id, 150) is True
+        session.commit()
+        session.refresh(test_listing)
+
+        assert test_listing.quantity_kg == 150
+        assert test_listing.remaining_kg == 120
+
+    def test_resize_to_contracted_marks_sold(self, session, test_user, test_listing):
+        """Test that shrinking to the contracted quantity sells the listing out."""
+        reserve_quantity(session, test_listing.id, 30)
+
+        assert resize_listing(session, test_listing.id, 30 - EPSILON_KG / 2) is True
+        session.commit()
+        session.refresh(test_listing)
+
+        assert test_listing.remaining_kg == 0
+        assert test_listing.status == ListingStatus.SOLD
+        assert counters(session, test_user) == {}
+
+    def test_growing_sold_listing_reopens_it(self, session, test_user, test_listing):
+        """Test that adding quantity to a SOLD listing makes it ACTIVE again."""
+        reserve_quantity(session, test_listing.id, 100)
+        session.commit()
+        assert counters(session, test_user) == {}
+
+        assert resize_listing(session, test_listing.id, 140) is True
+        session.commit()
+        session.refresh(test_listing)
+
+        assert test_listing.remaining_kg == 40
+        assert test_listing.status == ListingStatus.ACTIVE
+        assert counters(session, test_user) == {"listings.active": 1}
+
+    def test_concurrent_reservations_never_oversell(self, tmp_path, test_listing):
+        """Test that racing reservations on one listing sell at most its quantity."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'race.db'}", connect_args={"timeout": 30})
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            listing = Listing(**test_listing.model_dump(exclude={"id", "remaining_kg"}))
+            session.add(listing)
+            session.commit()
+            listing_id = listing.id
+
+        results = []
+        def reserve():
+            with Session(engine) as session:
+                results.append(reserve_quantity(session, listing_id, 15))
+                session.commit()
+
+        threads = [threading.Thread(target=reserve) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len([result for result in results if result is not None]) == 6
+        with Session(engine) as session:
+            assert session.get(Listing, listing_id).remaining_kg == 10
+
+class TestPartialContracts:
+    """Test several contracts against one listing through the API."""
+
+    def test_contracts_until_sold(self, client, session, auth_headers, test_buyer, test_listing):
+        """Test that a listing stays active across partial contracts and sells out."""
+        first = accepted_offer(session, test_buyer, test_listing, 40)
+        second = accepted_offer(session, test_buyer, test_listing, 60)
+        third = accepted_offer(session, test_buyer, test_listing, 10)
+
+        response = client.post(f"/api/v1/contracts/{first.id}/create", headers=auth_headers)
+        assert response.status_code == 200
+        session.refresh(test_listing)
+        assert test_listing.status == ListingStatus.ACTIVE
+        assert test_listing.remaining_kg == 60
+
+        response = client.post(f"/api/v1/contracts/{first.id}/create", headers=auth_headers)
+        assert response.status_code == 400
+
+        response = client.post(f"/api/v1/contracts/{second.id}/create", headers=auth_headers)
+        assert response.status_code == 200
+        session.refresh(test_listing)
+        assert test_listing.status == ListingStatus.SOLD
+
+        response = client.post(f"/api/v1/contracts/{third.id}/create", headers=auth_headers)
+        assert response.status_code == 409
+
+    def test_offer_above_remaining_is_rejected(self, client, session, test_buyer, test_listing):
+        """Test that buyers cannot offer more than is left on the listing."""
+        reserve_quantity(session, test_listing.id, 90)
+        session.commit()
+        token = create_access_token(data={"sub": str(test_buyer.id)})
+
+        response = client.post(
+            "/api/v1/offers/",
+            json={
+                "listing_id": test_listing.id,
+                "quantity_kg": 20,
+                "unit_price_ngn": 500,
+                "delivery_location": "Lagos",
+            },
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        assert response.status_code == 400
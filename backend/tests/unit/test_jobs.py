@@ -0,0 +1,189 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+from sqlmodel import Session, select
+import app.services.tasks  # noqa: F401
+from app.models.escrow import Escrow, EscrowStatus
+from app.models.job import Job, JobStatus
+from app.models.order import Order, OrderStatus
+from app.services import jobs
+from app.core.redis import get_redis
+from app.services.jobs import RedisJobStore, SQLJobStore, Schedule, Worker, enqueue
+from tests.unit.test_exports import make_contracts
+
+calls = []
+
+@pytest.fixture
+def handlers(monkeypatch):
+    """Temporary handlers: one that records its calls and one that always fails."""
+    calls.clear()
+    monkeypatch.setitem(jobs.REGISTRY, "test.record", jobs.JobSpec("test.record", lambda session, **payload: calls.append(payload), 3))
+
+    def broken(session, **payload):
+        raise RuntimeError("boom")
+    monkeypatch.setitem(jobs.REGISTRY, "test.broken", jobs.JobSpec("test.broken", broken, 2))
+
+@pytest.fixture
+def redis_store():
+    """A Redis job store on test keys; skipped without a reachable REDIS_URL."""
+    client = get_redis()
+    try:
+        if client is None or not client.ping():
+            raise ConnectionError()
+    except Exception:
+        pytest.skip("Redis is not available")
+    store = RedisJobStore(client)
+    keys = {attribute: f"test:{getattr(store, attribute)}" for attribute in ("DUE", "RUNNING", "DATA", "DEAD", "DEAD_AT")}
+    for attribute, key in keys.items():
+        setattr(store, attribute, key)
+    yield store
+    client.delete(*keys.values())
+
+@pytest.fixture
+def worker(engine):
+    return Worker([SQLJobStore(lambda: Session(engine))], lambda: Session(engine), retry_backoff=60, schedules=[])
+
+class TestEnqueue:
+    """Test queueing jobs in the job table."""
+
+    def test_enqueued_with_the_transaction(self, session):
+        """Test that jobs are only queued when the enqueuing transaction commits."""
+        enqueue(session, "test.record", value=1)
+        session.rollback()
+        assert session.exec(select(Job)).all() == []
+
+        enqueue(session, "test.record", value=2)
+        session.commit()
+
+        job, = session.exec(select(Job)).all()
+        assert job.name == "test.record"
+        assert json.loads(job.payload) == {"value": 2}
+        assert job.status == JobStatus.QUEUED
+
+class TestWorker:
+    """Test running, retrying and dead-lettering jobs."""
+
+    def test_runs_due_jobs(self, handlers, worker, session):
+        """Test that due jobs run once and are marked done; delayed ones wait."""
+        enqueue(session, "test.record", value=1)
+        enqueue(session, "test.record", delay=3600, value=2)
+        session.commit()
+
+        assert worker.run_pending() == 1
+        assert calls == [{"value": 1}]
+        statuses = sorted(job.status for job in session.exec(select(Job)).all())
+        assert statuses == [JobStatus.DONE, JobStatus.QUEUED]
+
+    def test_retry_then_dead_letter(self, handlers, worker, session, engine):
+        """Test that failures back off, then land in the dead-letter set."""
+        enqueue(session, "test.broken")
+        session.commit()
+
+        worker.run_pending()
+        job = session.exec(select(Job)).one()
+        assert job.status == JobStatus.QUEUED
+        assert job.attempts == 1
+        assert "RuntimeError: boom" in job.last_error
+        assert job.run_at > datetime.utcnow() + timedelta(seconds=50)
+
+        job.run_at = datetime.utcnow()
+        session.commit()
+        worker.run_pending()
+        session.refresh(job)
+        assert job.status == JobStatus.DEAD
+        assert worker.stats.dead == 1
+
+        store = worker.stores[0]
+        assert [entry["name"] for entry in store.dead()] == ["test.broken"]
+        assert store.requeue_dead() == 1
+        session.refresh(job)
+        assert (job.status, job.attempts) == (JobStatus.QUEUED, 0)
+
+    def test_unknown_job_is_dead_lettered(self, worker, session):
+        """Test that a job without a handler is not retried."""
+        enqueue(session, "test.missing")
+        session.commit()
+
+        worker.run_pending()
+
+        assert session.exec(select(Job)).one().status == JobStatus.DEAD
+
+    def test_expired_lease_is_claimed_again(self, handlers, engine, session):
+        """Test that jobs of a worker that died run again after the lease."""
+        store = SQLJobStore(lambda: Session(engine))
+        enqueue(session, "test.record")
+        session.commit()
+
+        assert len(store.claim(10, lease_seconds=300)) == 1
+        assert store.claim(10, lease_seconds=300) == []
+
+        job = session.exec(select(Job)).one()
+        job.locked_until = datetime.utcnow() - timedelta(seconds=1)
+        session.commit()
+        reclaimed, = store.claim(10, lease_seconds=300)
+        assert reclaimed.attempts == 2
+
+    def test_schedules_run_once_per_interval(self, engine, session):
+        """Test that workers agree on one run per interval."""
+        schedules = [Schedule("test.record", 60, {"scheduled": True})]
+        first, second = (
+            Worker([SQLJobStore(lambda: Session(engine))], lambda: Session(engine), schedules=schedules)
+            for _ in range(2)
+        )
+
+        assert first.schedule_due(now=600.0) == 1
+        assert second.schedule_due(now=610.0) == 0
+        assert first.schedule_due(now=630.0) == 0
+        assert second.schedule_due(now=660.0) == 1
+        assert len(session.exec(select(Job)).all()) == 2
+
+class TestRedisJobStore:
+    """Test that the Redis store records failures like the job table."""
+
+    def test_retry_keeps_last_error(self, redis_store):
+        """Test that a retried job carries its last error."""
+        redis_store.push([("test.record", {"value": 1}, datetime.utcnow())])
+        queued, = redis_store.claim(10, lease_seconds=60)
+
+        redis_store.retry(queued, datetime.utcnow(), "boom")
+
+        data = json.loads(redis_store.client.hget(redis_store.DATA, queued.id))
+        assert data["last_error"] == "boom"
+        assert data["attempts"] == 1
+
+    def test_dead_newest_first(self, redis_store):
+        """Test that dead-lettered jobs are listed newest first."""
+        redis_store.push([("test.record", {"value": value}, datetime.utcnow()) for value in range(3)])
+        for queued in sorted(redis_store.claim(10, lease_seconds=60), key=lambda job: job.payload["value"]):
+            redis_store.bury(queued, f"failed {queued.payload['value']}")
+
+        assert [entry["error"] for entry in redis_store.dead(limit=2)] == ["failed 2", "failed 1"]
+        assert redis_store.requeue_dead() == 3
+        assert redis_store.dead() == []
+
+class TestTasks:
+    """Test the job handlers."""
+
+    def test_delivery_releases_escrow_in_worker(self, client, worker, session, auth_headers, test_user, test_buyer, test_listing):
+        """Test that delivering an order leaves escrow release to the worker."""
+        contract, = make_contracts(session, test_user, test_buyer, test_listing, 1)
+        escrow = Escrow(
+            escrow_number="ESC-JOB", amount_ngn=5000, status=EscrowStatus.FUNDED,
+            contract_id=contract.id, buyer_id=test_buyer.id, seller_id=test_user.id,
+        )
+        order = Order(
+            order_number="ORD-JOB", quantity_kg=10, delivery_address="Lagos", status=OrderStatus.CONFIRMED,
+            contract_id=contract.id, farmer_id=test_user.id, buyer_id=test_buyer.id,
+        )
+        session.add_all([escrow, order])
+        session.commit()
+
+        response = client.post(f"/api/v1/orders/{order.id}/deliver", headers=auth_headers)
+
+        assert response.status_code == 200
+        session.refresh(escrow)
+        assert escrow.status == EscrowStatus.FUNDED
+        assert worker.run_pending() == 1
+        session.refresh(escrow)
+        assert escrow.status == EscrowStatus.RELEASED
+        assert escrow.released_at is not None
@@ -0,0 +1,96 @@
+import io
+import json
+import pytest
+from sqlmodel import Session, select
+import app.services.tasks  # noqa: F401
+from app.core.config import settings
+from app.models.job import Job
+from app.models.kyc import KYC
+from app.services.jobs import SQLJobStore, Worker
+from app.services.kyc_images import render_variants
+
+Image = pytest.importorskip("PIL.Image")
+
+def photo(path, size=(2400, 1800), mode="RGB"):
+    """Write a camera-like JPEG/PNG with EXIF orientation and GPS data."""
+    image = Image.new(mode, size, "green")
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: rotate 90 degrees
+    exif[0x010F] = "TestCam"
+    exif.get_ifd(0x8825)[2] = (6.0, 27.0, 0.0)  # GPS latitude
+    image.save(path, exif=exif.tobytes())
+    return path
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "file_storage_dir", str(tmp_path))
+    return tmp_path
+
+class TestRenderVariants:
+    """Test preview and thumbnail rendering."""
+
+    def test_variants_are_bounded_upright_and_stripped(self, storage):
+        """Test that variants fit their bounds, follow EXIF orientation and carry no metadata."""
+        source = photo(storage / "id.jpg")
+
+        variants = render_variants(str(source), str(storage / "previews"), "kyc_1_document")
+
+        assert (variants["preview"]["width"], variants["preview"]["height"]) == (1200, 1600)
+        assert max(variants["thumbnail"]["width"], variants["thumbnail"]["height"]) == settings.kyc_thumbnail_max_px
+        with Image.open(storage / "previews" / variants["preview"]["file"]) as preview:
+            assert preview.format == "JPEG"
+            assert not preview.getexif()
+        assert variants["thumbnail"]["bytes"] < source.stat().st_size
+
+    def test_transparent_png_is_flattened(self, storage):
+        """Test that transparency ends up white rather than black."""
+        source = storage / "selfie.png"
+        Image.new("RGBA", (50, 50), (0, 0, 0, 0)).save(source)
+
+        variants = render_variants(str(source), str(storage / "previews"), "kyc_1_selfie")
+
+        with Image.open(storage / "previews" / variants["preview"]["file"]) as preview:
+            assert preview.getpixel((25, 25)) > (250, 250, 250)
+
+    def test_non_images_are_skipped(self, storage):
+        """Test that PDFs and other documents get no variants."""
+        source = storage / "business.pdf"
+        source.write_bytes(b"%PDF-1.4\n%%EOF\n")
+
+        assert render_variants(str(source), str(storage / "previews"), "kyc_1_business") is None
+
+class TestPipeline:
+    """Test the upload -> worker -> admin preview flow."""
+
+    def test_upload_is_processed_and_previewed(self, storage, client, engine, session, auth_headers, admin_headers):
+        """Test that an upload queues processing and admins can fetch its previews."""
+        buffer = io.BytesIO()
+        Image.new("RGB", (800, 600), "blue").save(buffer, "JPEG")
+        response = client.post(
+            "/api/v1/kyc/upload",
+            params={"document_type": "national_id", "document_number": "ID1"},
+            files={"document_file": ("../../id.jpg", buffer.getvalue(), "image/jpeg")},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["previews"] == []
+        kyc = session.get(KYC, response.json()["id"])
+        assert kyc.document_file_path.startswith(str(storage))
+        assert session.exec(select(Job)).one().name == "kyc.process"
+
+        worker = Worker([SQLJobStore(lambda: Session(engine))], lambda: Session(engine), schedules=[])
+        assert worker.run_pending() == 1
+        session.refresh(kyc)
+        assert list(json.loads(kyc.previews)) == ["document"]
+        assert kyc.processed_at is not None
+
+        url = f"/api/v1/kyc/admin/{kyc.id}/preview/document"
+        assert client.get(url, headers=auth_headers).status_code == 403
+        preview = client.get(url, params={"size": "thumbnail"}, headers=admin_headers)
+        assert preview.status_code == 200
+        assert preview.headers["content-type"] == "image/jpeg"
+        assert preview.headers["cache-control"].startswith("private")
+        assert client.get(f"/api/v1/kyc/admin/{kyc.id}/preview/selfie", headers=admin_headers).status_code == 404
+        queue = client.get("/api/v1/kyc/admin/queue", headers=admin_headers).json()
+        assert queue[0]["previews"] == ["document"]
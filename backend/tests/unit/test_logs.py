@@ -0,0 +1,91 @@
+import json
+import logging
+import queue
+import sys
+from app.core import logs
+from app.core.config import settings
+from app.core.logs import ContextFilter, JsonFormatter, NonBlockingQueueHandler, RequestContext
+
+def request_records(caplog):
+    return [record for record in caplog.records if record.name == "app.request"]
+
+class TestRequestLog:
+    """Test request ids and the per-request log record."""
+
+    def test_request_id_from_nginx_is_echoed(self, client, caplog, auth_headers):
+        """Test that nginx's request id is used, echoed and logged with timings."""
+        caplog.set_level(logging.INFO, logger="app.request")
+
+        response = client.get("/api/v1/listings/", headers={**auth_headers, "X-Request-ID": "abc123"})
+
+        assert response.headers["x-request-id"] == "abc123"
+        record, = request_records(caplog)
+        assert record.request_id == "abc123"
+        assert (record.method, record.path, record.status) == ("GET", "/api/v1/listings/", 200)
+        assert record.duration_ms > 0
+        assert record.db_queries >= 1
+
+    def test_request_id_generated(self, client):
+        """Test that requests without an id get one."""
+        assert len(client.get("/").headers["x-request-id"]) == 32
+
+    def test_sampling_keeps_errors(self, client, caplog, monkeypatch, auth_headers):
+        """Test that unsampled successes are skipped but errors are always logged."""
+        caplog.set_level(logging.INFO, logger="app.request")
+        monkeypatch.setattr(settings, "log_request_sample_rate", 0.0)
+
+        client.get("/")
+        client.get("/api/v1/listings/999999", headers=auth_headers)
+
+        assert [record.status for record in request_records(caplog)] == [404]
+
+class TestVerboseSampling:
+    """Test that verbose records are kept per sampled request."""
+
+    def test_verbose_records_follow_the_request(self):
+        """Test that DEBUG and SQL records are dropped outside sampled requests."""
+        context_filter = ContextFilter()
+        debug = logging.LogRecord("app.x", logging.DEBUG, "", 0, "debug", (), None)
+        sql = logging.LogRecord("sqlalchemy.engine.Engine", logging.INFO, "", 0, "SELECT 1", (), None)
+        warning = logging.LogRecord("sqlalchemy.engine.Engine", logging.WARNING, "", 0, "slow", (), None)
+
+        token = logs._context.set(RequestContext("r1", verbose=False))
+        try:
+            assert [context_filter.filter(record) for record in (debug, sql, warning)] == [False, False, True]
+            assert warning.request_id == "r1"
+        finally:
+            logs._context.reset(token)
+        token = logs._context.set(RequestContext("r2", verbose=True))
+        try:
+            assert context_filter.filter(sql)
+        finally:
+            logs._context.reset(token)
+
+class TestOutput:
+    """Test the queue handler and JSON output."""
+
+    def test_full_queue_drops(self):
+        """Test that a full queue drops records instead of blocking."""
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+        dropped = logs.stats.dropped
+        for _ in range(3):
+            handler.handle(logging.LogRecord("app.x", logging.INFO, "", 0, "message", (), None))
+
+        assert handler.queue.qsize() == 1
+        assert logs.stats.dropped == dropped + 2
+
+    def test_json_lines(self):
+        """Test that records become one JSON object with extras and the traceback."""
+        handler = NonBlockingQueueHandler(queue.Queue())
+        try:
+            raise ValueError("bad")
+        except ValueError:
+            record = logging.LogRecord("app.x", logging.ERROR, "", 0, "failed %s", ("job",), sys.exc_info())
+        record.job_id = 7
+        record.request_id = "r1"
+
+        entry = json.loads(JsonFormatter().format(handler.prepare(record)))
+
+        assert entry["message"] == "failed job"
+        assert (entry["level"], entry["request_id"], entry["job_id"]) == ("ERROR", "r1", 7)
+        assert "ValueError: bad" in entry["exception"]
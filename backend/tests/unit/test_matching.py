@@ -0,0 +1,267 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlmodel import Session, select
+from app.models.buy_order import BuyOrder, BuyOrderStatus
+from app.models.contract import Contract
+from app.models.listing import Listing, ListingStatus, ProduceType
+from app.models.offer import Offer, OfferStatus
+from app.services.matching import Ask, Bid, Fill, FillPersister, MatchingEngine, OrderBook
+
+def make_ask(listing_id, price, quantity, seq):
+    return Ask(listing_id=listing_id, farmer_id=1, price=price, remaining=quantity, seq=seq)
+
+def make_bid(order_id, limit, quantity, seq):
+    return Bid(
+        order_id=order_id, buyer_id=2, limit_price=limit, remaining=quantity, seq=seq,
+        delivery_location="Lagos", delivery_date=None,
+    )
+
+class TestOrderBook:
+    """Test price-time priority matching."""
+
+    def test_bid_takes_cheapest_asks_first(self):
+        """Test that a bid walks the asks from the lowest price at the ask price."""
+        book = OrderBook()
+        book.rest_ask(make_ask(1, 520.0, 50, seq=1))
+        book.rest_ask(make_ask(2, 500.0, 30, seq=2))
+        book.rest_ask(make_ask(3, 600.0, 100, seq=3))
+
+        fills = book.match_bid(make_bid(10, 550.0, 60, seq=4))
+
+        assert [(fill.listing_id, fill.quantity_kg, fill.unit_price_ngn) for fill in fills] == [
+            (2, 30, 500.0),
+            (1, 30, 520.0),
+        ]
+        assert book.best_ask().listing_id == 1
+        assert book.best_ask().remaining == 20
+        assert book.best_bid() is None
+
+    def test_equal_prices_fill_oldest_first(self):
+        """Test time priority among asks at the same price."""
+        book = OrderBook()
+        book.rest_ask(make_ask(1, 500.0, 10, seq=5))
+        book.rest_ask(make_ask(2, 500.0, 10, seq=1))
+
+        fills = book.match_bid(make_bid(10, 500.0, 10, seq=6))
+
+        assert [fill.listing_id for fill in fills] == [2]
+
+    def test_unfilled_bid_rests(self):
+        """Test that the remainder of a bid above every ask rests on the book."""
+        book = OrderBook()
+        book.rest_ask(make_ask(1, 500.0, 10, seq=1))
+
+        fills = book.match_bid(make_bid(10, 450.0, 25, seq=2))
+
+        assert fills == []
+        assert book.best_bid().remaining == 25
+        assert book.depth(levels=5) == {
+            "bids": [{"price_ngn": 450.0, "quantity_kg": 25, "orders": 1}],
+            "asks": [{"price_ngn": 500.0, "quantity_kg": 10, "orders": 1}],
+        }
+
+    def test_new_ask_fills_highest_bid_at_bid_price(self):
+        """Test that an incoming listing trades against resting bids at their limit."""
+        book = OrderBook()
+        book.rest_bid(make_bid(10, 480.0, 20, seq=1))
+        book.rest_bid(make_bid(11, 510.0, 20, seq=2))
+
+        fills = book.match_ask(make_ask(1, 490.0, 30, seq=3))
+
+        assert [(fill.buy_order_id, fill.quantity_kg, fill.unit_price_ngn) for fill in fills] == [(11, 20, 510.0)]
+        assert book.best_ask().remaining == 10
+
+    def test_inactive_orders_are_skipped(self):
+        """Test lazy deletion of cancelled entries."""
+        book = OrderBook()
+        ask = make_ask(1, 400.0, 10, seq=1)
+        book.rest_ask(ask)
+        book.rest_ask(make_ask(2, 450.0, 10, seq=2))
+        ask.active = False
+
+        assert book.best_ask().listing_id == 2
+
+    def test_requeued_order_keeps_priority_next_to_stale_entry(self):
+        """Test that re-resting an order with its old seq does not compare orders."""
+        book = OrderBook()
+        first = make_ask(1, 500.0, 50, seq=1)
+        book.rest_ask(first)
+        first.active = False
+        book.rest_ask(make_ask(1, 500.0, 40, seq=1))
+        book.rest_ask(make_ask(2, 500.0, 40, seq=2))
+
+        fills = book.match_bid(make_bid(10, 500.0, 40, seq=3))
+
+        assert [(fill.listing_id, fill.quantity_kg) for fill in fills] == [(1, 40)]
+
+@pytest.fixture
+def matching(engine):
+    """A matching engine over the test database (without the background thread)."""
+    return MatchingEngine(lambda: Session(engine), sync_interval=60)
+
+def place_order(session, buyer, quantity, limit):
+    order = BuyOrder(
+        produce_type=ProduceType.VEGETABLES,
+        quality_grade="a",
+        quantity_kg=quantity,
+        remaining_kg=quantity,
+        limit_price_ngn=limit,
+        delivery_location="Lagos",
+        buyer_id=buyer.id,
+    )
+    session.add(order)
+    session.commit()
+    session.refresh(order)
+    return order
+
+class TestMatchingEngine:
+    """Test the engine against listings and write-behind persistence."""
+
+    def test_buy_order_fills_listing_and_persists_contract(self, session, matching, test_listing, test_buyer):
+        """Test that a fill is written as an accepted offer plus contract."""
+        matching.load()
+        order = place_order(session, test_buyer, quantity=40, limit=550.0)
+
+        fills = matching.submit_buy_order(order)
+        assert [(fill.listing_id, fill.quantity_kg) for fill in fills] == [(test_listing.id, 40)]
+        assert matching.persister.flush() == 1
+
+        session.expire_all()
+        contract = session.exec(select(Contract)).one()
+        offer = session.get(Offer, contract.offer_id)
+        assert contract.quantity_kg == 40
+        assert contract.unit_price_ngn == 500.0
+        assert offer.status == OfferStatus.ACCEPTED
+        assert session.get(BuyOrder, order.id).status == BuyOrderStatus.FILLED
+        assert session.get(Listing, test_listing.id).status == ListingStatus.ACTIVE
+
+    def test_exhausted_listing_is_marked_sold(self, session, matching, test_listing, test_buyer):
+        """Test that a listing whose quantity is fully matched becomes SOLD."""
+        matching.load()
+        order = place_order(session, test_buyer, quantity=150, limit=500.0)
+
+        matching.submit_buy_order(order)
+        matching.persister.flush()
+
+        session.expire_all()
+        assert session.get(Listing, test_listing.id).status == ListingStatus.SOLD
+        remaining = session.get(BuyOrder, order.id)
+        assert remaining.status == BuyOrderStatus.OPEN
+        assert remaining.remaining_kg == 50
+        assert matching.remaining_for(order.id) == 50
+
+    def test_resting_orders_are_loaded(self, session, matching, test_listing, test_buyer):
+        """Test that open buy orders below the ask rest on the book after load."""
+        place_order(session, test_buyer, quantity=10, limit=300.0)
+        matching.load()
+
+        depth = matching.depth(ProduceType.VEGETABLES, "A")
+        assert depth["bids"] == [{"price_ngn": 300.0, "quantity_kg": 10, "orders": 1}]
+        assert depth["asks"] == [{"price_ngn": 500.0, "quantity_kg": 100, "orders": 1}]
+
+    def test_fill_on_unavailable_listing_is_restored(self, session, matching, test_listing, test_buyer):
+        """Test that fills against a listing sold elsewhere are rejected and restored."""
+        matching.load()
+        test_listing.status = ListingStatus.SOLD
+        test_listing.updated_at = datetime.utcnow() + timedelta(seconds=1)
+        session.add(test_listing)
+        session.commit()
+        order = place_order(session, test_buyer, quantity=20, limit=600.0)
+
+        matching.submit_buy_order(order)
+        assert matching.persister.flush() == 0
+
+        assert session.exec(select(Contract)).all() == []
+        assert matching.remaining_for(order.id) == 20
+        assert matching.depth(ProduceType.VEGETABLES, "A")["asks"] == []
+
+    def test_sync_after_editing_resting_listing(self, session, matching, test_listing, test_buyer, test_user, test_farm):
+        """Test that syncing an edited resting listing keeps it and picks up other changes."""
+        matching.load()
+        test_listing.quantity_kg = 80
+        test_listing.remaining_kg = 80
+        test_listing.updated_at = datetime.utcnow() + timedelta(seconds=1)
+        other = Listing(
+            title="Fresh peppers",
+            description="Other listing",
+            produce_type=ProduceType.VEGETABLES,
+            quality_grade="A",
+            quantity_kg=30,
+            unit_price_ngn=520.0,
+            total_price_ngn=15600.0,
+            status=ListingStatus.ACTIVE,
+            farmer_id=test_user.id,
+            farm_id=test_farm.id,
+        )
+        session.add_all([test_listing, other])
+        session.commit()
+
+        matching.sync()
+
+        assert matching.depth(ProduceType.VEGETABLES, "A")["asks"] == [
+            {"price_ngn": 500.0, "quantity_kg": 80, "orders": 1},
+            {"price_ngn": 520.0, "quantity_kg": 30, "orders": 1},
+        ]
+
+    def test_sync_rereads_rows_committed_late(self, session, matching, test_listing, test_buyer):
+        """Test that a change stamped before the last sync but committed after it is picked up."""
+        matching.load()
+        test_listing.unit_price_ngn = 450.0
+        test_listing.updated_at = matching._synced_at - timedelta(seconds=0.5)
+        session.add(test_listing)
+        session.commit()
+
+        matching.sync()
+
+        assert matching.depth(ProduceType.VEGETABLES, "A")["asks"] == [
+            {"price_ngn": 450.0, "quantity_kg": 100, "orders": 1},
+        ]
+
+    def test_cancelled_order_is_not_restored(self, session, matching, test_listing, test_buyer):
+        """Test that a fill rejected after a cancel does not put the order back on the book."""
+        matching.load()
+        order = place_order(session, test_buyer, quantity=150, limit=600.0)
+        fill, = matching.submit_buy_order(order)
+        assert matching.remaining_for(order.id) == 50
+        assert matching.cancel_buy_order(order.id) is True
+
+        # The fill is rejected while the cancel is not committed yet
+        matching._restore([fill])
+
+        assert matching.remaining_for(order.id) is None
+        assert matching.depth(ProduceType.VEGETABLES, "A")["bids"] == []
+
+class TestFillPersister:
+    """Test that fills failing to persist do not block the others."""
+
+    def test_poison_fill_is_dropped_and_released(self, engine, session, test_user, test_buyer, test_listing, monkeypatch):
+        """Test that a fill that keeps failing is retried, then dropped and handed back."""
+        rejected = []
+        persister = FillPersister(lambda: Session(engine), rejected.extend, max_attempts=2, retry_backoff=0)
+        write = persister._write
+
+        def failing_write(batch):
+            if any(fill.listing_id == -1 for fill in batch):
+                raise RuntimeError("cannot write")
+            return write(batch)
+        monkeypatch.setattr(persister, "_write", failing_write)
+
+        def fill(listing_id):
+            return Fill(
+                buy_order_id=1, buyer_id=test_buyer.id, listing_id=listing_id, farmer_id=test_user.id,
+                quantity_kg=10, unit_price_ngn=500.0, delivery_location="Lagos", delivery_date=None,
+                order_remaining_kg=0, listing_remaining_kg=90,
+            )
+        poison = fill(-1)
+        persister.submit([poison, fill(test_listing.id)])
+
+        assert persister.flush() == 1
+        assert rejected == []
+        assert persister.pending_kg(-1) == 10
+        assert persister.flush() == 0
+
+        assert rejected == [poison]
+        assert persister.dropped == 1
+        assert persister.pending_kg(-1) == 0
+        assert persister.queue.empty()
+        assert len(session.exec(select(Contract)).all()) == 1
@@ -0,0 +1,105 @@
+import os
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+from sqlmodel import SQLModel
+import app.models  # noqa: F401
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def alembic_config(url):
+    """Alembic configuration pointed at the given database."""
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    config.cmd_opts = type("Opts", (), {"x": [f"database_url={url}"]})()
+    return config
+
+
+@pytest.fixture(scope="function")
+def migrated_url(tmp_path):
+    """Upgrade a scratch SQLite database to the latest revision."""
+    url = f"sqlite:///{tmp_path / 'migrations.db'}"
+    config = alembic_config(url)
+    command.upgrade(config, "head")
+    yield url, config
+
+
+class TestMigrations:
+    """Test the Alembic migration chain."""
+
+    def test_head_matches_models(self, migrated_url):
+        """Test that upgrading to head produces the schema declared by the models."""
+        url, _ = migrated_url
+        engine = create_engine(url)
+        with engine.connect() as connection:
+            context = MigrationContext.configure(connection, opts={"compare_type": True})
+            assert compare_metadata(context, SQLModel.metadata) == []
+
+    def test_ownership_indexes_exist(self, migrated_url):
+        """Test that foreign keys used in ownership filters are indexed."""
+        url, _ = migrated_url
+        inspector = inspect(create_engine(url))
+
+        def indexed_columns(table):
+            return {tuple(index["column_names"]) for index in inspector.get_indexes(table)}
+
+        assert ("farmer_id",) in indexed_columns("listing")
+        assert ("listing_id", "status") in indexed_columns("offer")
+        assert ("buyer_id",) in indexed_columns("offer")
+        assert ("farmer_id",) in indexed_columns("contract")
+        assert ("buyer_id",) in indexed_columns("contract")
+        assert ("contract_id",) in indexed_columns("escrow")
+        assert ("contract_id",) in indexed_columns("order")
+
+    def test_downgrade_to_base(self, migrated_url):
+        """Test that the chain can be fully reverted."""
+        url, config = migrated_url
+        command.downgrade(config, "base")
+
+        inspector = inspect(create_engine(url))
+        assert set(inspector.get_table_names()) <= {"alembic_version"}
+
+    def test_remaining_quantity_backfill(self, tmp_path):
+        """Test that listing remaining quantity is backfilled from existing contracts."""
+        url = f"sqlite:///{tmp_path / 'backfill.db'}"
+        config = alembic_config(url)
+        command.upgrade(config, "0003")
+
+        engine = create_engine(url)
+        with engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO user (id, email, username, hashed_password, full_name, role, is_active, "
+                "is_verified, created_at, updated_at, kyc_status) VALUES "
+                "(1, 'f@x', 'f', 'x', 'F', 'FARMER', 1, 1, '2026-01-01', '2026-01-01', 'approved')"
+            ))
+            connection.execute(text(
+                "INSERT INTO farm (id, name, location, size_hectares, is_active, created_at, updated_at, farmer_id) "
+                "VALUES (1, 'Farm', 'Kano', 1, 1, '2026-01-01', '2026-01-01', 1)"
+            ))
+            for listing_id, status in [(1, "ACTIVE"), (2, "SOLD")]:
+                connection.execute(text(
+                    "INSERT INTO listing (id, title, produce_type, quantity_kg, unit_price_ngn, total_price_ngn, "
+                    "status, is_organic, created_at, updated_at, farmer_id, farm_id) VALUES "
+                    f"({listing_id}, 'Maize', 'GRAINS', 1000, 10, 10000, '{status}', 0, '2026-01-01', '2026-01-01', 1, 1)"
+                ))
+            connection.execute(text(
+                "INSERT INTO offer (id, quantity_kg, unit_price_ngn, total_price_ngn, delivery_location, status, "
+                "expires_at, created_at, updated_at, buyer_id, listing_id) VALUES "
+                "(1, 300, 10, 3000, 'Lagos', 'ACCEPTED', '2026-01-08', '2026-01-01', '2026-01-01', 1, 1)"
+            ))
+            connection.execute(text(
+                "INSERT INTO contract (id, contract_number, quantity_kg, unit_price_ngn, total_amount_ngn, "
+                "delivery_date, delivery_location, status, created_at, updated_at, farmer_id, buyer_id, "
+                "listing_id, offer_id) VALUES (1, 'CTR-1', 300, 10, 3000, '2026-02-01', 'Lagos', 'ACTIVE', "
+                "'2026-01-01', '2026-01-01', 1, 1, 1, 1)"
+            ))
+
+        command.upgrade(config, "0004")
+
+        with engine.connect() as connection:
+            remaining = dict(connection.execute(text("SELECT id, remaining_kg FROM listing")).all())
+        assert remaining == {1: 700, 2: 0}
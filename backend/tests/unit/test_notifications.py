@@ -0,0 +1,215 @@
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session
+from app.core.config import settings
+from app.models.escrow import Escrow, EscrowStatus
+from app.models.offer import Offer
+from app.services import notifications
+from app.services.notifications import LoopbackProvider, Notifier, NotificationProvider
+from app.main import app
+from tests.unit.test_offers import pending_offer
+
+LATER = float("inf")
+
+class FlakyProvider(NotificationProvider):
+    def __init__(self, failures):
+        self.name = f"flaky-{uuid.uuid4()}"
+        self.failures = failures
+        self.sent = []
+
+    def send(self, channel, address, messages):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("provider down")
+        self.sent.append((channel, address, messages))
+
+def loopback():
+    provider = LoopbackProvider()
+    # Own rate limit bucket per test
+    provider.name = f"loopback-{uuid.uuid4()}"
+    return provider
+
+@pytest.fixture
+def notifier(engine, monkeypatch):
+    notifier = Notifier(
+        lambda: Session(engine),
+        {"email": loopback(), "sms": loopback()},
+        batch_window=2.0, rate_per_second=1000, burst=1000,
+    )
+    monkeypatch.setattr(settings, "notifications_enabled", True)
+    monkeypatch.setattr(notifications, "_notifier", notifier)
+    return notifier
+
+class TestEventRecording:
+    """Test that committed status changes become notification events."""
+
+    def test_new_offer_notifies_farmer(self, notifier, session, test_user, test_buyer, test_listing):
+        """Test that the listing's farmer gets an email and an SMS for a new offer."""
+        pending_offer(session, test_buyer, test_listing, 10)
+
+        assert notifier.flush(now=LATER) == 2
+        email, = notifier.providers["email"].sent
+        sms, = notifier.providers["sms"].sent
+        assert email[1] == test_user.email
+        assert sms[1] == test_user.phone
+        assert email[2][0].startswith(f"New offer on {test_listing.title}: 10 kg")
+
+    def test_rollback_sends_nothing(self, notifier, session, test_buyer, test_listing):
+        """Test that events from a rolled back transaction are dropped."""
+        offer = pending_offer(session, test_buyer, test_listing, 10)
+        notifier.flush(now=LATER)
+        offer.status = "accepted"
+        session.flush()
+        session.rollback()
+
+        assert notifier.events.empty()
+        assert session.info.get("notification_events") is None
+
+    def test_status_transition(self, notifier, session, test_user, test_buyer, test_listing):
+        """Test that a status change notifies the counterparty."""
+        escrow = Escrow(escrow_number="ESC-1", amount_ngn=5000.0, contract_id=1, buyer_id=test_buyer.id, seller_id=test_user.id)
+        session.add(escrow)
+        session.commit()
+        escrow.status = EscrowStatus.FUNDED
+        session.commit()
+
+        notifier.flush(now=LATER)
+
+        messages = [batch[2] for batch in notifier.providers["email"].sent]
+        assert messages == [["Escrow ESC-1 funded: NGN 5,000.00 is held for you"]]
+
+    def test_batch_accept_records_events(self, notifier, client, session, auth_headers, test_buyer, test_listing):
+        """Test that offers accepted with Core statements still notify."""
+        offers = [pending_offer(session, test_buyer, test_listing, 10) for _ in range(2)]
+        notifier.flush(now=LATER)
+
+        client.post("/api/v1/offers/batch-accept", json={"offer_ids": [offer.id for offer in offers]}, headers=auth_headers)
+        notifier.flush(now=LATER)
+
+        buyer_batches = [batch for batch in notifier.providers["email"].sent if batch[1] == test_buyer.email]
+        assert len(buyer_batches) == 1
+        assert len(buyer_batches[0][2]) == 4
+
+class TestDelivery:
+    """Test batching, rate limiting and retries."""
+
+    def test_batched_per_recipient(self, notifier, session, test_buyer, test_listing):
+        """Test that a burst of events for one recipient is sent once."""
+        for _ in range(3):
+            pending_offer(session, test_buyer, test_listing, 10)
+
+        assert notifier.flush(now=0.0) == 0
+        assert notifier.flush(now=LATER) == 2
+        email, = notifier.providers["email"].sent
+        assert len(email[2]) == 3
+
+    def test_rate_limited(self, engine, session, test_buyer, test_listing, monkeypatch):
+        """Test that sends beyond the provider's bucket wait for a token."""
+        provider = loopback()
+        notifier = Notifier(lambda: Session(engine), {"email": provider}, batch_window=0, rate_per_second=0.001, burst=1)
+        monkeypatch.setattr(settings, "notifications_enabled", True)
+        monkeypatch.setattr(notifications, "_notifier", notifier)
+        notifier.submit([("offer.created", pending_offer(session, test_buyer, test_listing, 10).id)])
+        notifier.submit([("offer.accepted", pending_offer(session, test_buyer, test_listing, 10).id)])
+
+        sent = notifier.flush(now=LATER)
+
+        assert sent == 1
+        assert notifier.stats.throttled == 1
+        assert len(notifier.batches) == 1
+
+    def test_retries_with_backoff(self, engine, session, test_buyer, test_listing, monkeypatch):
+        """Test that failed sends are retried later, then dropped after the last attempt."""
+        provider = FlakyProvider(failures=2)
+        notifier = Notifier(
+            lambda: Session(engine), {"email": provider}, batch_window=0, retry_backoff=1.0, max_attempts=3
+        )
+        monkeypatch.setattr(settings, "notifications_enabled", True)
+        monkeypatch.setattr(notifications, "_notifier", notifier)
+        pending_offer(session, test_buyer, test_listing, 10)
+
+        assert notifier.flush(now=100.0) == 0
+        assert notifier.batches[0].due == 101.0
+        assert notifier.flush(now=100.5) == 0
+        assert notifier.flush(now=101.0) == 0
+        assert notifier.batches[0].due == 103.0
+        assert notifier.flush(now=103.0) == 1
+        assert notifier.stats.failed == 2
+
+        provider.failures = 5
+        pending_offer(session, test_buyer, test_listing, 10)
+        for now in (200.0, 201.0, 203.0):
+            notifier.flush(now=now)
+        assert notifier.batches == []
+        assert notifier.stats.dropped == 1
+
+    def test_shutdown_sends_held_messages(self, notifier, session, test_buyer, test_listing):
+        """Test that stopping the process notifier sends batches still in their window."""
+        pending_offer(session, test_buyer, test_listing, 10)
+        notifier.flush(now=0.0)
+        assert notifier.batches
+
+        notifications.shutdown_notifier()
+
+        assert notifier.batches == []
+        assert len(notifier.providers["email"].sent) == 1
+        assert notifications._notifier is None
+
+    def test_shutdown_waits_for_rate_limit(self, engine, session, test_buyer, test_listing):
+        """Test that batches throttled at shutdown are sent once a token is available."""
+        provider = loopback()
+        notifier = Notifier(lambda: Session(engine), {"email": provider}, batch_window=60, rate_per_second=50, burst=1)
+        notifier.submit([("offer.created", pending_offer(session, test_buyer, test_listing, 10).id)])
+        notifier.submit([("offer.accepted", pending_offer(session, test_buyer, test_listing, 10).id)])
+
+        notifier.stop(timeout=5)
+
+        assert len(provider.sent) == 2
+        assert notifier.stats.throttled >= 1
+        assert notifier.batches == []
+
+    def test_shutdown_gives_up_at_deadline(self, engine, session, test_buyer, test_listing):
+        """Test that batches still failing when the shutdown timeout passes are dropped."""
+        provider = FlakyProvider(failures=100)
+        notifier = Notifier(lambda: Session(engine), {"email": provider}, batch_window=60, retry_backoff=0.01)
+        notifier.submit([("offer.created", pending_offer(session, test_buyer, test_listing, 10).id)])
+
+        notifier.stop(timeout=0.05)
+
+        assert provider.sent == []
+        assert notifier.batches == []
+        assert notifier.stats.dropped == 1
+
+    def test_application_shutdown_stops_notifier(self, notifier):
+        """Test that the app's shutdown handler stops the notifier."""
+        with TestClient(app):
+            assert notifications._notifier is notifier
+
+        assert notifications._notifier is None
+
+class TestRendering:
+    """Test that rendering problems do not lose other events."""
+
+    def test_bad_event_only_drops_itself(self, notifier, session, test_buyer, test_listing, monkeypatch):
+        """Test that an event that cannot be rendered does not take the others with it."""
+        monkeypatch.setitem(notifications.EVENTS, "offer.broken", (Offer, ("buyer_id",), "{obj.no_such_field}"))
+        offer = pending_offer(session, test_buyer, test_listing, 10)
+        notifier.submit([("offer.broken", offer.id), ("offer.accepted", offer.id)])
+
+        notifier.flush(now=LATER)
+
+        email, = [sent for sent in notifier.providers["email"].sent if sent[2] == [f"Your offer on {test_listing.title} was accepted"]]
+        assert notifier.stats.dropped == 1
+
+    def test_events_kept_while_database_unavailable(self, notifier, monkeypatch):
+        """Test that drained events go back to the queue when the database cannot be reached."""
+        def unavailable(events):
+            raise OperationalError("SELECT", {}, Exception("connection refused"))
+        monkeypatch.setattr(notifier, "render", unavailable)
+        notifier.submit([("offer.accepted", 1), ("offer.rejected", 2)])
+
+        notifier.flush(now=LATER)
+
+        assert notifier._drain() == [("offer.accepted", 1), ("offer.rejected", 2)]
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+from sqlmodel import select
+from app.models.contract import Contract
+from app.models.listing import ListingStatus
+from app.models.offer import Offer, OfferStatus
+
+def pending_offer(session, buyer, listing, quantity, expires_in_days=7):
+    offer = Offer(
+        quantity_kg=quantity,
+        unit_price_ngn=listing.unit_price_ngn,
+        total_price_ngn=quantity * listing.unit_price_ngn,
+        delivery_location="Lagos",
+        expires_at=datetime.utcnow() + timedelta(days=expires_in_days),
+        buyer_id=buyer.id,
+        listing_id=listing.id,
+    )
+    session.add(offer)
+    session.commit()
+    session.refresh(offer)
+    return offer
+
+class TestBatchAccept:
+    """Test accepting many offers with bulk contract creation."""
+
+    def test_accepts_offers_and_creates_contracts(self, client, session, auth_headers, test_buyer, test_listing):
+        """Test that valid offers are accepted with one contract each."""
+        offers = [pending_offer(session, test_buyer, test_listing, 30) for _ in range(3)]
+
+        response = client.post(
+            "/api/v1/offers/batch-accept",
+            json={"offer_ids": [offer.id for offer in offers]},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["accepted"] == 3
+        assert all(item["contract_number"].startswith("CTR-") for item in body["results"])
+        contracts = session.exec(select(Contract)).all()
+        assert {contract.offer_id for contract in contracts} == {offer.id for offer in offers}
+        for offer in offers:
+            session.refresh(offer)
+            assert offer.status == OfferStatus.ACCEPTED
+        session.refresh(test_listing)
+        assert test_listing.remaining_kg == 10
+
+    def test_per_item_results(self, client, session, auth_headers, test_buyer, test_listing):
+        """Test that invalid offers are reported without blocking the rest."""
+        first = pending_offer(session, test_buyer, test_listing, 70)
+        too_big = pending_offer(session, test_buyer, test_listing, 40)
+        expired = pending_offer(session, test_buyer, test_listing, 10, expires_in_days=-1)
+        last = pending_offer(session, test_buyer, test_listing, 30)
+
+        response = client.post(
+            "/api/v1/offers/batch-accept",
+            json={"offer_ids": [first.id, too_big.id, expired.id, 99999, last.id]},
+            headers=auth_headers,
+        )
+
+        results = {item["offer_id"]: item for item in response.json()["results"]}
+        assert results[first.id]["accepted"] is True
+        assert results[too_big.id]["error"] == "Insufficient quantity remaining on listing"
+        assert results[expired.id]["error"] == "Offer is no longer valid"
+        assert results[99999]["error"] == "Offer not found"
+        assert results[last.id]["accepted"] is True
+        session.refresh(test_listing)
+        assert test_listing.status == ListingStatus.SOLD
+        session.refresh(too_big)
+        assert too_big.status == OfferStatus.PENDING
+
+    def test_only_listing_owner_can_accept(self, client, session, admin_headers, test_buyer, test_listing):
+        """Test that non-farmers cannot use the batch endpoint."""
+        offer = pending_offer(session, test_buyer, test_listing, 10)
+
+        response = client.post(
+            "/api/v1/offers/batch-accept", json={"offer_ids": [offer.id]}, headers=admin_headers
+        )
+
+        assert response.status_code == 403
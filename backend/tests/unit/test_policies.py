@@ -0,0 +1,95 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlmodel import select
+from app.core.auth import create_access_token
+from app.core.policies import FARM_VIEWER, OFFER_SELLER, OFFER_VIEWER
+from app.models.listing import Listing
+from app.models.offer import Offer
+from app.models.user import User, UserRole
+from tests.unit.test_offers import pending_offer
+
+def count_queries(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+class TestPolicyFetch:
+    """Test loading rows with the ownership check in the same query."""
+
+    def test_owner_gets_row_and_parent(self, session, test_user, test_buyer, test_listing):
+        """Test that the owner gets the offer with its listing from one statement."""
+        offer = pending_offer(session, test_buyer, test_listing, 10)
+        session.refresh(test_user)
+        statements = count_queries(session.get_bind())
+
+        loaded, listing = OFFER_SELLER.fetch(session, offer.id, test_user, include=[Listing])
+
+        assert loaded.id == offer.id
+        assert listing.id == test_listing.id
+        assert len(statements) == 1
+
+    def test_missing_row_is_404(self, session, test_user):
+        """Test that an unknown id is reported as not found."""
+        with pytest.raises(HTTPException) as error:
+            OFFER_SELLER.fetch(session, 99999, test_user)
+
+        assert error.value.status_code == 404
+        assert error.value.detail == "Offer not found"
+
+    def test_other_user_is_403(self, session, test_buyer, test_listing):
+        """Test that an existing row the user may not act on is forbidden."""
+        offer = pending_offer(session, test_buyer, test_listing, 10)
+
+        with pytest.raises(HTTPException) as error:
+            OFFER_SELLER.fetch(session, offer.id, test_buyer, forbidden="Not yours")
+
+        assert error.value.status_code == 403
+        assert error.value.detail == "Not yours"
+
+    def test_role_dependent_rule(self, session, test_farm, test_buyer, test_admin):
+        """Test that non-farmers may view any farm."""
+        assert FARM_VIEWER.fetch(session, test_farm.id, test_buyer).id == test_farm.id
+        assert FARM_VIEWER.fetch(session, test_farm.id, test_admin).id == test_farm.id
+
+    def test_filter_by_role(self, session, test_user, test_buyer, test_admin, test_listing):
+        """Test that list filters follow the same rules."""
+        offer = pending_offer(session, test_buyer, test_listing, 10)
+
+        for user, expected in ((test_user, [offer.id]), (test_buyer, [offer.id]), (test_admin, [])):
+            rows = session.exec(OFFER_VIEWER.filter(select(Offer.id), user)).all()
+            assert rows == expected
+
+class TestEndpoints:
+    """Test endpoint behaviour on top of the policies."""
+
+    def test_accept_offer_checks_ownership(self, client, session, admin_headers, auth_headers, test_buyer, test_listing):
+        """Test that only the listing's farmer may accept an offer on it."""
+        offer = pending_offer(session, test_buyer, test_listing, 10)
+
+        assert client.post(f"/api/v1/offers/{offer.id}/accept", headers=admin_headers).status_code == 403
+        assert client.post("/api/v1/offers/99999/accept", headers=auth_headers).status_code == 404
+        assert client.post(f"/api/v1/offers/{offer.id}/accept", headers=auth_headers).status_code == 200
+
+    def test_offers_listed_per_role(self, client, session, auth_headers, test_buyer, test_listing):
+        """Test that farmers and buyers each see the offers that concern them."""
+        offer = pending_offer(session, test_buyer, test_listing, 10)
+        buyer_headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(test_buyer.id)})}"}
+
+        assert [row["id"] for row in client.get("/api/v1/offers/", headers=auth_headers).json()] == [offer.id]
+        assert [row["id"] for row in client.get("/api/v1/offers/", headers=buyer_headers).json()] == [offer.id]
+
+    def test_farm_update_forbidden_for_other_farmer(self, client, session, test_farm, test_user):
+        """Test that a farmer cannot update another farmer's farm."""
+        other = User(
+            email="other@example.com", username="otherfarmer", full_name="Other Farmer",
+            hashed_password="x", role=UserRole.FARMER, is_active=True, is_verified=True,
+        )
+        session.add(other)
+        session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(other.id)})}"}
+
+        response = client.put(f"/api/v1/farms/{test_farm.id}", json={"name": "Mine"}, headers=headers)
+
+        assert response.status_code == 403
+        assert response.json()["detail"] == "Not enough permissions"
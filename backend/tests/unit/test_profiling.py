@@ -0,0 +1,79 @@
+import marshal
+import threading
+import pytest
+from app.core import profiling
+from app.core.profiling import StackSampler
+
+def spin_for_profiler(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+@pytest.fixture
+def request_profiler():
+    """The worker's request profiler, without armed routes or profiles."""
+    profiling.request_profiler.disarm()
+    profiling.request_profiler.profiles.clear()
+    yield profiling.request_profiler
+    profiling.request_profiler.disarm()
+
+class TestStackSampler:
+    """Test the sampling profiler."""
+
+    def test_busy_thread_is_sampled(self):
+        """Test that a busy thread's stack shows up in the folded output."""
+        stop = threading.Event()
+        thread = threading.Thread(target=spin_for_profiler, args=(stop,))
+        thread.start()
+        try:
+            stacks = StackSampler().sample(0.2, interval=0.005)
+        finally:
+            stop.set()
+            thread.join()
+
+        busy = [stack for stack in stacks if "spin_for_profiler" in stack]
+        assert busy
+        assert busy[0].startswith("threading:_bootstrap;")
+        assert profiling.folded(stacks).splitlines()[0].rsplit(" ", 1)[1].isdigit()
+
+class TestEndpoints:
+    """Test the admin profiling endpoints."""
+
+    def test_admin_only(self, client, auth_headers):
+        """Test that non-admins cannot profile."""
+        assert client.post("/api/v1/admin/profiling/cpu", params={"seconds": 0.1}, headers=auth_headers).status_code == 403
+        assert client.put("/api/v1/admin/profiling/routes", json={"path_prefix": "/"}, headers=auth_headers).status_code == 403
+
+    def test_cpu_profile(self, client, admin_headers):
+        """Test that a CPU profile returns folded stacks for this worker."""
+        response = client.post(
+            "/api/v1/admin/profiling/cpu", params={"seconds": 0.1, "include_idle": True}, headers=admin_headers
+        )
+
+        assert response.status_code == 200
+        assert response.headers["x-profiled-pid"].isdigit()
+        assert ";" in response.text
+
+    def test_one_cpu_profile_at_a_time(self, client, admin_headers):
+        """Test that concurrent profiles are refused."""
+        with profiling.sampler.running:
+            response = client.post("/api/v1/admin/profiling/cpu", params={"seconds": 0.1}, headers=admin_headers)
+
+        assert response.status_code == 409
+
+    def test_route_profiling(self, client, admin_headers, auth_headers, request_profiler):
+        """Test that only the armed number of matching requests are profiled."""
+        client.put("/api/v1/admin/profiling/routes", json={"path_prefix": "/api/v1/listings", "requests": 1}, headers=admin_headers)
+
+        client.get("/api/v1/dashboard/summary", headers=auth_headers)
+        client.get("/api/v1/listings/", headers=auth_headers)
+        client.get("/api/v1/listings/", headers=auth_headers)
+
+        assert client.get("/api/v1/admin/profiling/routes", headers=admin_headers).json() == []
+        summary, = client.get("/api/v1/admin/profiling/requests", headers=admin_headers).json()
+        assert (summary["path"], summary["status"]) == ("/api/v1/listings/", 200)
+
+        report = client.get(f"/api/v1/admin/profiling/requests/{summary['id']}", headers=admin_headers)
+        assert "function calls" in report.text
+        dump = client.get(f"/api/v1/admin/profiling/requests/{summary['id']}", params={"format": "pstats"}, headers=admin_headers)
+        assert isinstance(marshal.loads(dump.content), dict)
+        assert client.get("/api/v1/admin/profiling/requests/999", headers=admin_headers).status_code == 404
@@ -0,0 +1,121 @@
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+from app.core import ratelimit
+from app.core import database
+from app.core.auth import create_access_token
+from app.core.overload import LoadSheddingMiddleware
+from app.core.ratelimit import LocalTokenBuckets, rate_limit, client_identity
+
+def make_request(headers=None, path="/api/v1/listings/"):
+    """Build a bare Starlette request for a route path."""
+    raw_headers = [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()]
+    return Request({
+        "type": "http", "method": "GET", "path": path, "headers": raw_headers,
+        "client": ("10.0.0.1", 1234),
+    })
+
+class TestLocalTokenBuckets:
+    """Test the in-process token bucket."""
+    
+    def test_burst_then_reject(self):
+        """Test that a bucket allows its burst and then rejects."""
+        buckets = LocalTokenBuckets()
+        results = [buckets.take("k", rate=1.0, burst=3)[0] for _ in range(4)]
+        
+        assert results == [True, True, True, False]
+    
+    def test_refill_over_time(self, monkeypatch):
+        """Test that tokens refill at the configured rate."""
+        clock = [0.0]
+        monkeypatch.setattr(ratelimit.time, "monotonic", lambda: clock[0])
+        buckets = LocalTokenBuckets()
+        buckets.take("k", rate=2.0, burst=1)
+        
+        allowed, retry_after = buckets.take("k", rate=2.0, burst=1)
+        assert allowed is False
+        assert retry_after == pytest.approx(0.5)
+        
+        clock[0] += 0.5
+        assert buckets.take("k", rate=2.0, burst=1)[0] is True
+    
+    def test_keys_are_independent(self):
+        """Test that one caller exhausting a bucket does not affect another."""
+        buckets = LocalTokenBuckets()
+        buckets.take("a", rate=1.0, burst=1)
+        
+        assert buckets.take("a", rate=1.0, burst=1)[0] is False
+        assert buckets.take("b", rate=1.0, burst=1)[0] is True
+
+class TestRateLimitDependency:
+    """Test the per-user, per-route rate limit dependency."""
+    
+    def test_authenticated_callers_are_keyed_by_user(self, test_user, monkeypatch):
+        """Test that callers behind one IP get separate buckets per user."""
+        monkeypatch.setattr(ratelimit.settings, "trusted_proxies", ["10.0.0.0/8"])
+        token = create_access_token(data={"sub": str(test_user.id)})
+        
+        assert client_identity(make_request({"Authorization": f"Bearer {token}"})) == f"user:{test_user.id}"
+        assert client_identity(make_request({"X-Real-IP": "1.2.3.4"})) == "ip:1.2.3.4"
+    
+    def test_forwarding_headers_need_trusted_proxy(self, monkeypatch):
+        """Test that direct clients cannot choose their address with X-Real-IP or X-Forwarded-For."""
+        monkeypatch.setattr(ratelimit.settings, "trusted_proxies", ["127.0.0.1"])
+        spoofed = {"X-Real-IP": "1.2.3.4", "X-Forwarded-For": "5.6.7.8"}
+        
+        assert client_identity(make_request(spoofed)) == "ip:10.0.0.1"
+        
+        monkeypatch.setattr(ratelimit.settings, "trusted_proxies", ["10.0.0.0/8"])
+        forwarded = make_request({"X-Forwarded-For": "9.9.9.9, 5.6.7.8, 10.0.0.2"})
+        assert client_identity(forwarded) == "ip:5.6.7.8"
+    
+    def test_exceeding_limit_raises_429(self, monkeypatch):
+        """Test that the dependency rejects with 429 and Retry-After."""
+        monkeypatch.setattr(ratelimit, "limiter", ratelimit.TokenBucketLimiter())
+        limit = rate_limit(per_second=1.0, burst=2, scope="test")
+        request = make_request()
+        
+        limit(request)
+        limit(request)
+        with pytest.raises(HTTPException) as exc_info:
+            limit(request)
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.headers["Retry-After"] == "1"
+
+    def test_route_limit_is_not_refilled_by_router_default(self, client, monkeypatch):
+        """Test that the 6th login in a burst gets 429 despite the router-wide limit."""
+        monkeypatch.setattr(ratelimit, "limiter", ratelimit.TokenBucketLimiter())
+        credentials = {"email": "nobody@example.com", "password": "wrong-password"}
+        
+        statuses = [client.post("/api/v1/auth/login", json=credentials).status_code for _ in range(6)]
+        
+        assert statuses == [401] * 5 + [429]
+
+class TestLoadShedding:
+    """Test the load shedding middleware."""
+    
+    def test_sheds_when_in_flight_exceeds_threshold(self, monkeypatch):
+        """Test that saturation answers 503 without calling the app."""
+        monkeypatch.setattr(ratelimit.settings, "shed_max_in_flight", 1)
+        middleware = LoadSheddingMiddleware(app=None)
+        middleware.in_flight = 1
+        
+        assert middleware.overloaded() is True
+    
+    def test_sheds_on_pool_wait(self, monkeypatch):
+        """Test that recent slow connection checkouts trigger shedding."""
+        monkeypatch.setattr(ratelimit.settings, "shed_max_pool_wait_ms", 100.0)
+        stats = database.PoolWaitStats(alpha=1.0)
+        monkeypatch.setattr(database, "pool_wait", stats)
+        middleware = LoadSheddingMiddleware(app=None)
+        
+        assert middleware.overloaded() is False
+        stats.record(500.0)
+        assert middleware.overloaded() is True
+    
+    def test_health_probes_are_exempt(self, client, monkeypatch):
+        """Test that probes still answer while requests are shed."""
+        monkeypatch.setattr(ratelimit.settings, "shed_max_in_flight", 0)
+        
+        assert client.get("/api/v1/listings/").status_code == 503
+        assert client.get("/health").status_code == 200
@@ -0,0 +1,102 @@
+from sqlmodel import select
+from app.core.auth import verify_token
+from app.core.sessions import RevocationIndex, issue_tokens, revocations
+from app.models.refresh_token import RefreshToken
+
+def login(session, user):
+    access_token, refresh_token = issue_tokens(session, user)
+    session.commit()
+    return access_token, refresh_token
+
+class TestRefresh:
+    """Test refresh token rotation."""
+
+    def test_refresh_rotates_tokens(self, client, session, test_user):
+        """Test that a refresh token yields a new pair in the same session."""
+        access_token, refresh_token = login(session, test_user)
+
+        response = client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["refresh_token"] != refresh_token
+        assert verify_token(body["access_token"])["sid"] == verify_token(access_token)["sid"]
+        me = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {body['access_token']}"})
+        assert me.status_code == 200
+
+    def test_replayed_token_revokes_session(self, client, session, test_user):
+        """Test that reusing a rotated refresh token ends the whole session."""
+        access_token, refresh_token = login(session, test_user)
+        rotated = client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token}).json()
+
+        replay = client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+        assert replay.status_code == 401
+
+        response = client.post("/api/v1/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+        assert response.status_code == 401
+        me = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {access_token}"})
+        assert me.status_code == 401
+
+    def test_inactive_user_cannot_refresh(self, client, session, test_user):
+        """Test that deactivated users cannot renew their access."""
+        _, refresh_token = login(session, test_user)
+        test_user.is_active = False
+        session.add(test_user)
+        session.commit()
+
+        response = client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+
+        assert response.status_code == 401
+
+    def test_unknown_token(self, client):
+        """Test that made-up refresh tokens are refused."""
+        response = client.post("/api/v1/auth/refresh", json={"refresh_token": "nope"})
+        assert response.status_code == 401
+
+class TestLogout:
+    """Test ending sessions."""
+
+    def test_logout_revokes_access_and_refresh(self, client, session, test_user):
+        """Test that logout stops both the refresh token and live access tokens."""
+        access_token, refresh_token = login(session, test_user)
+        other_access, _ = login(session, test_user)
+
+        response = client.post("/api/v1/auth/logout", json={"refresh_token": refresh_token})
+
+        assert response.status_code == 204
+        headers = {"Authorization": f"Bearer {access_token}"}
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+        assert client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token}).status_code == 401
+        # Other sessions are unaffected
+        other = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {other_access}"})
+        assert other.status_code == 200
+
+    def test_logout_all(self, client, session, test_user):
+        """Test that logging out everywhere revokes every session of the user."""
+        first, _ = login(session, test_user)
+        second, _ = login(session, test_user)
+
+        response = client.post("/api/v1/auth/logout-all", headers={"Authorization": f"Bearer {first}"})
+
+        assert response.status_code == 204
+        assert client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {second}"}).status_code == 401
+        rows = session.exec(select(RefreshToken).where(RefreshToken.user_id == test_user.id)).all()
+        assert rows and all(row.revoked_at is not None for row in rows)
+
+class TestRevocationIndex:
+    """Test the local revocation index."""
+
+    def test_entries_expire_after_access_token_lifetime(self, monkeypatch):
+        """Test that revoked sessions are forgotten once their access tokens expire."""
+        index = RevocationIndex()
+        index.revoke(["s1"])
+        assert index.is_revoked("s1")
+        assert not index.is_revoked("s2")
+
+        monkeypatch.setattr("app.core.sessions.time.monotonic", lambda: float("inf"))
+        assert not index.is_revoked("s1")
+
+    def test_module_index_is_shared(self):
+        """Test that the module-level index is the one used by authentication."""
+        revocations.revoke(["shared"])
+        assert revocations.is_revoked("shared")
@@ -0,0 +1,107 @@
+import time
+from datetime import datetime, timedelta
+from jose import jwt
+from app.core.auth import create_access_token, verify_token
+from app.core.tokens import ClaimsCache, KeyRing, TokenCodec
+
+def codec(keys=None, active_kid=None, cache_size=100):
+    return TokenCodec(KeyRing(keys or {}, active_kid, "legacy-secret"), ClaimsCache(cache_size))
+
+def expiring(seconds=3600, **claims):
+    return {"sub": "7", "exp": datetime.utcnow() + timedelta(seconds=seconds), **claims}
+
+class TestTokenCodec:
+    """Test HS256 token encoding and verification."""
+
+    def test_round_trip(self):
+        """Test that encoded claims verify and carry the key id."""
+        tokens = codec({"k1": "one"}, "k1")
+        token = tokens.encode(expiring())
+
+        assert tokens.decode(token)["sub"] == "7"
+        assert jwt.get_unverified_header(token)["kid"] == "k1"
+
+    def test_compatible_with_jose(self):
+        """Test that tokens issued by python-jose (no kid) still verify, and vice versa."""
+        tokens = codec()
+        legacy = jwt.encode(expiring(), "legacy-secret", algorithm="HS256")
+
+        assert tokens.decode(legacy)["sub"] == "7"
+        assert jwt.decode(tokens.encode(expiring()), "legacy-secret", algorithms=["HS256"])["sub"] == "7"
+
+    def test_rejects_bad_tokens(self):
+        """Test tampered, expired, wrong-algorithm and malformed tokens."""
+        tokens = codec(cache_size=0)
+        token = tokens.encode(expiring())
+        header, payload, signature = token.split(".")
+        forged = jwt.encode(expiring(sub="1"), "other-secret", algorithm="HS256")
+        other_algorithm = jwt.encode(expiring(), "legacy-secret", algorithm="HS384")
+
+        assert tokens.decode(f"{header}.{forged.split('.')[1]}.{signature}") is None
+        assert tokens.decode(tokens.encode(expiring(seconds=-5))) is None
+        assert tokens.decode(other_algorithm) is None
+        assert tokens.decode("not-a-token") is None
+        assert tokens.decode(f"{header}.{payload}.") is None
+
+    def test_rotation(self):
+        """Test that old keys verify until removed from the ring."""
+        old = codec({"k1": "one"}, "k1")
+        token = old.encode(expiring())
+        old.decode(token)
+
+        rotated = TokenCodec(KeyRing({"k1": "one", "k2": "two"}, "k2", "legacy-secret"), old.cache)
+        assert rotated.decode(token) is not None
+        assert jwt.get_unverified_header(rotated.encode(expiring()))["kid"] == "k2"
+
+        retired = TokenCodec(KeyRing({"k2": "two"}, "k2", "legacy-secret"), old.cache)
+        assert retired.decode(token) is None
+
+    def test_tokens_without_kid_need_default_key_in_ring(self):
+        """Test that kid-less tokens stop verifying once the ring drops the legacy secret."""
+        legacy = jwt.encode(expiring(), "legacy-secret", algorithm="HS256")
+
+        migrating = codec({"default": "legacy-secret", "k2": "two"}, "k2")
+        assert migrating.decode(legacy)["sub"] == "7"
+
+        assert codec({"k2": "two"}, "k2").decode(legacy) is None
+
+class TestClaimsCache:
+    """Test the verified-claims LRU."""
+
+    def test_bounded_lru(self):
+        """Test that the least recently used token is evicted first."""
+        cache = ClaimsCache(2)
+        later = time.time() + 60
+        cache.put("a", {}, later, None)
+        cache.put("b", {}, later, None)
+        cache.get("a", time.time())
+        cache.put("c", {}, later, None)
+
+        assert cache.get("b", time.time()) is None
+        assert cache.get("a", time.time()) is not None
+
+    def test_entries_expire_with_token(self):
+        """Test that cached claims are not served after the token expires."""
+        cache = ClaimsCache(10)
+        cache.put("a", {"sub": "7"}, time.time() + 1, None)
+
+        assert cache.get("a", time.time()) is not None
+        assert cache.get("a", time.time() + 2) is None
+
+    def test_returns_copies(self):
+        """Test that callers cannot modify cached claims."""
+        tokens = codec()
+        token = tokens.encode(expiring())
+        tokens.decode(token)["sub"] = "1"
+
+        assert tokens.decode(token)["sub"] == "7"
+
+class TestAuthHelpers:
+    """Test the auth module's token helpers."""
+
+    def test_create_and_verify(self):
+        """Test that access tokens round-trip through the configured codec."""
+        payload = verify_token(create_access_token({"sub": "3"}))
+
+        assert payload["sub"] == "3"
+        assert payload["exp"] > time.time()
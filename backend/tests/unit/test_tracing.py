@@ -0,0 +1,97 @@
+import asyncio
+import inspect
+import json
+import pytest
+from sqlmodel import Session, select
+from app.core import tracing
+from app.core.config import settings
+from app.core.tracing import traced
+from app.models.job import Job
+from app.services import jobs
+from app.services.jobs import SQLJobStore, Worker, enqueue
+
+@pytest.fixture
+def recorder(monkeypatch):
+    """Tracing on, with spans collected in memory."""
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+    exporter = InMemorySpanExporter()
+    monkeypatch.setattr(settings, "tracing_enabled", True)
+    monkeypatch.setattr(settings, "tracing_sample_rate", 1.0)
+    monkeypatch.setattr(tracing, "_tracer", None)
+    tracing.configure_tracing(span_processor=SimpleSpanProcessor(exporter))
+    return exporter
+
+class TestDisabled:
+    """Test that instrumentation is transparent while tracing is off."""
+
+    def test_traced_keeps_function_kinds(self):
+        """Test that FastAPI still sees coroutines and generator dependencies as such."""
+        teardown = []
+
+        @traced()
+        async def dependency():
+            return 1
+
+        @traced()
+        def generator_dependency():
+            yield 2
+            teardown.append(True)
+
+        assert inspect.iscoroutinefunction(dependency)
+        assert inspect.isgeneratorfunction(generator_dependency)
+        assert asyncio.run(dependency()) == 1
+        assert list(generator_dependency()) == [2]
+        assert teardown == [True]
+
+    def test_generator_teardown_sees_errors(self):
+        """Test that errors thrown into a wrapped dependency reach its teardown."""
+        seen = []
+
+        @traced()
+        def generator_dependency():
+            try:
+                yield 1
+            except ValueError as exc:
+                seen.append(exc)
+                raise
+
+        generator = generator_dependency()
+        next(generator)
+        with pytest.raises(ValueError):
+            generator.throw(ValueError("boom"))
+        assert len(seen) == 1
+
+    def test_no_trace_context_in_job_payload(self, session):
+        """Test that jobs carry no trace context while tracing is off."""
+        enqueue(session, "test.record", value=1)
+        session.commit()
+
+        assert json.loads(session.exec(select(Job)).one().payload) == {"value": 1}
+
+class TestSpans:
+    """Test the spans recorded for requests, SQL and jobs."""
+
+    def test_request_spans(self, recorder, client, auth_headers):
+        """Test that a request records the route, its dependencies and its SQL."""
+        client.get("/api/v1/listings/", headers=auth_headers)
+
+        spans = {span.name: span for span in recorder.get_finished_spans()}
+        server = spans["GET /api/v1/listings/"]
+        assert server.attributes["http.status_code"] == 200
+        assert "get_current_user" in spans
+        assert any(name.startswith("SQL SELECT") for name in spans)
+        assert spans["get_current_user"].context.trace_id == server.context.trace_id
+
+    def test_job_continues_request_trace(self, recorder, engine, session, monkeypatch):
+        """Test that a job's span joins the trace of the code that queued it."""
+        monkeypatch.setitem(jobs.REGISTRY, "test.noop", jobs.JobSpec("test.noop", lambda session: None, 3))
+        with tracing.span("request") as request_span:
+            enqueue(session, "test.noop")
+            session.commit()
+        worker = Worker([SQLJobStore(lambda: Session(engine))], lambda: Session(engine), schedules=[])
+
+        assert worker.run_pending() == 1
+        job_span, = [span for span in recorder.get_finished_spans() if span.name == "job test.noop"]
+        assert job_span.context.trace_id == request_span.get_span_context().trace_id
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Background job worker (see app.services.jobs).
+
+Runs queued and scheduled jobs until SIGTERM/SIGINT, then finishes the jobs
+in flight before exiting. Several workers may run side by side.
+
+Usage (from the backend directory):
+
+    python worker.py                        # JOB_CONCURRENCY jobs at a time
+    python worker.py --concurrency 8
+    python worker.py --once                 # run what is due now, then exit
+    python worker.py --dead                 # list dead-lettered jobs
+    python worker.py --requeue-dead [ID ...]
+"""
+
+import argparse
+import json
+import logging
+import signal
+import sys
+
+
+def main():
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser(description="Run background jobs")
+    parser.add_argument("--concurrency", type=int, default=settings.job_concurrency, help="jobs run at once")
+    parser.add_argument("--poll-interval", type=float, default=settings.job_poll_interval, help="seconds between polls when idle")
+    parser.add_argument("--once", action="store_true", help="run the jobs that are due, then exit")
+    parser.add_argument("--dead", action="store_true", help="list dead-lettered jobs and exit")
+    parser.add_argument("--requeue-dead", nargs="*", metavar="ID", help="queue dead jobs again (all when no ID is given)")
+    args = parser.parse_args()
+
+    from app.core.logs import configure_logging
+    from app.core.tracing import configure_tracing
+    configure_logging()
+    configure_tracing(service_name=f"{settings.tracing_service_name}-worker")
+
+    from sqlmodel import Session
+    import app.models  # noqa: F401
+    import app.services.tasks  # noqa: F401  (registers the handlers and schedules)
+    from app.core.database import engine
+    from app.services.jobs import Worker, get_job_stores
+    from app.services.notifications import shutdown_notifier
+
+    stores = get_job_stores(lambda: Session(engine))
+    if args.dead:
+        for store in stores:
+            for entry in store.dead():
+                print(json.dumps({"store": store.name, **entry}))
+        return 0
+    if args.requeue_dead is not None:
+        for store in stores:
+            count = store.requeue_dead(args.requeue_dead or None)
+            print(f"{store.name}: {count} jobs queued again")
+        return 0
+
+    worker = Worker(
+        stores,
+        lambda: Session(engine),
+        concurrency=args.concurrency,
+        lease_seconds=settings.job_lease_seconds,
+        retry_backoff=settings.job_retry_backoff,
+    )
+    if args.once:
+        worker.schedule_due()
+        print(f"{worker.run_pending()} jobs run")
+        shutdown_notifier()
+        return 0
+
+    def shutdown(signum, frame):
+        logging.getLogger("worker").info("Stopping after the jobs in flight")
+        worker.stop()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    logging.getLogger("worker").info(
+        "Worker started: %d slots, stores %s", args.concurrency, ", ".join(store.name for store in stores)
+    )
+    worker.run(poll_interval=args.poll_interval)
+    # Notifications raised by jobs are still batched in memory
+    shutdown_notifier()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
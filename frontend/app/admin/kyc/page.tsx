@@ -17,6 +17,7 @@ interface KYCApplication {
   business_address?: string
   status: 'pending' | 'approved' | 'rejected' | 'under_review'
   admin_notes?: string
+  previews?: string[]
   created_at: string
   user: {
     full_name: string
@@ -25,8 +26,55 @@ interface KYCApplication {
   }
 }
 
+const PREVIEW_LABELS: Record<string, string> = {
+  document: 'ID Document',
+  selfie: 'Selfie',
+  business_registration: 'Business Registration',
+}
+
+// Previews are admin-only, so they are fetched with the token and shown as blob URLs
+function KYCPreviews({ application }: { application: KYCApplication }) {
+  const { authFetch } = useAuth()
+  const [urls, setUrls] = useState<Record<string, string>>({})
+
+  useEffect(() => {
+    const created: string[] = []
+    Promise.all(
+      (application.previews || []).map(async (kind) => {
+        const response = await authFetch(`/api/v1/kyc/admin/${application.id}/preview/${kind}`)
+        if (!response.ok) return null
+        const url = URL.createObjectURL(await response.blob())
+        created.push(url)
+        return [kind, url] as const
+      })
+    ).then((entries) => {
+      setUrls(Object.fromEntries(entries.filter((entry): entry is readonly [string, string] => entry !== null)))
+    })
+    return () => created.forEach((url) => URL.revokeObjectURL(url))
+  }, [application.id, application.previews])
+
+  if (!application.previews?.length) {
+    return <p className="text-sm text-gray-500">Previews are not available yet.</p>
+  }
+
+  return (
+    <div className="grid grid-cols-1 sm:grid-cols-2 gap-4">
+      {application.previews.map((kind) => (
+        <div key={kind}>
+          <p className="text-sm font-medium text-gray-700 mb-1">{PREVIEW_LABELS[kind] || kind}</p>
+          {urls[kind] ? (
+            <img src={urls[kind]} alt={PREVIEW_LABELS[kind] || kind} className="w-full rounded border" />
+          ) : (
+            <div className="h-40 bg-gray-100 rounded animate-pulse" />
+          )}
+        </div>
+      ))}
+    </div>
+  )
+}
+
 export default function AdminKYCPage() {
-  const { user } = useAuth()
+  const { user, authFetch } = useAuth()
   const [applications, setApplications] = useState<KYCApplication[]>([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
@@ -42,12 +90,7 @@ export default function AdminKYCPage() {
 
   const fetchKYCQueue = async () => {
     try {
-      const token = localStorage.getItem('authToken')
-      const response = await fetch(`/api/v1/kyc/admin/queue`, {
-        headers: {
-          'Authorization': `Bearer ${token}`
-        }
-      })
+      const response = await authFetch(`/api/v1/kyc/admin/queue`)
 
       if (response.ok) {
         const data = await response.json()
@@ -67,11 +110,9 @@ export default function AdminKYCPage() {
 
     setReviewing(true)
     try {
-      const token = localStorage.getItem('authToken')
-      const response = await fetch(`/api/v1/kyc/admin/${selectedApp.id}/review`, {
+      const response = await authFetch(`/api/v1/kyc/admin/${selectedApp.id}/review`, {
         method: 'PUT',
         headers: {
-          'Authorization': `Bearer ${token}`,
           'Content-Type': 'application/json'
         },
         body: JSON.stringify({
@@ -293,6 +334,10 @@ export default function AdminKYCPage() {
                 </div>
               </div>
 
+              <div className="mb-6">
+                <KYCPreviews application={selectedApp} />
+              </div>
+
               <div className="mb-6">
                 <label className="block text-sm font-medium text-gray-700 mb-2">
                   Review Notes
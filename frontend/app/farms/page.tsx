@@ -19,7 +19,7 @@ interface Farm {
 }
 
 export default function FarmsPage() {
-  const { user } = useAuth()
+  const { user, authFetch } = useAuth()
   const [farms, setFarms] = useState<Farm[]>([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
@@ -32,12 +32,7 @@ export default function FarmsPage() {
 
   const fetchFarms = async () => {
     try {
-      const token = localStorage.getItem('authToken')
-      const response = await fetch(`/api/v1/farms/`, {
-        headers: {
-          'Authorization': `Bearer ${token}`
-        }
-      })
+      const response = await authFetch(`/api/v1/farms/`)
 
       if (response.ok) {
         const data = await response.json()
@@ -17,7 +17,7 @@ interface KYCStatus {
 }
 
 export default function KYCPage() {
-  const { user } = useAuth()
+  const { user, authFetch } = useAuth()
   const [kycStatus, setKycStatus] = useState<KYCStatus | null>(null)
   const [loading, setLoading] = useState(false)
   const [uploading, setUploading] = useState(false)
@@ -41,12 +41,7 @@ export default function KYCPage() {
 
   const fetchKYCStatus = async () => {
     try {
-      const token = localStorage.getItem('authToken')
-      const response = await fetch(`/api/v1/kyc/status`, {
-        headers: {
-          'Authorization': `Bearer ${token}`
-        }
-      })
+      const response = await authFetch(`/api/v1/kyc/status`)
 
       if (response.ok) {
         const data = await response.json()
@@ -78,7 +73,6 @@ export default function KYCPage() {
     setUploading(true)
 
     try {
-      const token = localStorage.getItem('authToken')
       const formDataToSend = new FormData()
       
       formDataToSend.append('document_type', formData.document_type)
@@ -100,11 +94,8 @@ export default function KYCPage() {
         formDataToSend.append('business_address', formData.business_address)
       }
 
-      const response = await fetch(`/api/v1/kyc/upload`, {
+      const response = await authFetch(`/api/v1/kyc/upload`, {
         method: 'POST',
-        headers: {
-          'Authorization': `Bearer ${token}`
-        },
         body: formDataToSend
       })
 
@@ -24,7 +24,7 @@ interface Listing {
 }
 
 export default function ListingsPage() {
-  const { user } = useAuth()
+  const { user, authFetch } = useAuth()
   const [listings, setListings] = useState<Listing[]>([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
@@ -35,11 +35,7 @@ export default function ListingsPage() {
 
   const fetchListings = async () => {
     try {
-      const token = localStorage.getItem('authToken')
-      const response = await fetch(`/api/v1/listings`, {
-        headers: {
-          'Authorization': `Bearer ${token}`
-        },
+      const response = await authFetch(`/api/v1/listings`, {
         redirect: 'follow'
       })
 
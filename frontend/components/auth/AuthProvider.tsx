@@ -1,6 +1,6 @@
 'use client'
 
-import React, { createContext, useContext, useEffect, useState } from 'react'
+import React, { createContext, useContext, useEffect, useRef, useState } from 'react'
 
 interface User {
   id: number
@@ -17,6 +17,7 @@ interface AuthContextType {
   login: (email: string, password: string) => Promise<void>
   register: (userData: any) => Promise<void>
   logout: () => void
+  authFetch: (input: string, init?: RequestInit) => Promise<Response>
   loading: boolean
 }
 
@@ -25,6 +26,7 @@ const AuthContext = createContext<AuthContextType | undefined>(undefined)
 export function AuthProvider({ children }: { children: React.ReactNode }) {
   const [user, setUser] = useState<User | null>(null)
   const [loading, setLoading] = useState(true)
+  const refreshing = useRef<Promise<string | null> | null>(null)
 
   useEffect(() => {
     // Check if user is already logged in
@@ -36,23 +38,103 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
     }
   }, [])
 
+  const storeTokens = (data: any) => {
+    localStorage.setItem('authToken', data.access_token)
+    if (data.refresh_token) {
+      localStorage.setItem('refreshToken', data.refresh_token)
+    }
+  }
+
+  const clearTokens = () => {
+    localStorage.removeItem('authToken')
+    localStorage.removeItem('refreshToken')
+  }
+
+  // Access tokens are short-lived; trade the refresh token for a new pair
+  const requestRefresh = async (): Promise<string | null> => {
+    const refreshToken = localStorage.getItem('refreshToken')
+    if (!refreshToken) {
+      return null
+    }
+    const response = await fetch(`/api/v1/auth/refresh`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    })
+    if (!response.ok) {
+      return null
+    }
+    const data = await response.json()
+    storeTokens(data)
+    return data.access_token
+  }
+
+  // Refresh tokens rotate on use, so requests failing together share one refresh
+  const refreshSession = (): Promise<string | null> => {
+    if (!refreshing.current) {
+      refreshing.current = requestRefresh()
+        .catch(() => null)
+        .finally(() => {
+          refreshing.current = null
+        })
+    }
+    return refreshing.current
+  }
+
+  // fetch with the stored access token, refreshing it once on a 401
+  const authFetch = async (input: string, init: RequestInit = {}): Promise<Response> => {
+    const send = (token: string | null) => {
+      const headers = new Headers(init.headers)
+      if (token) {
+        headers.set('Authorization', `Bearer ${token}`)
+      }
+      return fetch(input, { ...init, headers })
+    }
+
+    const response = await send(localStorage.getItem('authToken'))
+    if (response.status !== 401 || !localStorage.getItem('refreshToken')) {
+      return response
+    }
+    const refreshed = await refreshSession()
+    if (!refreshed) {
+      // The session has ended (expired or revoked): sign out
+      clearTokens()
+      setUser(null)
+      return response
+    }
+    return send(refreshed)
+  }
+
   const fetchUser = async (token: string) => {
     try {
-      const response = await fetch(`/api/v1/auth/me`, {
+      let response = await fetch(`/api/v1/auth/me`, {
         headers: {
           'Authorization': `Bearer ${token}`
         }
       })
       
+      if (response.status === 401) {
+        const refreshed = await refreshSession()
+        if (refreshed) {
+          response = await fetch(`/api/v1/auth/me`, {
+            headers: {
+              'Authorization': `Bearer ${refreshed}`
+            }
+          })
+        }
+      }
+      
       if (response.ok) {
         const userData = await response.json()
         setUser(userData)
       } else {
-        localStorage.removeItem('authToken')
+        clearTokens()
       }
     } catch (error) {
       console.error('Error fetching user:', error)
-      localStorage.removeItem('authToken')
+      clearTokens()
     } finally {
       setLoading(false)
     }
@@ -70,7 +152,7 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
 
       if (response.ok) {
         const data = await response.json()
-        localStorage.setItem('authToken', data.access_token)
+        storeTokens(data)
         setUser(data.user)
       } else {
         const error = await response.json()
@@ -93,7 +175,7 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
 
       if (response.ok) {
         const data = await response.json()
-        localStorage.setItem('authToken', data.access_token)
+        storeTokens(data)
         setUser(data.user)
       } else {
         const error = await response.json()
@@ -105,7 +187,18 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
   }
 
   const logout = () => {
-    localStorage.removeItem('authToken')
+    const refreshToken = localStorage.getItem('refreshToken')
+    if (refreshToken) {
+      // Ends the session server-side; the local logout does not wait for it
+      fetch(`/api/v1/auth/logout`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ refresh_token: refreshToken }),
+      }).catch(() => {})
+    }
+    clearTokens()
     setUser(null)
   }
 
@@ -114,6 +207,7 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
     login,
     register,
     logout,
+    authFetch,
     loading
   }
 